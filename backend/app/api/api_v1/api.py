@@ -1,15 +1,49 @@
 """
 Enrutador principal de la API v1.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from app.api.api_v1.endpoints import auth, users, announcements, categories, contracts
+from app.api import deps
+from app.api.api_v1.endpoints import (
+    auth,
+    batch,
+    users,
+    announcements,
+    categories,
+    chat,
+    contracts,
+    health,
+    imports,
+    metrics,
+)
 
 api_router = APIRouter()
 
+# Límite de escrituras por usuario para los routers con operaciones de modificación
+write_limited = [Depends(deps.rate_limit_writes)]
+
 # Incluir routers específicos
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-api_router.include_router(users.router, prefix="/users", tags=["Users"])
-api_router.include_router(announcements.router, prefix="/announcements", tags=["Announcements"])
-api_router.include_router(categories.router, prefix="/categories", tags=["Categories"])
-api_router.include_router(contracts.router, prefix="/contracts", tags=["Contracts"])
+api_router.include_router(
+    users.router, prefix="/users", tags=["Users"], dependencies=write_limited
+)
+api_router.include_router(
+    announcements.router,
+    prefix="/announcements",
+    tags=["Announcements"],
+    dependencies=write_limited,
+)
+api_router.include_router(
+    categories.router, prefix="/categories", tags=["Categories"], dependencies=write_limited
+)
+api_router.include_router(
+    contracts.router, prefix="/contracts", tags=["Contracts"], dependencies=write_limited
+)
+api_router.include_router(
+    imports.router, prefix="/imports", tags=["Imports"], dependencies=write_limited
+)
+api_router.include_router(chat.router, prefix="/contracts", tags=["Chat"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["Monitoring"])
+api_router.include_router(health.router, tags=["Monitoring"])
+# Sin límite de escrituras propio: cada llamada del lote pasa por el de su router
+api_router.include_router(batch.router, prefix="/batch", tags=["Batch"])
@@ -1,25 +1,195 @@
-from typing import Any, List
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api.deps import get_db, get_current_active_user
+from app.api.export import ExportFormat, stream_export
+from app.api.fields import FieldSet, fields_query, sparse_response
+from app.api.pagination import set_total_headers
+from app.core.config import settings
+from app.crud.announcement import ANNOUNCEMENTS_CHANNEL
+from app.models.announcement import AnnouncementStatus
+from app.models.user import UserRole
+from app.services import events
 
 router = APIRouter()
 
+announcement_fields = fields_query(schemas.Announcement, models.Announcement)
+
+
+def announcement_filter(
+    status_: Optional[List[AnnouncementStatus]] = Query(None, alias="status"),
+    category_id: Optional[List[int]] = Query(None),
+    offerer_id: Optional[int] = None,
+    deadline_after: Optional[datetime] = None,
+    deadline_before: Optional[datetime] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    min_budget: Optional[Decimal] = Query(None, ge=0),
+    max_budget: Optional[Decimal] = Query(None, ge=0),
+    currency: Optional[str] = Query(None, pattern="^[A-Z]{3}$"),
+) -> schemas.AnnouncementFilter:
+    """Collect the list criteria from the query string."""
+    try:
+        return schemas.AnnouncementFilter(
+            status=status_,
+            category_id=category_id,
+            offerer_id=offerer_id,
+            deadline_after=deadline_after,
+            deadline_before=deadline_before,
+            created_after=created_after,
+            created_before=created_before,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            currency=currency,
+        )
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False, include_context=False))
+
 
 @router.get("/", response_model=List[schemas.Announcement])
 def read_announcements(
+    response: Response,
     db: Session = Depends(get_db),
+    filters: schemas.AnnouncementFilter = Depends(announcement_filter),
+    sort: schemas.AnnouncementSort = schemas.AnnouncementSort.created_at_desc,
     skip: int = 0,
     limit: int = 100,
+    include_total: bool = False,
+    include_archived: bool = False,
+    fields: FieldSet = Depends(announcement_fields),
+) -> Any:
+    """
+    Retrieve announcements matching the given criteria.
+
+    `status` and `category_id` may be repeated to match any of several
+    values. `min_budget`/`max_budget` keep the announcements whose budget
+    range overlaps the requested one (announcements without a budget are
+    left out); amounts are only comparable within one `currency`.
+
+    With `include_total`, the `X-Total-Count` header carries the number of
+    matching announcements: exact for small results, an estimate (flagged by
+    `X-Total-Count-Estimated: true`) for large ones.
+
+    `fields` (e.g. `fields=title,budget,status`) returns only those fields.
+
+    Announcements finished long ago are archived and only listed with
+    `include_archived`.
+    """
+    announcements = crud.announcement.get_multi_filtered(
+        db,
+        filters=filters,
+        sort=sort,
+        skip=skip,
+        limit=limit,
+        fields=fields,
+        include_archived=include_archived,
+    )
+    if include_total:
+        set_total_headers(
+            response,
+            *crud.announcement.count_filtered(
+                db, filters=filters, include_archived=include_archived
+            ),
+        )
+    return sparse_response(announcements, schemas.Announcement, fields, response)
+
+
+@router.get("/stream")
+async def stream_announcements(
+    request: Request,
+    category_id: Optional[List[int]] = Query(None),
+) -> StreamingResponse:
+    """
+    Stream newly created or updated open announcements as Server-Sent Events.
+
+    Optionally restricted to one or more categories with repeated
+    ``category_id`` query parameters. Slow clients lose the oldest pending
+    events instead of buffering without bound.
+    """
+    categories = set(category_id or ())
+
+    def wanted(payload: dict) -> bool:
+        if payload.get("status") != AnnouncementStatus.OPEN.value:
+            return False
+        return not categories or payload.get("category_id") in categories
+
+    async def event_stream() -> AsyncIterator[str]:
+        subscription = events.hub.subscribe(ANNOUNCEMENTS_CHANNEL, predicate=wanted)
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(
+                    timeout=settings.ANNOUNCEMENT_STREAM_HEARTBEAT_SECONDS
+                )
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event.payload['event']}\ndata: {event.data}\n\n"
+        finally:
+            events.hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/feed", response_model=List[schemas.Announcement])
+def read_recommended_announcements(
+    response: Response,
+    db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = 20,
+    fields: FieldSet = Depends(announcement_fields),
+    current_user: models.User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Retrieve announcements.
+    Retrieve the precomputed recommendation feed of the current mercenary.
+
+    `fields` returns only the requested fields of each announcement.
     """
-    announcements = crud.announcement.get_multi(db, skip=skip, limit=limit)
-    return announcements
+    if current_user.role != UserRole.FREELANCER:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only mercenaries have a recommendation feed.",
+        )
+    announcements = crud.announcement.get_multi_recommended(
+        db, mercenary_id=current_user.id, skip=skip, limit=limit, fields=fields
+    )
+    return sparse_response(announcements, schemas.Announcement, fields, response)
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_announcements(
+    request: Request,
+    db: Session = Depends(get_db),
+    filters: schemas.AnnouncementFilter = Depends(announcement_filter),
+    format: ExportFormat = ExportFormat.ndjson,
+    include_archived: bool = False,
+    current_user: models.User = Depends(get_current_active_user),
+) -> StreamingResponse:
+    """
+    Export announcements as NDJSON or CSV, streamed row by row.
+
+    Admins export every announcement matching the filters; other users only
+    their own. Accepts the same filters as the list, and `include_archived`.
+    """
+    if current_user.role != UserRole.ADMIN:
+        filters = filters.model_copy(update={"offerer_id": current_user.id})
+    statement, params = crud.announcement.export_statement(
+        filters=filters, include_archived=include_archived
+    )
+    db.close()  # The export streams on its own session; free this connection now
+    return stream_export(request, statement, params, format=format, filename="announcements")
 
 
 @router.post("/", response_model=schemas.Announcement)
@@ -32,10 +202,10 @@ def create_announcement(
     """
     Create new announcement.
     """
-    if current_user.role != models.UserRole.OFFERER:
+    if current_user.role != UserRole.CLIENT:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only offerers can create announcements.",
+            detail="Only clients can create announcements.",
         )
     announcement = crud.announcement.create_with_offerer(
         db=db, obj_in=announcement_in, offerer_id=current_user.id
@@ -48,11 +218,14 @@ def read_announcement(
     *,
     db: Session = Depends(get_db),
     announcement_id: int,
+    include_archived: bool = False,
 ) -> Any:
     """
-    Get announcement by ID.
+    Get announcement by ID (also archived ones with `include_archived`).
     """
-    announcement = crud.announcement.get(db, id=announcement_id)
+    announcement = crud.announcement.get(
+        db, id=announcement_id, include_archived=include_archived
+    )
     if not announcement:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Announcement not found"
@@ -3,21 +3,21 @@ import logging
 from datetime import datetime, timedelta
 from typing import Any
 
-import jwt
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
+from jose import JWTError, jwt
 from sqlalchemy.exc import IntegrityError
-from pydantic import ValidationError
 from sqlalchemy.orm import Session  # noqa: F401
 
-from app.core import security
+from app.api import deps
+from app.core import keys, security
 from app.core.config import settings
 from app.crud import user as user_crud
-from app.db.session import get_db
 from app.models.user import User
 from app.schemas.token import RefreshTokenRequest, Token, TokenPayload
 from app.schemas.user import User as UserSchema
 from app.schemas.user import UserCreate
+from app.services import revocation
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -28,11 +28,12 @@ router = APIRouter()
 @router.post(
     "/register",
     response_model=UserSchema,
-    status_code=status.HTTP_201_CREATED
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(deps.rate_limit_register)],
 )
 def register_user(
     user_in: UserCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(deps.get_db)
 ) -> Any:
     """Registrar un nuevo usuario.
 
@@ -81,9 +82,13 @@ def register_user(
         )
 
 
-@router.post("/login/access-token", response_model=Token)
-async def login_access_token(
-    db: Session = Depends(get_db),
+@router.post(
+    "/login/access-token",
+    response_model=Token,
+    dependencies=[Depends(deps.rate_limit_login)],
+)
+def login_access_token(
+    db: Session = Depends(deps.get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """Obtener un token de acceso OAuth2 para autenticación.
@@ -120,11 +125,12 @@ async def login_access_token(
     access_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     refresh_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
 
+    family_id = security.new_token_id()
     access_token = security.create_access_token(
-        user.email, user.id, user.role, expires_delta=access_expires
+        user.email, user.id, user.role, expires_delta=access_expires, family_id=family_id
     )
     refresh_token = security.create_refresh_token(
-        user.email, user.id, expires_delta=refresh_expires
+        user.email, user.id, expires_delta=refresh_expires, family_id=family_id
     )
 
     return {
@@ -137,7 +143,7 @@ async def login_access_token(
 
 @router.post("/login/test-token", response_model=UserSchema)
 def test_token(
-    current_user: User = Depends(security.get_current_user)
+    current_user: User = Depends(deps.get_current_user)
 ) -> Any:
     """Probar el token de acceso actual.
 
@@ -150,10 +156,14 @@ def test_token(
     return current_user
 
 
-@router.post("/refresh-token", response_model=Token)
+@router.post(
+    "/refresh-token",
+    response_model=Token,
+    dependencies=[Depends(deps.rate_limit_refresh)],
+)
 def refresh_token(
     token_in: RefreshTokenRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(deps.get_db)
 ) -> Any:
     """Obtener un nuevo token de acceso utilizando un token de actualización.
 
@@ -167,35 +177,57 @@ def refresh_token(
     Raises:
         HTTPException: Si el token es inválido o el usuario no existe
     """
-    try:
-        payload = jwt.decode(
-            token_in.refresh_token,
-            settings.REFRESH_SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
+    payload = _decode_refresh_token(token_in.refresh_token)
+    token_data = TokenPayload(**payload)
+    family_id = payload["fid"]
+
+    # El jti se comprueba al consumirlo, para distinguir la reutilización
+    session_claims = {key: value for key, value in payload.items() if key != "jti"}
+    if revocation.store.is_revoked(session_claims, db=db):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token de actualización revocado",
+        )
+
+    # Rotación: cada refresh token solo puede usarse una vez. Un segundo uso
+    # indica que el token se ha filtrado, así que se revoca toda la sesión.
+    first_use = revocation.store.consume(
+        db,
+        payload["jti"],
+        user_id=token_data.user_id,
+        expires_at=datetime.utcfromtimestamp(payload["exp"]),
+    )
+    if not first_use:
+        revocation.store.revoke_family(db, family_id, user_id=token_data.user_id)
+        db.commit()
+        logger.warning(
+            "Reutilización del refresh token de la sesión %s (usuario %s); sesión revocada",
+            family_id,
+            token_data.user_id,
         )
-        token_data = TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError) as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="No se pudo validar el token de actualización",
-        ) from e
+            detail="Token de actualización ya utilizado",
+        )
 
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    user = user_crud.get(db, id=token_data.user_id)
     if not user or not user.is_active:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuario no encontrado o inactivo"
         )
+    db.commit()
 
-    # Crear nuevos tokens
+    # Crear nuevos tokens de la misma sesión
     access_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     refresh_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
 
     access_token = security.create_access_token(
-        user.email, user.id, user.role, expires_delta=access_expires
+        user.email, user.id, user.role, expires_delta=access_expires, family_id=family_id
     )
     refresh_token = security.create_refresh_token(
-        user.email, user.id, expires_delta=refresh_expires
+        user.email, user.id, expires_delta=refresh_expires, family_id=family_id
     )
 
     return {
@@ -204,3 +236,76 @@ def refresh_token(
         "refresh_token": refresh_token,
         "expires_at": (datetime.utcnow() + access_expires).isoformat(),
     }
+
+
+@router.get("/jwks.json")
+def jwks(response: Response) -> Any:
+    """Claves públicas para verificar los tokens de acceso sin llamar a la API.
+
+    Con ``ALGORITHM=HS256`` la lista está vacía: los tokens solo se pueden
+    verificar con el secreto compartido.
+    """
+    response.headers["Cache-Control"] = f"public, max-age={settings.JWKS_CACHE_SECONDS}"
+    return keys.get_key_set().jwks()
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    token_in: RefreshTokenRequest,
+    db: Session = Depends(deps.get_db)
+) -> Response:
+    """Cerrar la sesión de un refresh token.
+
+    Revoca la familia del token, lo que invalida también los tokens de acceso
+    emitidos en la misma sesión.
+
+    Args:
+        token_in: Token de actualización de la sesión
+        db: Sesión de base de datos
+    """
+    payload = _decode_refresh_token(token_in.refresh_token)
+    revocation.store.revoke_family(db, payload["fid"], user_id=payload.get("user_id"))
+    db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+def logout_all(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Response:
+    """Revocar todos los tokens emitidos hasta ahora al usuario actual.
+
+    Args:
+        db: Sesión de base de datos
+        current_user: Usuario autenticado
+    """
+    revocation.store.revoke_user(db, current_user.id)
+    db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+def _decode_refresh_token(token: str) -> dict:
+    """Validar un refresh token y devolver su payload.
+
+    Raises:
+        HTTPException: Si el token no es válido, no es de actualización o es
+            anterior a la rotación (sin ``jti``/``fid``)
+    """
+    try:
+        payload = jwt.decode(
+            token,
+            settings.REFRESH_SECRET_KEY,
+            algorithms=[security.REFRESH_ALGORITHM],
+        )
+    except JWTError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No se pudo validar el token de actualización",
+        ) from e
+    if payload.get("token_type") != "refresh" or not payload.get("jti") or not payload.get("fid"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No se pudo validar el token de actualización",
+        )
+    return payload
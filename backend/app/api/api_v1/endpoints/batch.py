@@ -0,0 +1,38 @@
+"""
+Endpoint for batched API calls.
+"""
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security.utils import get_authorization_scheme_param
+
+from app import schemas
+from app.api import deps
+from app.api.batch import run_batch
+
+router = APIRouter()
+
+
+@router.post("/", response_model=schemas.BatchResponse)
+async def batch(request: Request, batch_in: schemas.BatchRequest) -> Any:
+    """
+    Execute several API calls in one round-trip.
+
+    Each call is routed, authorized and validated exactly like a standalone
+    request with the batch's `Authorization` header, and gets its own
+    status, headers and body in `responses`, in request order. Consecutive
+    `GET` calls run concurrently; other methods run one at a time, in order.
+    A failing call does not stop the others.
+    """
+    claims = None
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() == "bearer" and token:
+        try:
+            # Verified once here; the calls reuse the claims
+            claims = dict(await run_in_threadpool(deps.verify_token, token))
+        except HTTPException:
+            # Each call that needs authentication reports the error itself
+            claims = None
+    responses = await run_batch(request.app, request.scope, batch_in.requests, claims)
+    return schemas.BatchResponse(responses=responses)
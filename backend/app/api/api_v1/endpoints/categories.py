@@ -3,14 +3,18 @@ Endpoints for category management.
 """
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api import deps
+from app.api.fields import FieldSet, fields_query, sparse_response
+from app.api.pagination import set_total_headers
 
 router = APIRouter()
 
+category_fields = fields_query(schemas.Category, models.Category)
+
 
 @router.post("/", response_model=schemas.Category, status_code=status.HTTP_201_CREATED)
 def create_category(
@@ -26,13 +30,22 @@ def create_category(
 
 @router.get("/", response_model=List[schemas.Category])
 def read_categories(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    include_total: bool = False,
+    fields: FieldSet = Depends(category_fields),
 ) -> Any:
-    """Retrieve all categories with pagination."""
-    categories = crud.category.get_multi(db, skip=skip, limit=limit)
-    return categories
+    """Retrieve all categories with pagination.
+
+    With `include_total`, the total is returned in the `X-Total-Count` header.
+    `fields` (comma-separated) returns only those fields.
+    """
+    categories = crud.category.get_multi(db, skip=skip, limit=limit, fields=fields)
+    if include_total:
+        set_total_headers(response, *crud.category.count(db))
+    return sparse_response(categories, schemas.Category, fields, response)
 
 
 @router.get("/{category_id}", response_model=schemas.Category)
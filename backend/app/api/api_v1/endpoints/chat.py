@@ -0,0 +1,85 @@
+"""
+Endpoints for the real-time chat of a contract.
+"""
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.api import deps
+from app.db.session import SessionLocal
+from app.services import chat
+
+router = APIRouter()
+
+
+def _get_contract_for_participant(
+    db: Session, contract_id: int, user: models.User
+) -> models.Contract:
+    contract = crud.contract.get(db, id=contract_id)
+    if not contract:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Contract not found"
+        )
+    if user.id not in (contract.offerer_id, contract.mercenary_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not a participant of this contract.",
+        )
+    return contract
+
+
+def _authorize_socket(token: str, contract_id: int) -> Optional[int]:
+    """Resolve the socket user and check contract membership.
+
+    Uses a short-lived session so an open socket never holds a connection.
+    """
+    db = SessionLocal()
+    try:
+        user = deps.get_current_active_user(deps.user_from_token(db, token))
+        _get_contract_for_participant(db, contract_id, user)
+        return user.id
+    except HTTPException:
+        return None
+    finally:
+        db.close()
+
+
+@router.get("/{contract_id}/messages", response_model=schemas.MessagePage)
+def read_messages(
+    *,
+    db: Session = Depends(deps.get_db),
+    contract_id: int,
+    before: Optional[int] = Query(None, description="Return messages older than this id"),
+    limit: int = Query(50, ge=1, le=100),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Load chat history of a contract, newest first, paginated by cursor."""
+    _get_contract_for_participant(db, contract_id, current_user)
+    items = crud.message.get_history(
+        db, contract_id=contract_id, before=before, limit=limit
+    )
+    next_cursor = items[-1].id if len(items) == limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.websocket("/{contract_id}/chat")
+async def contract_chat(
+    websocket: WebSocket,
+    contract_id: int,
+    token: str = Query(..., description="JWT access token"),
+) -> None:
+    """Real-time chat between the offerer and the mercenary of a contract.
+
+    Clients send `{"body": "...", "client_id": "..."}` frames and receive
+    `{"type": "message", ...}` frames, including their own messages once
+    they are stored.
+    """
+    user_id = await run_in_threadpool(_authorize_socket, token, contract_id)
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    await chat.serve(websocket, contract_id=contract_id, user_id=user_id)
@@ -3,14 +3,21 @@ Endpoints for contract management.
 """
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api import deps
+from app.api.export import ExportFormat, stream_export
+from app.api.fields import FieldSet, fields_query, sparse_response
+from app.api.pagination import set_total_headers
+from app.models.user import UserRole
 
 router = APIRouter()
 
+contract_fields = fields_query(schemas.Contract, models.Contract)
+
 
 @router.post("/", response_model=schemas.Contract, status_code=status.HTTP_201_CREATED)
 def create_contract(
@@ -42,16 +49,71 @@ def create_contract(
 
 @router.get("/", response_model=List[schemas.Contract])
 def read_contracts(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    include_total: bool = False,
+    include_archived: bool = False,
+    fields: FieldSet = Depends(contract_fields),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
-    """Retrieve contracts for the current user (both as offerer and mercenary)."""
+    """Retrieve contracts for the current user (both as offerer and mercenary).
+
+    With `include_total`, the total is returned in the `X-Total-Count` header.
+    `fields` (comma-separated) returns only those fields. Archived contracts
+    are only listed with `include_archived`.
+    """
     contracts = crud.contract.get_multi_by_user(
-        db, user_id=current_user.id, skip=skip, limit=limit
+        db,
+        user_id=current_user.id,
+        skip=skip,
+        limit=limit,
+        fields=fields,
+        include_archived=include_archived,
     )
-    return contracts
+    if include_total:
+        set_total_headers(
+            response,
+            *crud.contract.count_by_user(
+                db, user_id=current_user.id, include_archived=include_archived
+            ),
+        )
+    return sparse_response(contracts, schemas.Contract, fields, response)
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_contracts(
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    format: ExportFormat = ExportFormat.ndjson,
+    include_archived: bool = False,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> StreamingResponse:
+    """Export the current user's contracts (every contract for admins) as NDJSON or CSV."""
+    user_id = None if current_user.role == UserRole.ADMIN else current_user.id
+    statement, params = crud.contract.export_statement(
+        user_id=user_id, include_archived=include_archived
+    )
+    db.close()  # The export streams on its own session; free this connection now
+    return stream_export(request, statement, params, format=format, filename="contracts")
+
+
+@router.get("/transactions/export", response_class=StreamingResponse)
+def export_transactions(
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    format: ExportFormat = ExportFormat.ndjson,
+    include_archived: bool = False,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> StreamingResponse:
+    """Export the transactions of the current user's contracts (all for admins)."""
+    user_id = None if current_user.role == UserRole.ADMIN else current_user.id
+    statement, params = crud.contract.export_transactions_statement(
+        user_id=user_id, include_archived=include_archived
+    )
+    db.close()  # The export streams on its own session; free this connection now
+    return stream_export(request, statement, params, format=format, filename="transactions")
 
 
 @router.get("/{contract_id}", response_model=schemas.Contract)
@@ -59,10 +121,11 @@ def read_contract(
     *,
     db: Session = Depends(deps.get_db),
     contract_id: int,
+    include_archived: bool = False,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
-    """Get a specific contract by ID."""
-    contract = crud.contract.get(db, id=contract_id)
+    """Get a specific contract by ID (also archived ones with `include_archived`)."""
+    contract = crud.contract.get(db, id=contract_id, include_archived=include_archived)
     if not contract:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contract not found"
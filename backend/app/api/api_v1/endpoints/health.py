@@ -4,28 +4,34 @@ Health check endpoints for monitoring the application status.
 from datetime import datetime
 from typing import Dict, Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException
 
-from app.api import deps
 from app.core.config import settings
+from app.db.pool import pool_health
 
 router = APIRouter()
 
 
+def _database_status() -> str:
+    """
+    Database status from the background pool check, without taking a connection.
+
+    Falls back to a direct query when the background check is disabled or has
+    not run yet.
+    """
+    if pool_health.healthy is None:
+        pool_health.check_once()
+    if pool_health.healthy:
+        return "healthy"
+    return f"unhealthy: {pool_health.last_error}"
+
+
 @router.get("/health", response_model=Dict[str, Any])
-async def health_check(
-    db: Session = Depends(deps.get_db),
-) -> Dict[str, Any]:
+def health_check() -> Dict[str, Any]:
     """
     Health check endpoint that verifies the application and its dependencies are running.
     """
-    # Check database connection
-    try:
-        db.execute("SELECT 1")
-        db_status = "healthy"
-    except Exception as e:
-        db_status = f"unhealthy: {str(e)}"
+    db_status = _database_status()
     
     # Check Redis connection (if used)
     try:
@@ -36,8 +42,8 @@ async def health_check(
     
     # Get application info
     app_info = {
-        "name": settings.APP_NAME,
-        "version": settings.APP_VERSION,
+        "name": settings.PROJECT_NAME,
+        "version": settings.VERSION,
         "environment": settings.ENVIRONMENT,
         "status": "healthy" if all([
             db_status == "healthy",
@@ -47,6 +53,7 @@ async def health_check(
         "checks": {
             "database": {
                 "status": db_status,
+                "checked_at": pool_health.last_check,
                 "details": {
                     "database": settings.POSTGRES_DB,
                     "host": settings.POSTGRES_SERVER,
@@ -82,21 +89,16 @@ async def liveness_probe() -> None:
 
 
 @router.get("/health/ready", status_code=204)
-async def readiness_probe(
-    db: Session = Depends(deps.get_db),
-) -> None:
+def readiness_probe() -> None:
     """
     Readiness probe for Kubernetes.
     Returns 204 if the application is ready to receive traffic.
     """
-    try:
-        # Check database connection
-        db.execute("SELECT 1")
-        # Add other dependency checks here
-    except Exception as e:
+    db_status = _database_status()
+    if db_status != "healthy":
         raise HTTPException(
             status_code=503,
-            detail={"status": "unhealthy", "reason": str(e)},
+            detail={"status": "unhealthy", "reason": db_status},
             headers={"Retry-After": "30"},
         )
     
@@ -0,0 +1,55 @@
+"""
+Endpoints for bulk imports of categories, skills and announcements.
+"""
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.api import deps
+from app.models.user import UserRole
+from app.services.imports import ImportFileError, detect_format, run_import
+
+router = APIRouter()
+
+
+@router.post("/{kind}", response_model=schemas.ImportReport)
+def import_rows(
+    *,
+    db: Session = Depends(deps.get_db),
+    kind: schemas.ImportKind,
+    file: UploadFile = File(..., description="CSV with a header row, or one JSON object per line"),
+    format: Optional[schemas.ImportFormat] = None,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """Import the rows of an uploaded CSV or NDJSON file.
+
+    Columns are the fields of the matching create schema. Valid rows are
+    imported in one transaction; invalid rows are reported by line without
+    aborting the import, and rows that already exist are skipped.
+    Categories and skills can only be imported by admins; announcements
+    are created as open and owned by the importing client. `format`
+    defaults to the file extension.
+    """
+    if kind is schemas.ImportKind.announcements:
+        if current_user.role != UserRole.CLIENT:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only clients can create announcements.",
+            )
+    elif current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Only admins can import {kind.value}.",
+        )
+    try:
+        return run_import(
+            db,
+            kind,
+            file.file,
+            format=format or detect_format(file.filename),
+            offerer_id=current_user.id,
+        )
+    except ImportFileError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,15 @@
+"""
+Endpoint de métricas para el recolector de Prometheus.
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import registry
+
+router = APIRouter()
+
+
+@router.get("/", response_class=PlainTextResponse)
+def read_metrics() -> str:
+    """Exportar las métricas del proceso en formato de texto de Prometheus."""
+    return registry.render()
@@ -9,7 +9,6 @@ from sqlalchemy.orm import Session
 from app import crud, models, schemas
 from app.api import deps
 from app.core.security import get_password_hash
-from app.db.session import get_db
 
 router = APIRouter()
 
@@ -27,7 +26,7 @@ def read_user_me(
 @router.put("/me", response_model=schemas.User)
 def update_user_me(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(deps.get_db),
     user_in: schemas.UserUpdate,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
@@ -56,7 +55,7 @@ def update_user_me(
 def read_user_by_id(
     user_id: int,
     current_user: models.User = Depends(deps.get_current_active_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(deps.get_db),
 ) -> Any:
     """
     Obtener un usuario por ID (solo para usuarios autenticados).
@@ -0,0 +1,162 @@
+"""
+In-process execution of batched API calls.
+
+`/batch` replays each call through the ASGI application itself, so routing,
+validation, dependencies, rate limits and error handling are exactly those
+of a standalone request; only the network round-trip, TLS and the token
+verification are paid once per batch.
+
+Consecutive GET calls run concurrently; any other method runs alone and in
+order, so a read listed after a write sees its effect. Each call gets its
+own database session from `get_db`: sessions are not safe to share between
+concurrent calls, and one only takes a pooled connection on its first query.
+At most `BATCH_MAX_CONCURRENCY` calls run at once, and always fewer than
+`DB_POOL_SIZE`, so a single batch cannot drain the connection pool.
+"""
+import asyncio
+import json
+from typing import Any, Dict, List, MutableMapping, Optional
+from urllib.parse import urlsplit
+
+from fastapi.encoders import jsonable_encoder
+from starlette.types import ASGIApp, Message, Scope
+
+from app.api.deps import AUTH_CLAIMS_SCOPE_KEY
+from app.core.config import settings
+from app.core.metrics import registry
+from app.schemas.batch import BatchRequestItem, BatchResponseItem
+
+BATCH_CALLS = registry.counter(
+    "batch_subrequests_total",
+    "Llamadas ejecutadas dentro de /batch por método y clase de estado",
+    ["method", "status"],
+)
+
+# Headers of the batch request that are not passed on to its calls
+_DROPPED_HEADERS = (b"content-length", b"content-type")
+
+
+def _call_scope(
+    parent: Scope, item: BatchRequestItem, body: bytes, claims: Optional[Dict[str, Any]]
+) -> Scope:
+    url = urlsplit(item.path)
+    path = settings.API_V1_STR + url.path
+    headers = [(name, value) for name, value in parent["headers"] if name not in _DROPPED_HEADERS]
+    headers += [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in item.headers.items()
+    ]
+    if body:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    scope: MutableMapping[str, Any] = {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": item.method,
+        "scheme": parent.get("scheme", "http"),
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "root_path": parent.get("root_path", ""),
+        "query_string": url.query.encode("latin-1"),
+        "headers": headers,
+        "client": parent.get("client"),
+        "server": parent.get("server"),
+    }
+    if "state" in parent:
+        scope["state"] = dict(parent["state"])
+    if claims is not None:
+        scope[AUTH_CLAIMS_SCOPE_KEY] = claims
+    return scope
+
+
+def _decode_body(content_type: str, body: bytes) -> Any:
+    if not body:
+        return None
+    if content_type.startswith("application/json"):
+        return json.loads(body)
+    return body.decode("utf-8", errors="replace")
+
+
+async def run_call(
+    app: ASGIApp, parent: Scope, item: BatchRequestItem, claims: Optional[Dict[str, Any]]
+) -> BatchResponseItem:
+    """Execute one call through `app` and collect its response."""
+    body = b"" if item.body is None else json.dumps(jsonable_encoder(item.body)).encode()
+    scope = _call_scope(parent, item, body, claims)
+    status_code = 500
+    headers: Dict[str, str] = {}
+    chunks: List[bytes] = []
+    finished = asyncio.Event()
+    body_sent = False
+
+    async def receive() -> Message:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Like a client that stays connected until the response is complete
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            for name, value in message.get("headers", []):
+                name = name.decode("latin-1").lower()
+                if name != "content-length":
+                    headers[name] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    try:
+        await asyncio.wait_for(app(scope, receive, send), settings.BATCH_SUBREQUEST_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        status_code, headers, chunks = 504, {}, []
+    except Exception:
+        # The application already logged it; report it on this call only
+        if not finished.is_set():
+            status_code, headers, chunks = 500, {}, []
+    finally:
+        finished.set()
+
+    BATCH_CALLS.inc(method=item.method, status=f"{status_code // 100}xx")
+    if status_code == 504 and not chunks:
+        response_body: Any = {"detail": "Call timed out"}
+    elif status_code == 500 and not chunks:
+        response_body = {"detail": "Internal server error"}
+    else:
+        response_body = _decode_body(headers.get("content-type", ""), b"".join(chunks))
+    return BatchResponseItem(id=item.id, status=status_code, headers=headers, body=response_body)
+
+
+def concurrency_limit() -> int:
+    """Calls of one batch that may hold a database connection at the same time."""
+    return max(1, min(settings.BATCH_MAX_CONCURRENCY, settings.DB_POOL_SIZE - 1))
+
+
+async def run_batch(
+    app: ASGIApp,
+    parent: Scope,
+    items: List[BatchRequestItem],
+    claims: Optional[Dict[str, Any]],
+) -> List[BatchResponseItem]:
+    """Execute `items` in order, running each run of consecutive GETs concurrently."""
+    semaphore = asyncio.Semaphore(concurrency_limit())
+
+    async def run_bounded(item: BatchRequestItem) -> BatchResponseItem:
+        async with semaphore:
+            return await run_call(app, parent, item, claims)
+
+    results: List[BatchResponseItem] = []
+    start = 0
+    while start < len(items):
+        end = start + 1
+        if items[start].method == "GET":
+            while end < len(items) and items[end].method == "GET":
+                end += 1
+        results += await asyncio.gather(*(run_bounded(item) for item in items[start:end]))
+        start = end
+    return results
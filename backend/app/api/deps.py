@@ -1,57 +1,90 @@
 """
 Dependencias comunes para los endpoints de la API.
 """
-from typing import Generator
+from functools import lru_cache
+from typing import Any, Mapping, Optional
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.security.utils import get_authorization_scheme_param
 from jose import jwt
-from pydantic import ValidationError
 from sqlalchemy.orm import Session
+from starlette.requests import HTTPConnection
 
+from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.rate_limit import Limit, limiter
+from app.db.session import get_db
 from app.models.user import User
+from app.services import revocation
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token"
 )
 
-
-def get_db() -> Generator:
-    """
-    Obtener una sesión de base de datos.
-    """
-    try:
-        db = SessionLocal()
-        yield db
-    finally:
-        db.close()
+# Claims ya verificados que ``/batch`` deja en el scope de sus subpeticiones.
+# Solo el servidor escribe el scope ASGI, así que un cliente no puede fijarlo.
+AUTH_CLAIMS_SCOPE_KEY = "auth_claims"
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> User:
+def verify_token(token: str, db: Optional[Session] = None) -> Mapping[str, Any]:
     """
-    Obtener el usuario actual a partir del token JWT.
+    Verificar un token de acceso y comprobar que no está revocado.
+
+    Devuelve sus claims; lanza ``HTTPException`` si no es válido.
     """
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError) as e:
+        payload = security.decode_access_token(token)
+        if payload.get("user_id") is None:
+            raise jwt.JWTError("Token sin usuario")
+    except jwt.JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No se pudo validar el token",
         ) from e
-    
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    if revocation.store.is_revoked(payload, db=db):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revocado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+
+def _load_user(db: Session, claims: Mapping[str, Any]) -> User:
+    user = db.get(User, claims["user_id"])
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     return user
 
 
+def user_from_token(db: Session, token: str) -> User:
+    """Usuario de un token de acceso, fuera de una petición HTTP (p. ej. websockets)."""
+    return _load_user(db, verify_token(token, db))
+
+
+def get_current_user(
+    connection: HTTPConnection,
+    db: Session = Depends(get_db),
+    token: str = Depends(reusable_oauth2),
+) -> User:
+    """
+    Obtener el usuario actual a partir del token JWT.
+
+    Es la única dependencia de autenticación de la API. FastAPI la resuelve
+    una sola vez por petición y comparte con el endpoint la sesión de
+    ``get_db``; el usuario queda en el mapa de identidad de esa sesión, así
+    que el endpoint no necesita volver a consultarlo.
+
+    Las subpeticiones de ``/batch`` llegan con el token ya verificado por la
+    petición que las agrupa (``AUTH_CLAIMS_SCOPE_KEY``) y no lo repiten.
+    """
+    claims = connection.scope.get(AUTH_CLAIMS_SCOPE_KEY)
+    if claims is None:
+        claims = verify_token(token, db)
+    return _load_user(db, claims)
+
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -74,3 +107,93 @@ def get_current_superuser(
             status_code=400, detail="El usuario no tiene suficientes privilegios"
         )
     return current_user
+
+
+@lru_cache(maxsize=None)
+def _limit(value: str) -> Limit:
+    return Limit.parse(value)
+
+
+def client_ip(request: Request) -> str:
+    """
+    Obtener la IP del cliente, tomando X-Forwarded-For solo si el proxy es de confianza.
+
+    Cada proxy añade a la derecha la dirección de la que recibió la petición,
+    así que solo son fiables las ``RATE_LIMIT_TRUSTED_PROXY_HOPS`` entradas
+    de la derecha; lo que haya a su izquierda lo pone el cliente. Si la
+    cabecera trae menos entradas que proxies, se usa la conexión directa.
+    """
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        hops = settings.RATE_LIMIT_TRUSTED_PROXY_HOPS
+        forwarded = [
+            entry.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for entry in header.split(",")
+            if entry.strip()
+        ]
+        if hops > 0 and len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+def enforce_rate_limit(scope: str, identity: str, limit: str) -> None:
+    """
+    Registrar una petición y responder 429 si supera el límite.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    allowed, retry_after = limiter.hit(scope, identity, _limit(limit))
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiadas peticiones, inténtalo más tarde",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+def rate_limit_login(
+    request: Request, form_data: OAuth2PasswordRequestForm = Depends()
+) -> None:
+    """
+    Limitar los intentos de login por IP y por email antes de verificar la contraseña.
+
+    FastAPI reutiliza el mismo formulario en el endpoint, por lo que no se lee dos veces.
+    """
+    enforce_rate_limit("login_ip", client_ip(request), settings.RATE_LIMIT_LOGIN_PER_IP)
+    enforce_rate_limit(
+        "login_email", form_data.username.strip().lower(), settings.RATE_LIMIT_LOGIN_PER_EMAIL
+    )
+
+
+def rate_limit_register(request: Request) -> None:
+    """
+    Limitar los registros por IP.
+    """
+    enforce_rate_limit("register_ip", client_ip(request), settings.RATE_LIMIT_REGISTER_PER_IP)
+
+
+def rate_limit_refresh(request: Request) -> None:
+    """
+    Limitar las renovaciones de token por IP.
+    """
+    enforce_rate_limit("refresh_ip", client_ip(request), settings.RATE_LIMIT_REFRESH_PER_IP)
+
+
+def rate_limit_writes(request: Request) -> None:
+    """
+    Limitar las peticiones de escritura por usuario (o por IP si no hay token válido).
+
+    El usuario se obtiene del token sin consultar la base de datos.
+    """
+    if request.method in ("GET", "HEAD", "OPTIONS"):
+        return
+    identity = f"ip:{client_ip(request)}"
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = security.decode_access_token(token)
+            if payload.get("user_id") is not None:
+                identity = f"user:{payload['user_id']}"
+        except jwt.JWTError:
+            pass
+    enforce_rate_limit("writes", identity, settings.RATE_LIMIT_WRITES_PER_USER)
@@ -0,0 +1,88 @@
+"""
+Sparse fieldsets for the list endpoints.
+
+List endpoints accept `fields=title,budget,status`: only those columns (plus
+`id`) are selected from the database and the response items carry only
+those keys. Without `fields` the endpoint returns its full response model.
+"""
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Type
+
+from fastapi import Query, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+from app.db.base_class import Base
+
+FieldSet = Optional[Tuple[str, ...]]
+
+
+def selectable_fields(schema: Type[BaseModel], model: Type[Base]) -> List[str]:
+    """Fields of `schema` backed by a column of `model`, in schema order."""
+    columns = set(model.__table__.columns.keys())
+    return [name for name in schema.model_fields if name in columns]
+
+
+def fields_query(schema: Type[BaseModel], model: Type[Base]) -> Callable[..., FieldSet]:
+    """Dependency reading the `fields` query parameter of a list of `schema`."""
+    allowed = selectable_fields(schema, model)
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None,
+            description=(
+                "Comma-separated fields to return (`id` is always included). "
+                f"One of: {', '.join(allowed)}."
+            ),
+        ),
+    ) -> FieldSet:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested - set(allowed))
+        if unknown:
+            raise RequestValidationError(
+                [
+                    {
+                        "type": "value_error",
+                        "loc": ("query", "fields"),
+                        "msg": f"Unknown fields: {', '.join(unknown)}",
+                        "input": fields,
+                    }
+                ]
+            )
+        return ("id",) + tuple(name for name in allowed if name in requested and name != "id")
+
+    return dependency
+
+
+# Fieldsets are chosen by clients, so only the most recently used are kept
+@lru_cache(maxsize=256)
+def _adapter(schema: Type[BaseModel], fields: Tuple[str, ...]) -> TypeAdapter:
+    """Serializer for lists of `schema` restricted to `fields`, built once per set."""
+    slim = create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields},
+    )
+    return TypeAdapter(List[slim])
+
+
+def sparse_response(
+    items: Sequence[Any], schema: Type[BaseModel], fields: FieldSet, response: Response
+) -> Any:
+    """Return `items` as-is, or serialized down to `fields` when a fieldset was requested.
+
+    Headers already set on `response` (such as the list totals) are kept.
+    """
+    if fields is None:
+        return items
+    adapter = _adapter(schema, fields)
+    headers = {
+        name: value for name, value in response.headers.items() if name != "content-length"
+    }
+    return Response(
+        adapter.dump_json(adapter.validate_python(items, from_attributes=True)),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,17 @@
+"""
+Total-count headers of the paginated list endpoints.
+
+List endpoints accept `include_total`; the total then travels in headers so
+that the response body stays a plain list.
+"""
+from fastapi import Response
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_ESTIMATED_HEADER = "X-Total-Count-Estimated"
+TOTAL_HEADERS = [TOTAL_COUNT_HEADER, TOTAL_ESTIMATED_HEADER]
+
+
+def set_total_headers(response: Response, total: int, estimated: bool) -> None:
+    """Publish a list total; `estimated` flags planner estimates and cached totals."""
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+    response.headers[TOTAL_ESTIMATED_HEADER] = "true" if estimated else "false"
@@ -0,0 +1,124 @@
+"""
+Interpretación de presupuestos escritos como texto libre.
+
+Los anuncios guardan su presupuesto como ``budget_min``/``budget_max`` y
+``budget_currency`` para poder filtrar y ordenar por precio en SQL. Los
+clientes que siguen enviando solo el texto (``"1.500 - 3.000 €"``, ``"$2k"``,
+``"hasta 800 USD"``) pasan por ``parse_budget``, que extrae el rango; lo que
+no se entiende, o admite más de una lectura, se deja sin rango y el texto se
+conserva tal cual.
+"""
+import re
+from decimal import Decimal, InvalidOperation
+from typing import List, NamedTuple, Optional, Tuple
+
+DEFAULT_CURRENCY = "USD"
+
+_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY"}
+_CODE = re.compile(r"\b([A-Za-z]{3})\b")
+_NUMBER = re.compile(r"(\d[\d.,\s]*\d|\d)\s*([kKmM])?(?![A-Za-z])")
+_UPPER_ONLY = re.compile(r"\b(hasta|up to|max(?:imo|imum)?|máx(?:imo)?|menos de|under|below)\b|<", re.I)
+_LOWER_ONLY = re.compile(r"\b(desde|from|min(?:imo|imum)?|mín(?:imo)?|más de|over|above)\b|>|\+\s*$", re.I)
+_KNOWN_CODES = {
+    "USD", "EUR", "GBP", "JPY", "MXN", "ARS", "COP", "CLP", "PEN", "BRL",
+    "CAD", "AUD", "CHF", "UYU", "BOB", "PYG", "VES", "CRC", "GTQ", "DOP",
+}
+_MONEY = "|".join([re.escape(symbol) for symbol in _SYMBOLS] + sorted(_KNOWN_CODES))
+# Lo que puede separar los dos extremos de un rango: "1.500 - 3.000", "$2k-$5k",
+# "500 USD a 800 USD", "entre 500 y 800"
+_RANGE_SEPARATOR = re.compile(
+    rf"\s*(?:{_MONEY})?\s*(?:-|–|—|a|y|to|and|hasta)\s*(?:{_MONEY})?\s*", re.I
+)
+# budget_min y budget_max son Numeric(12, 2)
+_MAX_AMOUNT = Decimal(10) ** 10
+
+
+class ParsedBudget(NamedTuple):
+    minimum: Optional[Decimal]
+    maximum: Optional[Decimal]
+    currency: Optional[str]
+
+
+def _to_decimal(raw: str, suffix: Optional[str]) -> Optional[Decimal]:
+    digits = re.sub(r"\s", "", raw)
+    if "," in digits and "." in digits:
+        # El último separador es el decimal: "1.500,50" o "1,500.50"
+        decimal_sep = "," if digits.rfind(",") > digits.rfind(".") else "."
+        thousands_sep = "." if decimal_sep == "," else ","
+        digits = digits.replace(thousands_sep, "").replace(decimal_sep, ".")
+    else:
+        for sep in (",", "."):
+            if sep in digits:
+                groups = digits.split(sep)
+                if len(groups) > 2 or all(len(group) == 3 for group in groups[1:]):
+                    digits = digits.replace(sep, "")  # Separador de miles
+                else:
+                    digits = digits.replace(sep, ".")
+    try:
+        value = Decimal(digits)
+    except InvalidOperation:
+        return None
+    if suffix:
+        value *= 1_000 if suffix.lower() == "k" else 1_000_000
+    return value
+
+
+def _currency(text: str) -> Optional[str]:
+    for symbol, code in _SYMBOLS.items():
+        if symbol in text:
+            return code
+    for match in _CODE.finditer(text):
+        code = match.group(1).upper()
+        if code in _KNOWN_CODES:
+            return code
+    return None
+
+
+def parse_budget(text: Optional[str]) -> ParsedBudget:
+    """Extraer ``(mínimo, máximo, moneda)`` de un presupuesto en texto libre.
+
+    Un solo importe es un rango cerrado de un valor, salvo que vaya precedido
+    de "hasta"/"desde" o equivalentes, que dejan abierto el otro extremo. Dos
+    importes son un rango solo si los une un separador de rango
+    (``_RANGE_SEPARATOR``). Se devuelven ``None`` si no hay importes
+    reconocibles, si hay más de los que forman un rango (``"2024 project,
+    500 USD"``) o si alguno no cabe en las columnas del rango.
+    """
+    empty = ParsedBudget(None, None, None)
+    if not text or not text.strip():
+        return empty
+    amounts: List[Decimal] = []
+    spans: List[Tuple[int, int]] = []
+    for match in _NUMBER.finditer(text):
+        value = _to_decimal(match.group(1), match.group(2))
+        if value is not None:
+            amounts.append(value)
+            spans.append(match.span())
+    if not amounts or len(amounts) > 2 or max(amounts) >= _MAX_AMOUNT:
+        return empty
+    currency = _currency(text) or DEFAULT_CURRENCY
+    if len(amounts) == 2:
+        if not _RANGE_SEPARATOR.fullmatch(text, spans[0][1], spans[1][0]):
+            return empty
+        return ParsedBudget(min(amounts), max(amounts), currency)
+    if _UPPER_ONLY.search(text):
+        return ParsedBudget(None, amounts[0], currency)
+    if _LOWER_ONLY.search(text):
+        return ParsedBudget(amounts[0], None, currency)
+    return ParsedBudget(amounts[0], amounts[0], currency)
+
+
+def format_budget(
+    minimum: Optional[Decimal], maximum: Optional[Decimal], currency: Optional[str]
+) -> Optional[str]:
+    """Texto de presupuesto para los clientes que solo leen ``budget``."""
+    if minimum is None and maximum is None:
+        return None
+    code = currency or DEFAULT_CURRENCY
+    if minimum is None:
+        return f"up to {maximum:,.2f} {code}"
+    if maximum is None:
+        return f"from {minimum:,.2f} {code}"
+    if minimum == maximum:
+        return f"{minimum:,.2f} {code}"
+    return f"{minimum:,.2f} - {maximum:,.2f} {code}"
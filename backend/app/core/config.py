@@ -1,10 +1,12 @@
 """
 Configuración de la aplicación.
 """
+import hashlib
+import hmac
 import secrets
 from typing import List, Optional, Union, Dict, Any
 
-from pydantic import AnyHttpUrl, EmailStr, PostgresDsn, field_validator, ConfigDict
+from pydantic import AnyHttpUrl, EmailStr, Field, PostgresDsn, field_validator, ConfigDict
 from pydantic_settings import BaseSettings
 
 
@@ -21,7 +23,20 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 días
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Sin valor propio se deriva de SECRET_KEY (ver derive_refresh_secret_key)
+    REFRESH_SECRET_KEY: Optional[str] = Field(default=None, validate_default=True)
     ALGORITHM: str = "HS256"
+
+    @field_validator("REFRESH_SECRET_KEY")
+    @classmethod
+    def derive_refresh_secret_key(cls, v: Optional[str], info) -> str:
+        # Una derivación fija (y no otro valor aleatorio) mantiene la clave igual
+        # en todos los procesos que comparten SECRET_KEY
+        if v:
+            return v
+        return hmac.new(
+            info.data["SECRET_KEY"].encode(), b"refresh-token", hashlib.sha256
+        ).hexdigest()
     
     # Configuración de la base de datos
     POSTGRES_SERVER: str = "localhost"
@@ -29,6 +44,21 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = "mercenary_db"
     SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
+    # Pool por proceso: procesos x (DB_POOL_SIZE + DB_MAX_OVERFLOW) < max_connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 300
+    DB_POOL_PRE_PING: bool = False  # Ping en cada checkout (sustituido por la comprobación periódica)
+    DB_POOL_HEALTH_CHECK_SECONDS: int = 30  # 0 desactiva la comprobación periódica
+    # Detrás de PgBouncer en modo transacción: sin pool propio ni sentencias preparadas
+    DB_PGBOUNCER: bool = False
+    DB_DIRECT_URI: Optional[str] = None  # Conexión directa para LISTEN (sin PgBouncer)
+    # Réplicas de lectura (URLs separadas por comas) para las peticiones GET/HEAD
+    DB_REPLICA_URIS: str = ""
+    DB_REPLICA_MAX_LAG_SECONDS: float = 2.0
+    DB_REPLICA_LAG_CHECK_SECONDS: int = 5
+    DB_READ_YOUR_WRITES_SECONDS: int = 5
 
     @field_validator("SQLALCHEMY_DATABASE_URI", mode='before')
     @classmethod
@@ -71,6 +101,124 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: Optional[str] = None
     EMAILS_FROM_EMAIL: Optional[EmailStr] = None
     EMAILS_FROM_NAME: Optional[str] = None
+    SMTP_TIMEOUT_SECONDS: int = 10
+
+    # Configuración de la bandeja de salida de notificaciones
+    NOTIFICATION_WORKER_ENABLED: bool = True
+    NOTIFICATION_BATCH_SIZE: int = 100
+    NOTIFICATION_POLL_INTERVAL_SECONDS: int = 10
+    NOTIFICATION_LEASE_SECONDS: int = 300
+    NOTIFICATION_MAX_ATTEMPTS: int = 8
+    NOTIFICATION_RETRY_BASE_SECONDS: int = 30
+    NOTIFICATION_RETRY_MAX_SECONDS: int = 3600
+
+    @field_validator("NOTIFICATION_LEASE_SECONDS")
+    @classmethod
+    def check_notification_lease(cls, v: int, info) -> int:
+        # Un lote deja de enviar cuando a su reserva no le queda para un envío
+        # con su reconexión; una reserva más corta no enviaría nunca
+        if v <= 2 * info.data.get("SMTP_TIMEOUT_SECONDS", 0):
+            raise ValueError("NOTIFICATION_LEASE_SECONDS debe superar 2 x SMTP_TIMEOUT_SECONDS")
+        return v
+
+    # Configuración del feed de recomendaciones
+    RECOMMENDATION_WORKER_ENABLED: bool = True
+    RECOMMENDATION_FEED_SIZE: int = 50
+    RECOMMENDATION_BATCH_SIZE: int = 500
+    RECOMMENDATION_CANDIDATE_POOL: int = 2000
+    RECOMMENDATION_REFRESH_INTERVAL_SECONDS: int = 300
+    RECOMMENDATION_MIN_REFRESH_SECONDS: int = 30
+
+    # Configuración de eventos en tiempo real
+    EVENTS_PG_BRIDGE_ENABLED: bool = True
+    EVENT_SUBSCRIBER_QUEUE_SIZE: int = 100
+    ANNOUNCEMENT_STREAM_HEARTBEAT_SECONDS: int = 15
+
+    # Configuración del chat de contratos
+    CHAT_SEND_QUEUE_SIZE: int = 256
+    CHAT_SEND_TIMEOUT_SECONDS: int = 10
+    CHAT_WRITE_QUEUE_SIZE: int = 10000
+    CHAT_BATCH_SIZE: int = 200
+    CHAT_FLUSH_INTERVAL_MS: int = 50
+    CHAT_MESSAGE_MAX_BYTES: int = 6000
+
+    # Configuración de la cola de trabajos
+    JOB_WORKER_CONCURRENCY: int = 4
+    JOB_POLL_INTERVAL_SECONDS: float = 5.0
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = 300
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: int = 10
+    JOB_RETRY_MAX_SECONDS: int = 3600
+    JOB_SCHEDULER_TICK_SECONDS: int = 30
+    JOB_RETENTION_DAYS: int = 7
+    JOB_WORKER_METRICS_PORT: int = 9101
+
+    # Configuración del limitador de peticiones ("<n>/<second|minute|hour|day>")
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORE: str = "memory"  # "memory" o "postgres" (compartido entre workers)
+    RATE_LIMIT_MEMORY_MAX_KEYS: int = 100_000
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    # Proxies de confianza delante de la API que añaden su entrada a X-Forwarded-For
+    RATE_LIMIT_TRUSTED_PROXY_HOPS: int = 1
+    RATE_LIMIT_LOGIN_PER_IP: str = "20/minute"
+    RATE_LIMIT_LOGIN_PER_EMAIL: str = "5/minute"
+    RATE_LIMIT_REGISTER_PER_IP: str = "10/hour"
+    RATE_LIMIT_REFRESH_PER_IP: str = "30/minute"
+    RATE_LIMIT_WRITES_PER_USER: str = "120/minute"
+
+    # Configuración de la revocación de tokens
+    REVOCATION_BLOOM_CAPACITY: int = 1_000_000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_SYNC_SECONDS: int = 5
+    # Secuencias por debajo de la última vista que se releen en cada sincronización,
+    # para las revocaciones que hacen commit después de otras con seq mayor
+    REVOCATION_SYNC_SEQ_WINDOW: int = 1000
+    REVOCATION_REBUILD_SECONDS: int = 3600
+
+    # Configuración de las claves de firma de los tokens de acceso (ALGORITHM=ES256)
+    JWT_KEYS_DIR: str = "keys"
+    JWT_ACTIVE_KID: Optional[str] = None  # Por defecto, el kid mayor del directorio
+    JWKS_CACHE_SECONDS: int = 300
+
+    # Configuración del hash de contraseñas (coste calibrado al arrancar)
+    PASSWORD_SCHEME: str = "bcrypt"  # bcrypt o argon2 (argon2id, requiere argon2-cffi)
+    PASSWORD_HASH_TARGET_MS: int = 250
+    PASSWORD_BCRYPT_MIN_ROUNDS: int = 12
+    PASSWORD_BCRYPT_ROUNDS: Optional[int] = None  # Fijar en lugar de calibrar
+    PASSWORD_ARGON2_MEMORY_KIB: int = 64 * 1024
+    PASSWORD_ARGON2_PARALLELISM: int = 1
+    PASSWORD_ARGON2_MIN_TIME_COST: int = 2
+    PASSWORD_ARGON2_TIME_COST: Optional[int] = None  # Fijar en lugar de calibrar
+
+    # Configuración de la caché de tokens de acceso verificados (0 la desactiva)
+    ACCESS_TOKEN_CACHE_SIZE: int = 10_000
+
+    # Configuración de los totales de los listados (include_total)
+    LIST_COUNT_EXACT_LIMIT: int = 1000  # Por encima se devuelve una estimación
+    LIST_COUNT_CACHE_SECONDS: int = 60
+
+    # Configuración de las peticiones agrupadas (/batch)
+    BATCH_MAX_REQUESTS: int = 20
+    BATCH_SUBREQUEST_TIMEOUT_SECONDS: float = 30.0
+    # GETs simultáneos de un lote; cada uno ocupa una conexión, así que se
+    # limita además a DB_POOL_SIZE - 1 para dejar sitio al resto de peticiones
+    BATCH_MAX_CONCURRENCY: int = 4
+
+    # Configuración de las exportaciones (filas leídas del cursor por lote)
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Configuración de las importaciones masivas (filas validadas por lote)
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000  # Errores de filas incluidos en el informe
+
+    # Configuración del cierre de anuncios con el plazo vencido
+    ANNOUNCEMENT_EXPIRY_INTERVAL_SECONDS: int = 300
+    ANNOUNCEMENT_EXPIRY_BATCH_SIZE: int = 500  # Anuncios cerrados por transacción
+
+    # Configuración del archivo de anuncios y contratos terminados
+    ARCHIVE_AFTER_DAYS: int = 180  # Días desde la última modificación
+    ARCHIVE_BATCH_SIZE: int = 500  # Filas movidas por transacción
+    ARCHIVE_INTERVAL_SECONDS: int = 3600
 
     # Configuración de la primera cuenta de administrador
     FIRST_SUPERUSER_EMAIL: Optional[EmailStr] = None
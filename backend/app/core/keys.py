@@ -0,0 +1,128 @@
+"""
+Claves de firma de los tokens de acceso.
+
+Con ``ALGORITHM=HS256`` (valor por defecto) los tokens se firman con
+``SECRET_KEY`` y solo la API puede verificarlos. Con ``ALGORITHM=ES256`` se
+firman con una clave privada EC P-256 y cualquier servicio puede validarlos
+localmente con las claves públicas publicadas en el JWKS.
+
+Las claves asimétricas se leen de ``JWT_KEYS_DIR``: un fichero PEM privado
+por clave, llamado ``<kid>.pem``. ``JWT_ACTIVE_KID`` elige la clave con la que
+se firma; el resto solo verifica, lo que permite rotar sin invalidar los
+tokens emitidos (se añade la clave nueva, se activa y se retira la antigua
+cuando caducan sus tokens). ``scripts/generate_jwt_key.py`` genera claves.
+
+Las claves se cargan y construyen una sola vez por proceso: verificar un
+token no vuelve a interpretar ningún PEM.
+"""
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from jose import jwk, jwt
+from jose.backends.base import Key
+from jose.exceptions import JWTError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = ("ES256",)
+SUPPORTED_ALGORITHMS = ("HS256",) + ASYMMETRIC_ALGORITHMS
+
+
+class KeySet:
+    """Clave de firma activa y claves de verificación indexadas por ``kid``.
+
+    Con claves asimétricas, las de verificación son solo las públicas.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        signing_kid: Optional[str],
+        signing_key: Key,
+        verification_keys: Dict[Optional[str], Key],
+    ):
+        self.algorithm = algorithm
+        self.signing_kid = signing_kid
+        self.signing_key = signing_key
+        self.verification_keys = verification_keys
+
+    @property
+    def asymmetric(self) -> bool:
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+
+    def jwks(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Claves públicas en formato JWK Set (vacío con HS256)."""
+        if not self.asymmetric:
+            return {"keys": []}
+        keys = []
+        for kid, key in sorted(self.verification_keys.items()):
+            public = key.to_dict()
+            public.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+            keys.append(public)
+        return {"keys": keys}
+
+
+def _load_asymmetric(algorithm: str) -> KeySet:
+    directory = Path(settings.JWT_KEYS_DIR)
+    private_keys: Dict[str, Key] = {}
+    for path in sorted(directory.glob("*.pem")):
+        private_keys[path.stem] = jwk.construct(path.read_text(), algorithm)
+    if not private_keys:
+        raise RuntimeError(f"No hay claves {algorithm} en {directory}")
+    active_kid = settings.JWT_ACTIVE_KID or max(private_keys)
+    if active_kid not in private_keys:
+        raise RuntimeError(f"La clave activa {active_kid!r} no está en {directory}")
+    public_keys: Dict[Optional[str], Key] = {
+        kid: key.public_key() for kid, key in private_keys.items()
+    }
+    return KeySet(algorithm, active_kid, private_keys[active_kid], public_keys)
+
+
+@lru_cache(maxsize=None)
+def get_key_set() -> KeySet:
+    """Cargar (una vez por proceso) las claves según ``settings.ALGORITHM``."""
+    algorithm = settings.ALGORITHM
+    if algorithm not in SUPPORTED_ALGORITHMS:
+        raise RuntimeError(
+            f"ALGORITHM={algorithm} no soportado; usa uno de {', '.join(SUPPORTED_ALGORITHMS)}"
+        )
+    # REFRESH_SECRET_KEY se deriva de SECRET_KEY; con claves EC basta con una de las dos
+    configured = settings.model_fields_set
+    if algorithm in ASYMMETRIC_ALGORITHMS:
+        unset = not configured & {"SECRET_KEY", "REFRESH_SECRET_KEY"}
+    else:
+        unset = "SECRET_KEY" not in configured
+    if unset:
+        logger.warning(
+            "SECRET_KEY no está configurada: cada proceso generará la suya y no "
+            "aceptará los tokens firmados por los demás"
+        )
+    if algorithm in ASYMMETRIC_ALGORITHMS:
+        return _load_asymmetric(algorithm)
+    key = jwk.construct(settings.SECRET_KEY, algorithm)
+    return KeySet(algorithm, None, key, {None: key})
+
+
+def sign(claims: Dict[str, Any]) -> str:
+    """Firmar un token de acceso con la clave activa."""
+    key_set = get_key_set()
+    headers = {"kid": key_set.signing_kid} if key_set.signing_kid else None
+    return jwt.encode(claims, key_set.signing_key, algorithm=key_set.algorithm, headers=headers)
+
+
+def verify(token: str) -> Dict[str, Any]:
+    """Verificar un token de acceso y devolver sus claims.
+
+    Raises:
+        JWTError: Si la firma, el ``kid`` o la expiración no son válidos.
+    """
+    key_set = get_key_set()
+    kid = jwt.get_unverified_header(token).get("kid")
+    key = key_set.verification_keys.get(kid)
+    if key is None:
+        raise JWTError("Clave de firma desconocida")
+    return jwt.decode(token, key, algorithms=[key_set.algorithm])
@@ -1,20 +1,207 @@
 """
 Utilidades para el manejo de contraseñas.
+
+Todo el hashing de contraseñas de la aplicación pasa por ``hasher``. El coste
+no es fijo: al arrancar se mide cuánto tarda este equipo y se elige el coste
+que más se acerca a ``PASSWORD_HASH_TARGET_MS`` por verificación, sin bajar
+de los mínimos configurados. Así el coste sube solo al desplegar en máquinas
+más rápidas, y los hashes antiguos (coste menor u otro algoritmo) se
+recalculan de forma transparente en el siguiente login correcto.
+
+``PASSWORD_SCHEME=argon2`` usa argon2id (requiere ``argon2-cffi``) con la
+memoria limitada a ``PASSWORD_ARGON2_MEMORY_KIB``; en ese caso se calibra el
+número de pasadas. Los hashes bcrypt existentes se siguen aceptando.
 """
+import logging
+import math
+import statistics
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
 from passlib.context import CryptContext
+from passlib.hash import argon2, bcrypt
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+SCHEMES = ("bcrypt", "argon2")
+BCRYPT_MAX_ROUNDS = 16
+ARGON2_MAX_TIME_COST = 10
+_CALIBRATION_SAMPLES = 3
+_CALIBRATION_PASSWORD = "calibration-password"
+
+PASSWORD_VERIFY_DURATION = registry.histogram(
+    "password_verify_duration_seconds",
+    "Duración de la verificación de contraseñas",
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+PASSWORD_REHASHES = registry.counter(
+    "password_rehashes_total", "Hashes de contraseña recalculados al iniciar sesión"
+)
+
+
+def _median_seconds(operation: Callable[[], object]) -> float:
+    samples = []
+    for _ in range(_CALIBRATION_SAMPLES):
+        started = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def calibrate_bcrypt_rounds(target_seconds: float, min_rounds: int) -> int:
+    """Elegir las rondas de bcrypt cuya verificación se acerca al objetivo.
+
+    Cada ronda adicional duplica el coste, así que basta con medir un coste
+    bajo y extrapolar.
+    """
+    probe_rounds = 8
+    probe = bcrypt.using(rounds=probe_rounds)
+    digest = probe.hash(_CALIBRATION_PASSWORD)
+    elapsed = _median_seconds(lambda: probe.verify(_CALIBRATION_PASSWORD, digest))
+    rounds = probe_rounds + round(math.log2(target_seconds / max(elapsed, 1e-6)))
+    return min(max(rounds, min_rounds), BCRYPT_MAX_ROUNDS)
+
+
+def calibrate_argon2_time_cost(
+    target_seconds: float, memory_kib: int, parallelism: int, min_time_cost: int
+) -> int:
+    """Elegir las pasadas de argon2id con la memoria fija en ``memory_kib``.
+
+    El coste crece de forma lineal con el número de pasadas.
+    """
+    probe = argon2.using(
+        type="ID", memory_cost=memory_kib, parallelism=parallelism, time_cost=1
+    )
+    digest = probe.hash(_CALIBRATION_PASSWORD)
+    elapsed = _median_seconds(lambda: probe.verify(_CALIBRATION_PASSWORD, digest))
+    time_cost = round(target_seconds / max(elapsed, 1e-6))
+    return min(max(time_cost, min_time_cost), ARGON2_MAX_TIME_COST)
+
+
+class PasswordHasher:
+    """Contexto de passlib con el coste calibrado para este equipo.
+
+    El contexto se construye en la primera llamada (o al arrancar la API con
+    ``calibrate``) y se reutiliza durante toda la vida del proceso.
+    """
+
+    def __init__(self) -> None:
+        self._context: Optional[CryptContext] = None
+        self._lock = threading.Lock()
+        self.parameters: Dict[str, int] = {}
+
+    @property
+    def context(self) -> CryptContext:
+        if self._context is None:
+            with self._lock:
+                if self._context is None:
+                    self._context = self._build_context()
+        return self._context
+
+    def calibrate(self) -> None:
+        """Medir el equipo y construir el contexto si aún no existe."""
+        self.context
+
+    def _build_context(self) -> CryptContext:
+        scheme = settings.PASSWORD_SCHEME
+        if scheme not in SCHEMES:
+            raise RuntimeError(
+                f"PASSWORD_SCHEME={scheme} no soportado; usa uno de {', '.join(SCHEMES)}"
+            )
+        target = settings.PASSWORD_HASH_TARGET_MS / 1000
+        started = time.perf_counter()
+        options: Dict[str, object] = {}
+
+        if scheme == "argon2":
+            if not argon2.has_backend():
+                raise RuntimeError("PASSWORD_SCHEME=argon2 requiere instalar argon2-cffi")
+            time_cost = settings.PASSWORD_ARGON2_TIME_COST or calibrate_argon2_time_cost(
+                target,
+                settings.PASSWORD_ARGON2_MEMORY_KIB,
+                settings.PASSWORD_ARGON2_PARALLELISM,
+                settings.PASSWORD_ARGON2_MIN_TIME_COST,
+            )
+            self.parameters = {
+                "time_cost": time_cost,
+                "memory_kib": settings.PASSWORD_ARGON2_MEMORY_KIB,
+            }
+            # Los hashes con menos coste o memoria se marcan para recalcular
+            options.update(
+                argon2__type="ID",
+                argon2__time_cost=time_cost,
+                argon2__memory_cost=settings.PASSWORD_ARGON2_MEMORY_KIB,
+                argon2__parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+            )
+            schemes = ["argon2", "bcrypt"]
+        else:
+            rounds = settings.PASSWORD_BCRYPT_ROUNDS or calibrate_bcrypt_rounds(
+                target, settings.PASSWORD_BCRYPT_MIN_ROUNDS
+            )
+            self.parameters = {"rounds": rounds}
+            # ``min_rounds`` hace que ``needs_update`` detecte los hashes más baratos
+            options.update(bcrypt__rounds=rounds, bcrypt__min_rounds=rounds)
+            # Seguir aceptando argon2 permite volver atrás sin bloquear cuentas
+            schemes = ["bcrypt", "argon2"] if argon2.has_backend() else ["bcrypt"]
+
+        context = CryptContext(schemes=schemes, deprecated="auto", **options)
+        logger.info(
+            "Hash de contraseñas: %s %s (calibrado en %.2fs)",
+            scheme,
+            self.parameters,
+            time.perf_counter() - started,
+        )
+        return context
+
+    def hash(self, password: str) -> str:
+        return self.context.hash(password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        with PASSWORD_VERIFY_DURATION.time():
+            return self.context.verify(password, hashed_password)
+
+    def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Verificar y, si el hash está desfasado, devolver uno nuevo.
+
+        Returns:
+            (válida, nuevo hash o None si no hay que actualizarlo)
+        """
+        with PASSWORD_VERIFY_DURATION.time():
+            valid, new_hash = self.context.verify_and_update(password, hashed_password)
+        if new_hash is not None:
+            PASSWORD_REHASHES.inc()
+        return valid, new_hash
+
+    def needs_update(self, hashed_password: str) -> bool:
+        return self.context.needs_update(hashed_password)
+
+
+hasher = PasswordHasher()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verificar una contraseña contra un hash.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return hasher.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """
     Obtener el hash de una contraseña.
     """
-    return pwd_context.hash(password)
+    return hasher.hash(password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verificar una contraseña y obtener un hash nuevo si el actual está desfasado.
+    """
+    return hasher.verify_and_update(plain_password, hashed_password)
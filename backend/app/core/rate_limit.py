@@ -0,0 +1,214 @@
+"""
+Limitación de peticiones por ventana deslizante.
+
+Cada límite se expresa como ``"<n>/<periodo>"`` (p. ej. ``"5/minute"``). El
+contador de ventana deslizante guarda solo dos números por clave (la ventana
+actual y la anterior) y estima las peticiones del último periodo ponderando
+la anterior por la fracción que aún se solapa, con lo que el coste por
+petición es O(1) y no depende del tráfico.
+
+Hay dos almacenes: ``MemoryStore``, por proceso y sin E/S, y
+``PostgresStore``, compartido entre workers mediante una tabla UNLOGGED. Si
+el almacén compartido falla, se deja pasar la petición (fail-open) para que
+la base de datos no se convierta en un punto único de fallo del login.
+"""
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy import delete, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import engine
+from app.models.rate_limit import RateLimitCounter
+from app.services import jobs
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+RATE_LIMIT_REJECTIONS = registry.counter(
+    "rate_limit_rejections_total", "Peticiones rechazadas por límite de frecuencia", ["scope"]
+)
+RATE_LIMIT_STORE_ERRORS = registry.counter(
+    "rate_limit_store_errors_total", "Errores del almacén compartido de límites"
+)
+
+
+class Limit(NamedTuple):
+    """Número máximo de peticiones por periodo en segundos."""
+
+    amount: int
+    period: int
+
+    @classmethod
+    def parse(cls, value: str) -> "Limit":
+        """Interpretar ``"<n>/<periodo>"``, con periodo second/minute/hour/day."""
+        try:
+            amount, period = value.split("/", 1)
+            return cls(int(amount), PERIODS[period.strip().rstrip("s")])
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"Límite inválido: {value!r}") from e
+
+
+def _window(now: float, period: int) -> Tuple[int, float]:
+    """Inicio de la ventana actual y fracción transcurrida de ella."""
+    start = int(now // period) * period
+    return start, (now - start) / period
+
+
+def _estimate(current: int, previous: int, elapsed: float) -> float:
+    return current + previous * (1.0 - elapsed)
+
+
+def _retry_after(current: int, previous: int, elapsed: float, limit: Limit) -> int:
+    """Segundos hasta que la estimación baje del límite."""
+    if previous and current < limit.amount:
+        # Espera a que el peso de la ventana anterior caiga lo suficiente
+        needed = 1.0 - (limit.amount - current - 1) / previous
+        return max(1, math.ceil((needed - elapsed) * limit.period))
+    return max(1, math.ceil((1.0 - elapsed) * limit.period))
+
+
+class MemoryStore:
+    """Contadores en memoria del proceso.
+
+    Las claves caducadas se eliminan por barrido cuando el diccionario supera
+    ``RATE_LIMIT_MEMORY_MAX_KEYS``, acotando la memoria ante claves aleatorias.
+    """
+
+    def __init__(self, max_keys: Optional[int] = None) -> None:
+        self.max_keys = max_keys or settings.RATE_LIMIT_MEMORY_MAX_KEYS
+        self._counters: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: Limit, now: Optional[float] = None) -> Tuple[bool, int]:
+        now = time.time() if now is None else now
+        start, elapsed = _window(now, limit.period)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                if len(self._counters) >= self.max_keys:
+                    self._prune(now)
+                counter = self._counters[key] = [start, 0, 0, limit.period]
+            elif counter[0] != start:
+                # Avanzar la ventana; si pasó más de una, la anterior está vacía
+                counter[2] = counter[1] if start - counter[0] == limit.period else 0
+                counter[0], counter[1] = start, 0
+            current, previous = int(counter[1]), int(counter[2])
+            if _estimate(current + 1, previous, elapsed) > limit.amount:
+                return False, _retry_after(current, previous, elapsed, limit)
+            counter[1] += 1
+            return True, 0
+
+    def _prune(self, now: float) -> None:
+        expired = [
+            key for key, (start, _, _, period) in self._counters.items()
+            if now - start >= 2 * period
+        ]
+        for key in expired:
+            del self._counters[key]
+        if len(self._counters) >= self.max_keys:
+            # Todo sigue vigente: descartar la mitad más antigua
+            oldest = sorted(self._counters, key=lambda key: self._counters[key][0])
+            for key in oldest[: len(oldest) // 2]:
+                del self._counters[key]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+class PostgresStore:
+    """Contadores compartidos en la tabla ``rate_limit_counters``.
+
+    Cada petición es una única sentencia (upsert de la ventana actual y
+    lectura de la anterior) con su propia conexión, fuera de la sesión de la
+    petición. A diferencia de ``MemoryStore``, las peticiones rechazadas
+    también cuentan, de modo que un cliente que insiste sigue bloqueado.
+    """
+
+    _HIT = text(
+        """
+        WITH hit AS (
+            INSERT INTO rate_limit_counters (key, window_start, count)
+            VALUES (:key, :window_start, 1)
+            ON CONFLICT (key, window_start)
+            DO UPDATE SET count = rate_limit_counters.count + 1
+            RETURNING count
+        )
+        SELECT
+            (SELECT count FROM hit),
+            COALESCE(
+                (SELECT count FROM rate_limit_counters
+                 WHERE key = :key AND window_start = :previous_start),
+                0
+            )
+        """
+    )
+
+    def __init__(self, bind: Engine = engine) -> None:
+        self.engine = bind
+
+    def hit(self, key: str, limit: Limit, now: Optional[float] = None) -> Tuple[bool, int]:
+        now = time.time() if now is None else now
+        start, elapsed = _window(now, limit.period)
+        try:
+            with self.engine.connect() as conn:
+                current, previous = conn.execute(
+                    self._HIT,
+                    {"key": key, "window_start": start, "previous_start": start - limit.period},
+                ).one()
+                conn.commit()
+        except SQLAlchemyError:
+            RATE_LIMIT_STORE_ERRORS.inc()
+            logger.exception("Error en el almacén de límites; se permite la petición")
+            return True, 0
+        # ``current`` ya incluye esta petición
+        if _estimate(current, previous, elapsed) > limit.amount:
+            return False, _retry_after(current - 1, previous, elapsed, limit)
+        return True, 0
+
+
+class RateLimiter:
+    """Aplica límites con nombre de ámbito sobre un almacén."""
+
+    def __init__(self, store: Union[MemoryStore, PostgresStore]) -> None:
+        self.store = store
+
+    def hit(self, scope: str, identity: str, limit: Limit) -> Tuple[bool, int]:
+        """Registrar una petición; devuelve (permitida, segundos de espera)."""
+        allowed, retry_after = self.store.hit(f"{scope}:{identity}", limit)
+        if not allowed:
+            RATE_LIMIT_REJECTIONS.inc(scope=scope)
+        return allowed, retry_after
+
+
+def _create_store() -> Union[MemoryStore, PostgresStore]:
+    if settings.RATE_LIMIT_STORE == "postgres":
+        return PostgresStore()
+    if settings.RATE_LIMIT_STORE != "memory":
+        raise ValueError(f"RATE_LIMIT_STORE desconocido: {settings.RATE_LIMIT_STORE}")
+    return MemoryStore()
+
+
+limiter = RateLimiter(_create_store())
+
+
+PURGE_RATE_LIMIT_COUNTERS = "rate_limit.purge_counters"
+
+
+@jobs.job(PURGE_RATE_LIMIT_COUNTERS)
+def purge_counters(db: Session, payload: Dict[str, Any]) -> None:
+    """Borrar las ventanas del almacén compartido que ya no afectan a ningún límite."""
+    cutoff = int(time.time()) - 2 * max(PERIODS.values())
+    db.execute(delete(RateLimitCounter).where(RateLimitCounter.window_start < cutoff))
+
+
+jobs.periodic(PURGE_RATE_LIMIT_COUNTERS, every=3600)
@@ -1,26 +1,39 @@
 """
 Utilidades de seguridad como autenticación y generación de tokens JWT.
+
+La dependencia que resuelve el usuario de una petición está en
+``app.api.deps``; este módulo no abre sesiones de base de datos.
 """
+import uuid
 from datetime import datetime, timedelta
-from typing import Any, Optional, TypeVar, Union
+from typing import Any, Mapping, Optional, Union
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from pydantic import EmailStr
+from pydantic import EmailStr, ValidationError
 from sqlalchemy.orm import Session
 
+from app.core import keys
 from app.core.config import settings
-from app.core.password_utils import verify_password, get_password_hash
-from app.db.session import get_db
+from app.core.password_utils import (
+    get_password_hash,
+    verify_and_update_password,
+    verify_password,
+)
+from app.core.token_cache import TokenCache
+from app.schemas.token import TokenPayload
+
+# Payloads de tokens de acceso ya verificados, compartidos por todo el proceso
+token_cache = TokenCache(settings.ACCESS_TOKEN_CACHE_SIZE)
 
-try:
-    from app.models.user import User  # Avoid circular import
-except ImportError:
-    User = TypeVar('User')  # Type stub for when User is not available
+# Los refresh tokens solo los verifica esta API: siempre HMAC con su propia clave
+REFRESH_ALGORITHM = "HS256"
 
-# Esquema OAuth2 para manejar tokens de autenticación
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+
+def new_token_id() -> str:
+    """
+    Generar un identificador aleatorio para ``jti`` o para una familia de tokens.
+    """
+    return uuid.uuid4().hex
 
 
 def create_access_token(
@@ -28,59 +41,95 @@ def create_access_token(
     user_id: int,
     user_role: str,
     expires_delta: Optional[timedelta] = None,
+    family_id: Optional[str] = None,
 ) -> str:
     """
-    Crear un token de acceso JWT.
+    Crear un token de acceso JWT firmado con la clave activa (ver ``keys``).
+
+    ``family_id`` liga el token a la sesión de su refresh token, de modo que
+    revocar la sesión invalida también los tokens de acceso emitidos en ella.
     """
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(
+        expire = now + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     
     to_encode = {
         "exp": expire,
+        "iat": now,
+        "jti": new_token_id(),
         "sub": str(subject),
         "user_id": user_id,
         "user_role": user_role,
         "token_type": "access",
     }
+    if family_id:
+        to_encode["fid"] = family_id
     
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
-    return encoded_jwt
+    return keys.sign(to_encode)
 
 
 def create_refresh_token(
     subject: Union[str, Any],
     user_id: int,
     expires_delta: Optional[timedelta] = None,
+    family_id: Optional[str] = None,
 ) -> str:
     """
     Crear un token de actualización JWT.
+
+    Cada token lleva un ``jti`` único (se rota en cada uso) y el ``fid`` de
+    la familia a la que pertenece; sin ``family_id`` se inicia una nueva.
     """
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(
+        expire = now + timedelta(
             days=settings.REFRESH_TOKEN_EXPIRE_DAYS
         )
     
     to_encode = {
         "exp": expire,
+        "iat": now,
+        "jti": new_token_id(),
+        "fid": family_id or new_token_id(),
         "sub": str(subject),
         "user_id": user_id,
         "token_type": "refresh",
     }
     
     encoded_jwt = jwt.encode(
-        to_encode, settings.REFRESH_SECRET_KEY, algorithm=settings.ALGORITHM
+        to_encode, settings.REFRESH_SECRET_KEY, algorithm=REFRESH_ALGORITHM
     )
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> Mapping[str, Any]:
+    """
+    Verificar la firma, la expiración y el formato de un token de acceso.
+
+    El payload verificado se guarda en ``token_cache`` hasta su ``exp``, así
+    que las siguientes peticiones con el mismo token no repiten el trabajo.
+    El resultado es de solo lectura porque se comparte entre peticiones.
+
+    Raises:
+        JWTError: Si el token no es válido.
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    payload = keys.verify(token)
+    try:
+        TokenPayload.model_validate(payload)
+    except ValidationError as e:
+        raise JWTError("Payload del token inválido") from e
+    return token_cache.put(token, payload)
+
+
 # Password functions moved to password_utils.py to avoid circular imports
 
 
@@ -88,8 +137,8 @@ def get_user_by_email(db: Session, email: EmailStr) -> Optional[Any]:
     """
     Obtener un usuario por su correo electrónico.
     """
-    from app.models.user import User  # Import here to avoid circular imports
-    return db.query(User).filter(User.email == email).first()
+    from app.crud.user import user  # Import here to avoid circular imports
+    return user.get_by_email(db, email=email)
 
 
 def authenticate_user(
@@ -97,48 +146,18 @@ def authenticate_user(
 ) -> Optional[Any]:
     """
     Autenticar un usuario con correo electrónico y contraseña.
+
+    Si el hash guardado usa un coste o algoritmo desfasado, se sustituye por
+    uno nuevo aprovechando que se conoce la contraseña.
     """
     user = get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        db.commit()
     return user
 
-
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    """
-    Obtener el usuario actual a partir del token JWT.
-    """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudieron validar las credenciales",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    try:
-        # Decodificar el token JWT
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        
-        # Obtener el ID de usuario del token
-        user_id = payload.get("user_id")
-        if user_id is None:
-            raise credentials_exception
-            
-    except JWTError:
-        raise credentials_exception
-    
-    # Obtener el usuario de la base de datos
-    from app.models.user import User
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
-        
-    return user
@@ -0,0 +1,85 @@
+"""
+Caché de tokens de acceso ya verificados.
+
+Un cliente reutiliza el mismo token de acceso en cientos de peticiones. La
+caché guarda, por digest del token, el payload ya verificado y validado
+hasta su ``exp``, de modo que las peticiones siguientes no repiten la
+verificación de la firma ni la validación del payload.
+
+Es un LRU acotado por ``ACCESS_TOKEN_CACHE_SIZE`` entradas. La revocación no
+pasa por aquí: se sigue comprobando en cada petición con el filtro de
+``revocation``, así que cerrar una sesión surte efecto inmediatamente.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+
+from app.core.metrics import registry
+
+TOKEN_CACHE_LOOKUPS = registry.counter(
+    "access_token_cache_lookups_total",
+    "Búsquedas en la caché de tokens de acceso por resultado (hit, miss, expired)",
+    ["result"],
+)
+TOKEN_CACHE_SIZE = registry.gauge(
+    "access_token_cache_entries", "Tokens de acceso verificados en la caché de este proceso"
+)
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
+class TokenCache:
+    """LRU de payloads verificados indexado por digest del token."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[float, Mapping[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Mapping[str, Any]]:
+        """Payload del token si está en caché y no ha caducado."""
+        if self.max_entries <= 0:
+            return None
+        key = token_digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                TOKEN_CACHE_LOOKUPS.inc(result="miss")
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                TOKEN_CACHE_SIZE.set(len(self._entries))
+                TOKEN_CACHE_LOOKUPS.inc(result="expired")
+                return None
+            self._entries.move_to_end(key)
+        TOKEN_CACHE_LOOKUPS.inc(result="hit")
+        return payload
+
+    def put(self, token: str, payload: Mapping[str, Any]) -> Mapping[str, Any]:
+        """Guardar un payload verificado; devuelve su versión de solo lectura.
+
+        Los tokens sin ``exp`` no se guardan.
+        """
+        frozen = MappingProxyType(dict(payload))
+        expires_at = payload.get("exp")
+        if self.max_entries <= 0 or not isinstance(expires_at, (int, float)):
+            return frozen
+        key = token_digest(token)
+        with self._lock:
+            self._entries[key] = (float(expires_at), frozen)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            TOKEN_CACHE_SIZE.set(len(self._entries))
+        return frozen
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            TOKEN_CACHE_SIZE.set(0)
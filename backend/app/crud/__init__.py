@@ -6,6 +6,7 @@ from .user import user
 from .announcement import announcement
 from .category import category
 from .contract import contract
+from .message import message
 
 # Re-exportar las operaciones CRUD para que estén disponibles directamente desde app.crud
-__all__ = ["user", "announcement", "category", "contract", "CRUDBase"]
+__all__ = ["user", "announcement", "category", "contract", "message", "CRUDBase"]
@@ -1,52 +1,360 @@
 """
 CRUD operations for the Announcement model.
 """
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Numeric, bindparam, func, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 
+from app.core.budget import DEFAULT_CURRENCY, format_budget, parse_budget
 from app.crud.base import CRUDBase
-from app.models.announcement import Announcement, AnnouncementStatus
-from app.schemas.announcement import AnnouncementCreate, AnnouncementUpdate
+from app.db.estimate import count_total
+from app.models.announcement import (
+    Announcement,
+    RANGE_BOUNDS,
+    AnnouncementStatus,
+    budget_range,
+    has_budget,
+)
+from app.models.archive import announcements_archive
+from app.models.recommendation import RecommendationFeedEntry
+from app.schemas.announcement import (
+    AnnouncementCreate,
+    AnnouncementFilter,
+    AnnouncementSort,
+    AnnouncementUpdate,
+)
+from app.services import counters, events
+from app.services.recommendations import feed_refresher
+
+ANNOUNCEMENTS_CHANNEL = events.bridge.register_channel("announcements")
+
+# Fields sent in real-time events; the description is left out to stay well
+# under the NOTIFY payload limit.
+EVENT_FIELDS = (
+    "id",
+    "title",
+    "budget",
+    "budget_min",
+    "budget_max",
+    "budget_currency",
+    "deadline",
+    "status",
+    "category_id",
+    "offerer_id",
+    "created_at",
+    "updated_at",
+)
+
+
+BUDGET_RANGE_FIELDS = ("budget_min", "budget_max", "budget_currency")
+
+_ORDERINGS = {
+    AnnouncementSort.created_at: lambda a: (a.created_at.asc(), a.id.asc()),
+    AnnouncementSort.created_at_desc: lambda a: (a.created_at.desc(), a.id.desc()),
+    AnnouncementSort.budget: lambda a: (a.budget_min.asc().nulls_last(), a.id.asc()),
+    AnnouncementSort.budget_desc: lambda a: (a.budget_max.desc().nulls_last(), a.id.desc()),
+    AnnouncementSort.deadline: lambda a: (a.deadline.asc().nulls_last(), a.id.asc()),
+    AnnouncementSort.deadline_desc: lambda a: (a.deadline.desc().nulls_last(), a.id.desc()),
+}
+
+# One SQL predicate per list criterion, each reading its value from a bind
+# parameter of the same name. The budget bounds form a single criterion.
+# Each takes the entity to filter: the model, or the model over the archive
+# (see `CRUDBase._source`).
+_CRITERIA = {
+    "status": lambda a: a.status.in_(bindparam("status", expanding=True)),
+    "category_id": lambda a: a.category_id.in_(bindparam("category_id", expanding=True)),
+    "offerer_id": lambda a: a.offerer_id == bindparam("offerer_id"),
+    "deadline_after": lambda a: a.deadline >= bindparam("deadline_after"),
+    "deadline_before": lambda a: a.deadline < bindparam("deadline_before"),
+    "created_after": lambda a: a.created_at >= bindparam("created_after"),
+    "created_before": lambda a: a.created_at < bindparam("created_before"),
+    "budget": lambda a: has_budget(a)
+    & budget_range(a).op("&&")(
+        func.numrange(
+            bindparam("min_budget", type_=Numeric()),
+            bindparam("max_budget", type_=Numeric()),
+            RANGE_BOUNDS,
+        )
+    ),
+    "currency": lambda a: a.budget_currency == bindparam("currency"),
+}
+
+
+def _filter_shape(filters: AnnouncementFilter) -> Tuple[Tuple[str, ...], Dict[str, Any]]:
+    """Names of the criteria set in `filters` and their bind parameters."""
+    params = filters.model_dump(exclude_none=True)
+    names = [name for name in _CRITERIA if name in params]
+    if "min_budget" in params or "max_budget" in params:
+        names.append("budget")
+        params.setdefault("min_budget", None)
+        params.setdefault("max_budget", None)
+    return tuple(sorted(names)), params
+
+
+def _filter_criteria(shape: Tuple[str, ...], source: Any = Announcement) -> List[Any]:
+    return [_CRITERIA[name](source) for name in shape]
+
+
+def _open_category(db_obj: Announcement) -> Optional[int]:
+    """Category whose open-announcement counter includes `db_obj`, if any."""
+    if db_obj.status == AnnouncementStatus.OPEN:
+        return db_obj.category_id
+    return None
+
+
+def sync_budget(db_obj: Any, changed: Iterable[str]) -> None:
+    """Keep the free-form budget and the structured range consistent.
+
+    A change to `budget` alone re-parses the range from it; a change to the
+    range alone rewrites `budget` for clients that only read the text.
+    `db_obj` may be any object with the budget attributes (bulk imports
+    pass plain rows).
+    """
+    changed = set(changed)
+    if "budget" in changed and not changed & set(BUDGET_RANGE_FIELDS):
+        parsed = parse_budget(db_obj.budget)
+        db_obj.budget_min, db_obj.budget_max = parsed.minimum, parsed.maximum
+        db_obj.budget_currency = parsed.currency
+    elif changed & set(BUDGET_RANGE_FIELDS) and "budget" not in changed:
+        db_obj.budget = format_budget(
+            db_obj.budget_min, db_obj.budget_max, db_obj.budget_currency
+        )
+    if db_obj.budget_currency is None and (
+        db_obj.budget_min is not None or db_obj.budget_max is not None
+    ):
+        db_obj.budget_currency = parse_budget(db_obj.budget).currency or DEFAULT_CURRENCY
 
 
 class CRUDAnnouncement(CRUDBase[Announcement, AnnouncementCreate, AnnouncementUpdate]):
+    archive = announcements_archive
+
+    def _publish(self, db: Session, db_obj: Announcement, kind: str) -> None:
+        """Publish a change event inside the current transaction."""
+        payload = {field: getattr(db_obj, field) for field in EVENT_FIELDS}
+        payload["event"] = kind
+        events.publish(db, ANNOUNCEMENTS_CHANNEL, jsonable_encoder(payload))
+
     def create_with_offerer(
         self, db: Session, *, obj_in: AnnouncementCreate, offerer_id: int
     ) -> Announcement:
         """Create a new announcement linked to an offerer."""
-        obj_in_data = jsonable_encoder(obj_in)
+        obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data, offerer_id=offerer_id)
+        sync_budget(db_obj, obj_in.model_fields_set)
         db.add(db_obj)
+        db.flush()
+        counters.adjust_open_announcements(db, {_open_category(db_obj): 1})
+        self._publish(db, db_obj, "created")
         db.commit()
         db.refresh(db_obj)
+        feed_refresher.request_refresh()
         return db_obj
 
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Announcement,
+        obj_in: Union[AnnouncementUpdate, Dict[str, Any]]
+    ) -> Announcement:
+        """Update an announcement and publish the change in the same transaction."""
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+
+        counted_before = _open_category(db_obj)
+        for field, value in update_data.items():
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, value)
+        sync_budget(db_obj, update_data)
+
+        db.add(db_obj)
+        db.flush()
+        counted_after = _open_category(db_obj)
+        if counted_after != counted_before:
+            counters.adjust_open_announcements(db, {counted_before: -1, counted_after: 1})
+        self._publish(db, db_obj, "updated")
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def remove(self, db: Session, *, id: int) -> Announcement:
+        """Delete an announcement and drop it from its category's open count."""
+        obj = db.get(self.model, id)
+        counters.adjust_open_announcements(db, {_open_category(obj): -1})
+        db.delete(obj)
+        db.commit()
+        return obj
+
+    def close_expired(self, db: Session, *, now: datetime, limit: int) -> int:
+        """Close up to `limit` open announcements whose deadline is before `now`.
+
+        Rows locked by another transaction are skipped and picked up by the
+        next call. Adjusts the category counters and publishes an `expired`
+        event per announcement; does not commit. Returns the rows closed.
+        """
+        stmt = self._statement(
+            "close_expired",
+            lambda: update(Announcement)
+            .where(
+                Announcement.id.in_(
+                    select(Announcement.id)
+                    .where(
+                        Announcement.status == AnnouncementStatus.OPEN,
+                        Announcement.deadline < bindparam("now"),
+                    )
+                    .order_by(Announcement.deadline)
+                    .limit(bindparam("limit"))
+                    .with_for_update(skip_locked=True)
+                )
+            )
+            .values(status=AnnouncementStatus.CLOSED, updated_at=bindparam("now"))
+            .returning(*(getattr(Announcement, field) for field in EVENT_FIELDS))
+            .execution_options(synchronize_session=False),
+        )
+        closed = db.execute(stmt, {"now": now, "limit": limit}).all()
+        deltas: Dict[Optional[int], int] = {}
+        for row in closed:
+            deltas[row.category_id] = deltas.get(row.category_id, 0) - 1
+        counters.adjust_open_announcements(db, deltas)
+        for row in closed:
+            self._publish(db, row, "expired")
+        return len(closed)
+
+    def get_multi_filtered(
+        self,
+        db: Session,
+        *,
+        filters: AnnouncementFilter,
+        sort: AnnouncementSort = AnnouncementSort.created_at_desc,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
+        include_archived: bool = False,
+    ) -> List[Announcement]:
+        """Retrieve a page of the announcements matching `filters`.
+
+        The statement depends only on which criteria are set (the filter
+        shape) and the sort, so it is built once per shape and reused with
+        new parameters; see `CRUDBase._statement`. `fields` restricts the
+        loaded columns; `include_archived` also reads archived announcements.
+        """
+        shape, params = _filter_shape(filters)
+        source = self._source(include_archived)
+        stmt = self._statement(
+            ("filtered", shape, sort, include_archived),
+            lambda: select(source)
+            .where(*_filter_criteria(shape, source))
+            .order_by(*_ORDERINGS[sort](source))
+            .offset(bindparam("skip"))
+            .limit(bindparam("limit")),
+            fields,
+            source,
+        )
+        return db.scalars(stmt, {**params, "skip": skip, "limit": limit}).all()
+
+    def count_filtered(
+        self, db: Session, *, filters: AnnouncementFilter, include_archived: bool = False
+    ) -> Tuple[int, bool]:
+        """Number of announcements matching `filters` and whether it is an estimate.
+
+        See `count_total`: exact for small results, estimated for large ones.
+        """
+        shape, params = _filter_shape(filters)
+        source = self._source(include_archived)
+        stmt = self._statement(
+            ("filtered_count", shape, include_archived),
+            lambda: select(source.id).where(*_filter_criteria(shape, source)),
+        )
+        return count_total(
+            db, stmt, params, cache_key=("announcements", shape, include_archived)
+        )
+
+    def export_statement(
+        self, *, filters: AnnouncementFilter, include_archived: bool = False
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """Columns of every announcement matching `filters`, by id.
+
+        For streaming exports; see `app.api.export`.
+        """
+        shape, params = _filter_shape(filters)
+        source = self._source(include_archived)
+        stmt = self._statement(
+            ("export", shape, include_archived),
+            lambda: select(*self._columns(include_archived))
+            .where(*_filter_criteria(shape, source))
+            .order_by(source.id),
+        )
+        return stmt, params
+
     def get_multi_by_offerer(
         self, db: Session, *, offerer_id: int, skip: int = 0, limit: int = 100
     ) -> List[Announcement]:
         """Retrieve announcements for a specific offerer."""
-        return (
-            db.query(self.model)
-            .filter(Announcement.offerer_id == offerer_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        stmt = self._statement(
+            "by_offerer",
+            lambda: select(Announcement)
+            .where(Announcement.offerer_id == bindparam("offerer_id"))
+            .offset(bindparam("skip"))
+            .limit(bindparam("limit")),
         )
+        return db.scalars(
+            stmt, {"offerer_id": offerer_id, "skip": skip, "limit": limit}
+        ).all()
 
     def get_multi_open(
         self, db: Session, *, skip: int = 0, limit: int = 100
     ) -> List[Announcement]:
         """Retrieve all open announcements."""
-        return (
-            db.query(self.model)
-            .filter(Announcement.status == AnnouncementStatus.OPEN)
+        stmt = self._statement(
+            "open",
+            lambda: select(Announcement)
+            .where(Announcement.status == AnnouncementStatus.OPEN)
             .order_by(Announcement.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .offset(bindparam("skip"))
+            .limit(bindparam("limit")),
+        )
+        return db.scalars(stmt, {"skip": skip, "limit": limit}).all()
+
+    def get_multi_recommended(
+        self,
+        db: Session,
+        *,
+        mercenary_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Announcement]:
+        """Retrieve a page of the precomputed recommendation feed of a mercenary.
+
+        Pages by rank over the feed primary key, so the cost does not depend on
+        the size of the announcements table. `fields` restricts the loaded
+        columns.
+        """
+        stmt = self._statement(
+            "recommended",
+            lambda: select(Announcement)
+            .join(
+                RecommendationFeedEntry,
+                RecommendationFeedEntry.announcement_id == Announcement.id,
+            )
+            .where(
+                RecommendationFeedEntry.mercenary_id == bindparam("mercenary_id"),
+                RecommendationFeedEntry.rank > bindparam("first_rank"),
+                RecommendationFeedEntry.rank <= bindparam("last_rank"),
+                Announcement.status == AnnouncementStatus.OPEN,
+            )
+            .order_by(RecommendationFeedEntry.rank),
+            fields,
         )
+        params = {"mercenary_id": mercenary_id, "first_rank": skip, "last_rank": skip + limit}
+        return db.scalars(stmt, params).all()
 
 
 announcement = CRUDAnnouncement(Announcement)
@@ -1,19 +1,48 @@
 """
 Clase base para operaciones CRUD (Create, Read, Update, Delete).
+
+Las consultas de lectura se construyen una sola vez por instancia con
+``_statement`` y reciben sus valores como parámetros (``bindparam``) al
+ejecutarse. Así cada llamada reutiliza la misma sentencia, su clave de caché
+ya calculada y el SQL compilado, en lugar de construir y compilar un
+``Query`` nuevo (ver ``scripts/benchmark_crud_queries.py``).
+
+Los listados aceptan ``fields``: una tupla de nombres de columna a la que se
+limita el ``SELECT`` con ``load_only``. Cada conjunto de campos, sin importar
+el orden, es una sentencia distinta en la misma caché. Como los campos los
+elige el cliente, la caché solo guarda las ``max_statements`` sentencias
+usadas más recientemente.
+
+Los modelos con tabla de archivo (``archive``, ver ``app.models.archive``)
+leen solo la tabla viva salvo que se pida ``include_archived``; entonces la
+sentencia se construye sobre ``_source(True)``, la unión de ambas tablas.
 """
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import Table, bindparam, inspect, select, union_all
+from sqlalchemy.orm import Session, aliased, load_only
+from sqlalchemy.sql import Executable, Subquery
 
 from app.db.base_class import Base
+from app.db.estimate import count_total
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+def with_archive(table: Table, archive: Table) -> Subquery:
+    """Subconsulta ``<table>_all``: las filas de ``table`` y las de su archivo."""
+    return union_all(
+        select(*table.columns),
+        select(*(archive.c[column.name] for column in table.columns)),
+    ).subquery(f"{table.name}_all")
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
     Clase base que proporciona operaciones CRUD predeterminadas.
@@ -21,19 +50,104 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     Args:
         model: Clase de modelo SQLAlchemy
     """
+
+    # Tabla de archivo del modelo, si sus filas terminadas se archivan
+    archive: Optional[Table] = None
+    # Sentencias guardadas por instancia (LRU)
+    max_statements = 256
     
     def __init__(self, model: Type[ModelType]):
         self.model = model
+        self._statements: "OrderedDict[Hashable, Executable]" = OrderedDict()
+        self._statements_lock = threading.Lock()
+        self._archived_source: Any = None
     
-    def get(self, db: Session, id: Any) -> Optional[ModelType]:
-        """Obtener un registro por ID."""
-        return db.query(self.model).filter(self.model.id == id).first()
+    def _statement(
+        self,
+        name: Hashable,
+        build: Callable[[], Executable],
+        fields: Optional[Sequence[str]] = None,
+        entity: Any = None,
+    ) -> Executable:
+        """
+        Sentencia ``name`` de este CRUD, construida con ``build`` en el primer uso.
+
+        Los valores que cambian entre llamadas deben ser ``bindparam`` con
+        nombre; se pasan al ejecutar, p. ej. ``db.scalars(stmt, {"id": id})``.
+        Con ``fields`` solo se cargan esas columnas (y la clave primaria); leer
+        cualquier otro atributo de los objetos devueltos lanza un error en vez
+        de lanzar una consulta por fila. ``entity`` es la entidad de la que se
+        toman esas columnas si no es el modelo (p. ej. ``_source(True)``).
+        """
+        key = name if fields is None else (name, frozenset(fields))
+        with self._statements_lock:
+            stmt = self._statements.get(key)
+            if stmt is not None:
+                self._statements.move_to_end(key)
+                return stmt
+        stmt = build()
+        if fields is not None:
+            columns = [getattr(entity or self.model, field) for field in fields]
+            stmt = stmt.options(load_only(*columns, raiseload=True))
+        with self._statements_lock:
+            self._statements[key] = stmt
+            while len(self._statements) > self.max_statements:
+                self._statements.popitem(last=False)
+        return stmt
+    
+    def _source(self, include_archived: bool = False) -> Any:
+        """Entidad de lectura: el modelo o, con ``include_archived``, el modelo
+        sobre la unión de su tabla y su tabla de archivo.
+
+        Las filas archivadas se cargan como objetos del modelo, pero son de
+        solo lectura: modificarlas no actualiza el archivo.
+        """
+        if not include_archived or self.archive is None:
+            return self.model
+        if self._archived_source is None:
+            rows = with_archive(self.model.__table__, self.archive)
+            self._archived_source = aliased(self.model, rows)
+        return self._archived_source
+
+    def _columns(self, include_archived: bool = False) -> List[Any]:
+        """Columnas de la tabla (o de su unión con el archivo) para lecturas sin ORM."""
+        if not include_archived or self.archive is None:
+            return list(self.model.__table__.columns)
+        return list(inspect(self._source(True)).selectable.c)
+
+    def get(self, db: Session, id: Any, include_archived: bool = False) -> Optional[ModelType]:
+        """Obtener un registro por ID, sin consulta si ya está en la sesión.
+
+        Con ``include_archived`` también lo busca en la tabla de archivo.
+        """
+        if not include_archived or self.archive is None:
+            return db.get(self.model, id)
+        source = self._source(True)
+        stmt = self._statement(
+            "get_archived", lambda: select(source).where(source.id == bindparam("id"))
+        )
+        return db.scalars(stmt, {"id": id}).first()
     
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
     ) -> List[ModelType]:
         """Obtener múltiples registros con paginación."""
-        return db.query(self.model).offset(skip).limit(limit).all()
+        stmt = self._statement(
+            "multi",
+            lambda: select(self.model).offset(bindparam("skip")).limit(bindparam("limit")),
+            fields,
+        )
+        return db.scalars(stmt, {"skip": skip, "limit": limit}).all()
+    
+    def count(self, db: Session) -> Tuple[int, bool]:
+        """Total de registros y si es una estimación (ver ``count_total``)."""
+        stmt = self._statement("count", lambda: select(self.model.id))
+        return count_total(db, stmt, cache_key=(self.model.__tablename__,))
     
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         """Crear un nuevo registro."""
@@ -70,7 +184,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     
     def remove(self, db: Session, *, id: int) -> ModelType:
         """Eliminar un registro por ID."""
-        obj = db.query(self.model).get(id)
+        obj = db.get(self.model, id)
         db.delete(obj)
         db.commit()
         return obj
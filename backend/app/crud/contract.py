@@ -1,39 +1,145 @@
 """
 CRUD operations for the Contract model.
 """
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 
-from app.crud.base import CRUDBase
-from app.models.contract import Contract
+from app.crud.base import CRUDBase, with_archive
+from app.db.estimate import count_total
+from app.models.archive import contracts_archive, transactions_archive
+from app.models.contract import Contract, Transaction
+from app.models.user import User
 from app.schemas.contract import ContractCreate, ContractUpdate
+from app.services import notifications
+
+
+# Transactions of live and archived contracts, for exports with `include_archived`
+_transactions_with_archive = with_archive(Transaction.__table__, transactions_archive)
+
+
+def _of_user(source: Any) -> Any:
+    return (source.offerer_id == bindparam("user_id")) | (source.mercenary_id == bindparam("user_id"))
 
 
 class CRUDContract(CRUDBase[Contract, ContractCreate, ContractUpdate]):
+    archive = contracts_archive
+
     def create_with_users(
         self, db: Session, *, obj_in: ContractCreate, offerer_id: int, mercenary_id: int
     ) -> Contract:
-        """Create a new contract linked to an offerer and a mercenary."""
+        """Create a new contract linked to an offerer and a mercenary.
+
+        The mercenary is notified by email in the same transaction.
+        """
         db_obj = self.model(
             **obj_in.dict(), offerer_id=offerer_id, mercenary_id=mercenary_id
         )
         db.add(db_obj)
+        mercenary = db.get(User, mercenary_id)
+        if mercenary is not None:
+            notifications.enqueue(
+                db,
+                kind=notifications.CONTRACT_CREATED,
+                recipient=mercenary,
+                context={
+                    "contract_title": db_obj.title,
+                    "amount": db_obj.amount,
+                    "offerer_id": offerer_id,
+                },
+            )
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
     def get_multi_by_user(
-        self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None,
+        include_archived: bool = False,
     ) -> List[Contract]:
-        """Retrieve contracts for a specific user (either as offerer or mercenary)."""
-        return (
-            db.query(self.model)
-            .filter((Contract.offerer_id == user_id) | (Contract.mercenary_id == user_id))
-            .offset(skip)
-            .limit(limit)
-            .all()
+        """Retrieve contracts for a specific user (either as offerer or mercenary).
+
+        `fields` restricts the loaded columns; `include_archived` also reads
+        archived contracts.
+        """
+        source = self._source(include_archived)
+        stmt = self._statement(
+            ("by_user", include_archived),
+            lambda: select(source)
+            .where(_of_user(source))
+            .offset(bindparam("skip"))
+            .limit(bindparam("limit")),
+            fields,
+            source,
+        )
+        return db.scalars(stmt, {"user_id": user_id, "skip": skip, "limit": limit}).all()
+
+    def count_by_user(
+        self, db: Session, *, user_id: int, include_archived: bool = False
+    ) -> Tuple[int, bool]:
+        """Number of contracts of a user and whether it is an estimate."""
+        source = self._source(include_archived)
+        stmt = self._statement(
+            ("count_by_user", include_archived),
+            lambda: select(source.id).where(_of_user(source)),
+        )
+        return count_total(
+            db, stmt, {"user_id": user_id}, cache_key=("contracts", "user", include_archived)
+        )
+
+    def export_statement(
+        self, *, user_id: Optional[int] = None, include_archived: bool = False
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """Columns of every contract of a user (of all users if `user_id` is None), by id.
+
+        For streaming exports; see `app.api.export`. `include_archived` also
+        exports archived contracts.
+        """
+        source = self._source(include_archived)
+        if user_id is None:
+            stmt = self._statement(
+                ("export", include_archived),
+                lambda: select(*self._columns(include_archived)).order_by(source.id),
+            )
+            return stmt, {}
+        stmt = self._statement(
+            ("export_by_user", include_archived),
+            lambda: select(*self._columns(include_archived))
+            .where(_of_user(source))
+            .order_by(source.id),
+        )
+        return stmt, {"user_id": user_id}
+
+    def export_transactions_statement(
+        self, *, user_id: Optional[int] = None, include_archived: bool = False
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """Columns of the transactions of a user's contracts (all if `user_id` is None), by id.
+
+        `include_archived` also exports the transactions of archived contracts.
+        """
+        transactions = _transactions_with_archive if include_archived else Transaction.__table__
+        if user_id is None:
+            stmt = self._statement(
+                ("export_transactions", include_archived),
+                lambda: select(*transactions.c).order_by(transactions.c.id),
+            )
+            return stmt, {}
+        source = self._source(include_archived)
+        stmt = self._statement(
+            ("export_transactions_by_user", include_archived),
+            lambda: select(*transactions.c)
+            .join(source, source.id == transactions.c.contract_id)
+            .where(_of_user(source))
+            .order_by(transactions.c.id),
         )
+        return stmt, {"user_id": user_id}
 
 
 contract = CRUDContract(Contract)
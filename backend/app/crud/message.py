@@ -0,0 +1,60 @@
+"""
+CRUD operations for the Message model.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.crud.base import CRUDBase
+from app.models.message import Message
+from app.schemas.message import MessageCreate
+
+
+class CRUDMessage(CRUDBase[Message, MessageCreate, MessageCreate]):
+    def create_many(self, db: Session, *, rows: List[Dict[str, Any]]) -> List[Message]:
+        """Insert a batch of messages with a single statement.
+
+        Returns the inserted rows in input order. Does not commit, so the
+        caller can publish the new messages in the same transaction.
+        """
+        if not rows:
+            return []
+        result = db.scalars(
+            insert(Message).returning(Message, sort_by_parameter_order=True),
+            rows,
+        )
+        return list(result.all())
+
+    def get_history(
+        self,
+        db: Session,
+        *,
+        contract_id: int,
+        before: Optional[int] = None,
+        limit: int = 50,
+    ) -> List[Message]:
+        """Retrieve messages of a contract older than `before`, newest first."""
+        params: Dict[str, Any] = {"contract_id": contract_id, "limit": limit}
+        if before is None:
+            stmt = self._statement("history", self._history_statement)
+        else:
+            stmt = self._statement(
+                "history_before",
+                lambda: self._history_statement().where(Message.id < bindparam("before")),
+            )
+            params["before"] = before
+        return db.scalars(stmt, params).all()
+
+    def _history_statement(self) -> Select:
+        """Page of a contract's history, newest first, without the `before` bound."""
+        return (
+            select(Message)
+            .where(Message.contract_id == bindparam("contract_id"))
+            .order_by(Message.id.desc())
+            .limit(bindparam("limit"))
+        )
+
+
+message = CRUDMessage(Message)
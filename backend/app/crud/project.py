@@ -3,6 +3,7 @@ CRUD operations for Project model.
 """
 from typing import Any, Dict, List, Optional, Union
 
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
@@ -40,25 +41,27 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
         self, db: Session, *, owner_id: int, skip: int = 0, limit: int = 100
     ) -> List[Project]:
         """Get projects by owner ID."""
-        return (
-            db.query(self.model)
-            .filter(Project.client_id == owner_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        stmt = self._statement(
+            "by_owner",
+            lambda: select(Project)
+            .where(Project.client_id == bindparam("owner_id"))
+            .offset(bindparam("skip"))
+            .limit(bindparam("limit")),
         )
+        return db.scalars(stmt, {"owner_id": owner_id, "skip": skip, "limit": limit}).all()
     
     def get_multi_by_freelancer(
         self, db: Session, *, freelancer_id: int, skip: int = 0, limit: int = 100
     ) -> List[Project]:
         """Get projects by freelancer ID."""
-        return (
-            db.query(self.model)
-            .filter(Project.freelancer_id == freelancer_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        stmt = self._statement(
+            "by_freelancer",
+            lambda: select(Project)
+            .where(Project.freelancer_id == bindparam("freelancer_id"))
+            .offset(bindparam("skip"))
+            .limit(bindparam("limit")),
         )
+        return db.scalars(stmt, {"freelancer_id": freelancer_id, "skip": skip, "limit": limit}).all()
     
     def update_status(
         self, db: Session, *, db_obj: Project, status: str
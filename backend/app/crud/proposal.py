@@ -3,11 +3,14 @@ CRUD operations for Proposal model.
 """
 from typing import List, Optional
 
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
+from app.models.project import ProjectStatus
 from app.models.proposal import Proposal, ProposalStatus
 from app.schemas.proposal import ProposalCreate, ProposalUpdate
+from app.services import counters, notifications
 
 
 class CRUDProposal(CRUDBase[Proposal, ProposalCreate, ProposalUpdate]):
@@ -17,25 +20,27 @@ class CRUDProposal(CRUDBase[Proposal, ProposalCreate, ProposalUpdate]):
         self, db: Session, *, project_id: int, skip: int = 0, limit: int = 100
     ) -> List[Proposal]:
         """Get all proposals for a specific project."""
-        return (
-            db.query(self.model)
-            .filter(Proposal.project_id == project_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        stmt = self._statement(
+            "by_project",
+            lambda: select(Proposal)
+            .where(Proposal.project_id == bindparam("project_id"))
+            .offset(bindparam("skip"))
+            .limit(bindparam("limit")),
         )
+        return db.scalars(stmt, {"project_id": project_id, "skip": skip, "limit": limit}).all()
     
     def get_multi_by_freelancer(
         self, db: Session, *, freelancer_id: int, skip: int = 0, limit: int = 100
     ) -> List[Proposal]:
         """Get all proposals from a specific freelancer."""
-        return (
-            db.query(self.model)
-            .filter(Proposal.freelancer_id == freelancer_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        stmt = self._statement(
+            "by_freelancer",
+            lambda: select(Proposal)
+            .where(Proposal.mercenary_id == bindparam("freelancer_id"))
+            .offset(bindparam("skip"))
+            .limit(bindparam("limit")),
         )
+        return db.scalars(stmt, {"freelancer_id": freelancer_id, "skip": skip, "limit": limit}).all()
     
     def create_with_freelancer(
         self, db: Session, *, obj_in: ProposalCreate, freelancer_id: int
@@ -47,13 +52,23 @@ class CRUDProposal(CRUDBase[Proposal, ProposalCreate, ProposalUpdate]):
             estimated_days=obj_in.estimated_days,
             status=obj_in.status,
             project_id=obj_in.project_id,
-            freelancer_id=freelancer_id,
+            mercenary_id=freelancer_id,
         )
         db.add(db_obj)
+        db.flush()
+        counters.adjust_proposals(db, {db_obj.project_id: 1})
         db.commit()
         db.refresh(db_obj)
         return db_obj
     
+    def remove(self, db: Session, *, id: int) -> Proposal:
+        """Delete a proposal and drop it from its project's proposal count."""
+        obj = db.get(self.model, id)
+        counters.adjust_proposals(db, {obj.project_id: -1})
+        db.delete(obj)
+        db.commit()
+        return obj
+    
     def update_status(
         self, db: Session, *, db_obj: Proposal, status: str
     ) -> Proposal:
@@ -61,31 +76,53 @@ class CRUDProposal(CRUDBase[Proposal, ProposalCreate, ProposalUpdate]):
         return self.update(db, db_obj=db_obj, obj_in={"status": status})
     
     def accept(self, db: Session, *, db_obj: Proposal) -> Proposal:
-        """Accept a proposal."""
-        # Update the proposal status
-        proposal = self.update_status(db, db_obj=db_obj, status=ProposalStatus.accepted)
-        
-        # Update the project to assign the freelancer
-        from app.crud.project import project
-        project.assign_freelancer(
-            db, db_obj=db_obj.project, freelancer_id=db_obj.freelancer_id
-        )
-        
+        """
+        Accept a proposal.
+
+        The proposal, the project assignment, the rejection of the other
+        proposals and the notification to the freelancer are committed in a
+        single transaction.
+        """
+        db_obj.status = ProposalStatus.accepted
+
+        # Assign the freelancer to the project
+        project = db_obj.project
+        project.freelancer_id = db_obj.mercenary_id
+        project.status = ProjectStatus.IN_PROGRESS
+        db.add(db_obj)
+
         # Reject all other proposals for this project
         self.reject_other_proposals(db, project_id=db_obj.project_id, current_proposal_id=db_obj.id)
-        
-        return proposal
+
+        notifications.enqueue(
+            db,
+            kind=notifications.PROPOSAL_ACCEPTED,
+            recipient=db_obj.mercenary,
+            context={
+                "proposal_id": db_obj.id,
+                "project_id": project.id,
+                "project_title": project.title,
+                "bid_amount": db_obj.bid_amount,
+            },
+        )
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
     
     def reject_other_proposals(
         self, db: Session, *, project_id: int, current_proposal_id: int
     ) -> None:
-        """Reject all other proposals for a project."""
-        db.query(self.model).filter(
-            Proposal.project_id == project_id,
-            Proposal.id != current_proposal_id,
-            Proposal.status == ProposalStatus.pending
-        ).update({"status": ProposalStatus.rejected}, synchronize_session=False)
-        db.commit()
+        """Reject all other pending proposals for a project. Does not commit."""
+        db.execute(
+            update(Proposal)
+            .where(
+                Proposal.project_id == project_id,
+                Proposal.id != current_proposal_id,
+                Proposal.status == ProposalStatus.pending,
+            )
+            .values(status=ProposalStatus.rejected)
+            .execution_options(synchronize_session=False)
+        )
 
 
 # Create a singleton instance
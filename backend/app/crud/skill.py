@@ -3,6 +3,7 @@ CRUD operations for Skill and UserSkill models.
 """
 from typing import List, Optional
 
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
@@ -15,7 +16,10 @@ class CRUDSkill(CRUDBase[Skill, SkillCreate, SkillUpdate]):
     
     def get_by_name(self, db: Session, *, name: str) -> Optional[Skill]:
         """Get a skill by name."""
-        return db.query(Skill).filter(Skill.name == name).first()
+        stmt = self._statement(
+            "by_name", lambda: select(Skill).where(Skill.name == bindparam("name")).limit(1)
+        )
+        return db.scalars(stmt, {"name": name}).first()
     
     def get_multi_by_ids(
         self, db: Session, *, ids: List[int], skip: int = 0, limit: int = 100
@@ -23,25 +27,27 @@ class CRUDSkill(CRUDBase[Skill, SkillCreate, SkillUpdate]):
         """Get multiple skills by their IDs."""
         if not ids:
             return []
-        return (
-            db.query(self.model)
-            .filter(Skill.id.in_(ids))
-            .offset(skip)
-            .limit(limit)
-            .all()
+        stmt = self._statement(
+            "by_ids",
+            lambda: select(Skill)
+            .where(Skill.id.in_(bindparam("ids", expanding=True)))
+            .offset(bindparam("skip"))
+            .limit(bindparam("limit")),
         )
+        return db.scalars(stmt, {"ids": ids, "skip": skip, "limit": limit}).all()
     
     def search(
         self, db: Session, *, query: str, skip: int = 0, limit: int = 100
     ) -> List[Skill]:
         """Search skills by name."""
-        return (
-            db.query(self.model)
-            .filter(Skill.name.ilike(f"%{query}%"))
-            .offset(skip)
-            .limit(limit)
-            .all()
+        stmt = self._statement(
+            "search",
+            lambda: select(Skill)
+            .where(Skill.name.ilike(bindparam("pattern")))
+            .offset(bindparam("skip"))
+            .limit(bindparam("limit")),
         )
+        return db.scalars(stmt, {"pattern": f"%{query}%", "skip": skip, "limit": limit}).all()
 
 
 # class CRUDUserSkill(CRUDBase[UserSkill, UserSkillCreate, UserSkillUpdate]):
@@ -3,9 +3,10 @@ CRUD operations for User model.
 """
 from typing import Any, Dict, Optional, Union
 
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, verify_and_update_password
 from app.crud.base import CRUDBase
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
@@ -18,11 +19,19 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         """Get a user by email."""
-        return db.query(User).filter(User.email == email).first()
+        stmt = self._statement(
+            "by_email",
+            lambda: select(User).where(User.email == bindparam("email")).limit(1),
+        )
+        return db.scalars(stmt, {"email": email}).first()
     
     def get_by_username(self, db: Session, *, username: str) -> Optional[User]:
         """Get a user by username."""
-        return db.query(User).filter(User.username == username).first()
+        stmt = self._statement(
+            "by_username",
+            lambda: select(User).where(User.username == bindparam("username")).limit(1),
+        )
+        return db.scalars(stmt, {"username": username}).first()
     
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
         """Create a new user with hashed password."""
@@ -65,12 +74,19 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     def authenticate(
         self, db: Session, *, email: str, password: str
     ) -> Optional[User]:
-        """Authenticate a user with email and password."""
+        """Authenticate a user with email and password.
+
+        Outdated password hashes are replaced on a successful login.
+        """
         user = self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash is not None:
+            user.hashed_password = new_hash
+            db.commit()
         return user
     
     def is_active(self, user: User) -> bool:
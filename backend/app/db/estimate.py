@@ -0,0 +1,172 @@
+"""
+Totales de los listados sin recorrer tablas enteras.
+
+Contar exactamente los resultados de un listado filtrado obliga a recorrer
+todas las filas que cumplen los filtros, aunque solo se devuelva una página.
+``count_total`` cuenta exactamente solo hasta ``LIST_COUNT_EXACT_LIMIT``
+filas (un ``COUNT`` sobre la consulta con ``LIMIT``, de coste acotado); por
+encima devuelve una estimación marcada como tal:
+
+* ``pg_class.reltuples`` si la consulta es la tabla entera sin filtros.
+* La estimación del planificador (``EXPLAIN``) en los demás casos, que sale
+  de las estadísticas de la tabla sin leer las filas. Es orientativa: puede
+  desviarse si las estadísticas están desfasadas o los filtros están
+  correlacionados.
+
+Los totales estimados se guardan ``LIST_COUNT_CACHE_SECONDS`` por consulta y
+parámetros, así que recorrer las páginas de un listado grande no repite la
+estimación. En otros motores (SQLite en scripts y pruebas locales) no hay
+estimación y se cuenta siempre exactamente.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Mapping, Optional, Tuple
+
+from sqlalchemy import func, literal, select, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ClauseElement, Executable, Select
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+LIST_TOTALS = registry.counter(
+    "list_totals_total",
+    "Totales de listados calculados por método (exact, reltuples, explain, cached)",
+    ["method"],
+)
+
+_RELTUPLES = text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)")
+
+
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` de una sentencia, con sus parámetros habituales."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimate_count(
+    db: Session, statement: Select, params: Optional[Mapping[str, Any]] = None
+) -> Tuple[int, bool]:
+    """Número de filas de ``statement`` y si es una estimación.
+
+    ``statement`` no debe llevar ``LIMIT``/``OFFSET``: se estima el total.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        count = select(func.count()).select_from(statement.subquery())
+        return db.scalar(count, params or {}), False
+    plan = db.execute(Explain(statement), params or {}).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"]), True
+
+
+class CountCache:
+    """Totales estimados recientes, por consulta y parámetros."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, total = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return total
+
+    def put(self, key: Hashable, total: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + settings.LIST_COUNT_CACHE_SECONDS, total)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = CountCache()
+
+
+def _hashable(params: Mapping[str, Any]) -> Tuple:
+    return tuple(
+        sorted((name, tuple(value) if isinstance(value, list) else value)
+               for name, value in params.items())
+    )
+
+
+def _whole_table(statement: Select) -> Optional[str]:
+    """Nombre de la tabla si ``statement`` la recorre entera, sin filtros ni joins."""
+    froms = statement.get_final_froms()
+    if statement.whereclause is not None or len(froms) != 1:
+        return None
+    return getattr(froms[0], "fullname", None)
+
+
+def count_total(
+    db: Session,
+    statement: Select,
+    params: Optional[Mapping[str, Any]] = None,
+    *,
+    cache_key: Optional[Hashable] = None,
+) -> Tuple[int, bool]:
+    """Total de filas de ``statement`` y si es una estimación.
+
+    ``statement`` no debe llevar ``LIMIT``/``OFFSET``. ``cache_key``
+    identifica la consulta (sin los parámetros, que se añaden aquí) para
+    reutilizar estimaciones recientes; sin él no se guardan.
+    """
+    params = dict(params or {})
+    limit = settings.LIST_COUNT_EXACT_LIMIT
+    if db.get_bind().dialect.name != "postgresql":
+        LIST_TOTALS.inc(method="exact")
+        return estimate_count(db, statement, params)[0], False
+
+    key = (cache_key, _hashable(params)) if cache_key is not None else None
+    if key is not None:
+        cached = count_cache.get(key)
+        if cached is not None:
+            LIST_TOTALS.inc(method="cached")
+            return cached, True
+
+    # Contar como mucho limit + 1 filas: basta para saber si el total es pequeño
+    bounded = select(func.count()).select_from(
+        statement.with_only_columns(literal(1), maintain_column_froms=True)
+        .limit(limit + 1)
+        .subquery()
+    )
+    total = db.scalar(bounded, params)
+    if total <= limit:
+        LIST_TOTALS.inc(method="exact")
+        return total, False
+
+    table = _whole_table(statement)
+    estimate = db.scalar(_RELTUPLES, {"table": table}) if table else None
+    if estimate is not None and estimate > limit:
+        LIST_TOTALS.inc(method="reltuples")
+    else:
+        estimate = estimate_count(db, statement, params)[0]
+        LIST_TOTALS.inc(method="explain")
+    # La estimación nunca baja de lo que ya se ha contado
+    total = max(int(estimate), total)
+    if key is not None:
+        count_cache.put(key, total)
+    return total, True
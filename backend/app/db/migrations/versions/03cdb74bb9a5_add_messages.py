@@ -0,0 +1,36 @@
+"""add_messages
+
+Revision ID: 03cdb74bb9a5
+Revises: cd2a88dcf703
+Create Date: 2026-10-19 11:03:17.884920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '03cdb74bb9a5'
+down_revision = 'cd2a88dcf703'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'messages',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('contract_id', sa.Integer(), nullable=False),
+        sa.Column('sender_id', sa.Integer(), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['contract_id'], ['contracts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_messages_contract_id_id', 'messages', ['contract_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_contract_id_id', table_name='messages')
+    op.drop_table('messages')
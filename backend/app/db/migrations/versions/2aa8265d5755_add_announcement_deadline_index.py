@@ -0,0 +1,24 @@
+"""add_announcement_deadline_index
+
+Revision ID: 2aa8265d5755
+Revises: 2c094bb1b7a6
+Create Date: 2026-10-19 21:05:12.318467
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2aa8265d5755'
+down_revision = '2c094bb1b7a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_announcements_status_deadline', 'announcements', ['status', 'deadline'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_announcements_status_deadline', table_name='announcements')
@@ -0,0 +1,53 @@
+"""add_counter_columns
+
+Revision ID: 2c094bb1b7a6
+Revises: fa18f95fa51a
+Create Date: 2026-10-19 18:41:27.502913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c094bb1b7a6'
+down_revision = 'fa18f95fa51a'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    op.add_column(
+        'categories',
+        sa.Column('open_announcement_count', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.execute(
+        "UPDATE categories SET open_announcement_count = counts.n "
+        "FROM (SELECT category_id, count(*) AS n FROM announcements "
+        "WHERE status = 'OPEN' GROUP BY category_id) AS counts "
+        "WHERE categories.id = counts.category_id"
+    )
+    # The projects and proposal tables are created outside this migration
+    # chain in some deployments; only add the counter where they exist.
+    if _has_table('projects'):
+        op.add_column(
+            'projects',
+            sa.Column('proposal_count', sa.Integer(), server_default='0', nullable=False),
+        )
+        if _has_table('proposal'):
+            op.execute(
+                "UPDATE projects SET proposal_count = counts.n "
+                "FROM (SELECT project_id, count(*) AS n FROM proposal "
+                "GROUP BY project_id) AS counts "
+                "WHERE projects.id = counts.project_id"
+            )
+
+
+def downgrade() -> None:
+    if _has_table('projects'):
+        op.drop_column('projects', 'proposal_count')
+    op.drop_column('categories', 'open_announcement_count')
@@ -0,0 +1,102 @@
+"""add_archive_tables
+
+Revision ID: 3ec31f34cc04
+Revises: 2aa8265d5755
+Create Date: 2026-10-19 22:14:41.902736
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '3ec31f34cc04'
+down_revision = '2aa8265d5755'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The enum types already exist (used by the live tables)
+    op.create_table(
+        'announcements_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('budget', sa.String(length=100), nullable=True),
+        sa.Column('budget_min', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('budget_max', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('budget_currency', sa.String(length=3), nullable=True),
+        sa.Column('deadline', sa.DateTime(), nullable=True),
+        sa.Column(
+            'status',
+            postgresql.ENUM(name='announcementstatus', create_type=False),
+            nullable=False,
+        ),
+        sa.Column('offerer_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_announcements_archive_offerer_id', 'announcements_archive', ['offerer_id'], unique=False
+    )
+    op.create_table(
+        'contracts_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('terms', sa.Text(), nullable=True),
+        sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column(
+            'status',
+            postgresql.ENUM(name='contractstatus', create_type=False),
+            nullable=False,
+        ),
+        sa.Column('offerer_id', sa.Integer(), nullable=False),
+        sa.Column('mercenary_id', sa.Integer(), nullable=False),
+        sa.Column('announcement_id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_contracts_archive_offerer_id', 'contracts_archive', ['offerer_id'], unique=False
+    )
+    op.create_index(
+        'ix_contracts_archive_mercenary_id', 'contracts_archive', ['mercenary_id'], unique=False
+    )
+    op.create_table(
+        'transactions_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column(
+            'transaction_type',
+            postgresql.ENUM(name='transactiontype', create_type=False),
+            nullable=False,
+        ),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('contract_id', sa.UUID(), nullable=False),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_transactions_archive_contract_id', 'transactions_archive', ['contract_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_archive_contract_id', table_name='transactions_archive')
+    op.drop_table('transactions_archive')
+    op.drop_index('ix_contracts_archive_mercenary_id', table_name='contracts_archive')
+    op.drop_index('ix_contracts_archive_offerer_id', table_name='contracts_archive')
+    op.drop_table('contracts_archive')
+    op.drop_index('ix_announcements_archive_offerer_id', table_name='announcements_archive')
+    op.drop_table('announcements_archive')
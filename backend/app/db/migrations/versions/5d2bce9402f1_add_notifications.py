@@ -0,0 +1,51 @@
+"""add_notifications
+
+Revision ID: 5d2bce9402f1
+Revises: 03cdb74bb9a5
+Create Date: 2026-10-19 12:20:41.318206
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2bce9402f1'
+down_revision = '03cdb74bb9a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'notifications',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('recipient_id', sa.Integer(), nullable=True),
+        sa.Column('recipient_email', sa.String(length=255), nullable=False),
+        sa.Column('context', sa.JSON(), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('PENDING', 'SENT', 'FAILED', name='notificationstatus'),
+            nullable=False,
+        ),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['recipient_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_notifications_status_available_at',
+        'notifications',
+        ['status', 'available_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_status_available_at', table_name='notifications')
+    op.drop_table('notifications')
+    sa.Enum(name='notificationstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,81 @@
+"""add_announcement_budget_range
+
+Revision ID: 67fb83deb1de
+Revises: 7af4861aba0d
+Create Date: 2026-10-19 16:02:11.318406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.budget import parse_budget
+
+
+# revision identifiers, used by Alembic.
+revision = '67fb83deb1de'
+down_revision = '7af4861aba0d'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _backfill_budget_ranges() -> None:
+    """Parse the existing free-form budgets into the new columns, in batches."""
+    connection = op.get_bind()
+    select_batch = sa.text(
+        "SELECT id, budget FROM announcements "
+        "WHERE budget IS NOT NULL AND id > :last_id ORDER BY id LIMIT :batch_size"
+    )
+    update_row = sa.text(
+        "UPDATE announcements SET budget_min = :budget_min, budget_max = :budget_max, "
+        "budget_currency = :budget_currency WHERE id = :id"
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select_batch, {"last_id": last_id, "batch_size": BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for row in rows:
+            parsed = parse_budget(row.budget)
+            if parsed.minimum is not None or parsed.maximum is not None:
+                updates.append(
+                    {
+                        "id": row.id,
+                        "budget_min": parsed.minimum,
+                        "budget_max": parsed.maximum,
+                        "budget_currency": parsed.currency,
+                    }
+                )
+        if updates:
+            connection.execute(update_row, updates)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column('announcements', sa.Column('budget_min', sa.Numeric(precision=12, scale=2), nullable=True))
+    op.add_column('announcements', sa.Column('budget_max', sa.Numeric(precision=12, scale=2), nullable=True))
+    op.add_column('announcements', sa.Column('budget_currency', sa.String(length=3), nullable=True))
+    _backfill_budget_ranges()
+    op.create_index('ix_announcements_budget_min', 'announcements', ['budget_min'], unique=False)
+    op.create_index('ix_announcements_budget_max', 'announcements', ['budget_max'], unique=False)
+    op.create_index(
+        'ix_announcements_budget_range',
+        'announcements',
+        [sa.text("numrange(budget_min, budget_max, '[]')")],
+        unique=False,
+        postgresql_using='gist',
+        postgresql_where=sa.text('budget_min IS NOT NULL OR budget_max IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_announcements_budget_range', table_name='announcements')
+    op.drop_index('ix_announcements_budget_max', table_name='announcements')
+    op.drop_index('ix_announcements_budget_min', table_name='announcements')
+    op.drop_column('announcements', 'budget_currency')
+    op.drop_column('announcements', 'budget_max')
+    op.drop_column('announcements', 'budget_min')
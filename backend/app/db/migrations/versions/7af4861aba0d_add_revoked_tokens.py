@@ -0,0 +1,37 @@
+"""add_revoked_tokens
+
+Revision ID: 7af4861aba0d
+Revises: 1b16f2a7d25d
+Create Date: 2026-10-19 14:25:38.771902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7af4861aba0d'
+down_revision = '1b16f2a7d25d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('seq', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('revoked_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index('ix_revoked_tokens_seq', 'revoked_tokens', ['seq'], unique=True)
+    op.create_index('ix_revoked_tokens_expires_at', 'revoked_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_revoked_tokens_expires_at', table_name='revoked_tokens')
+    op.drop_index('ix_revoked_tokens_seq', table_name='revoked_tokens')
+    op.drop_table('revoked_tokens')
@@ -0,0 +1,24 @@
+"""add_recommendation_feed_computed_at_index
+
+Revision ID: c60eabe6e0c8
+Revises: 3ec31f34cc04
+Create Date: 2026-10-19 23:12:41.509213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c60eabe6e0c8'
+down_revision = '3ec31f34cc04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_recommendation_feed_computed_at'), 'recommendation_feed', ['computed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_recommendation_feed_computed_at'), table_name='recommendation_feed')
@@ -0,0 +1,41 @@
+"""add_recommendation_feed
+
+Revision ID: cd2a88dcf703
+Revises: 3dfb508aad3a
+Create Date: 2026-10-19 09:12:41.502113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cd2a88dcf703'
+down_revision = '3dfb508aad3a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'recommendation_feed',
+        sa.Column('mercenary_id', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.SmallInteger(), nullable=False),
+        sa.Column('announcement_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['mercenary_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['announcement_id'], ['announcements.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('mercenary_id', 'rank'),
+    )
+    op.create_index(
+        op.f('ix_recommendation_feed_announcement_id'),
+        'recommendation_feed',
+        ['announcement_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_recommendation_feed_announcement_id'), table_name='recommendation_feed')
+    op.drop_table('recommendation_feed')
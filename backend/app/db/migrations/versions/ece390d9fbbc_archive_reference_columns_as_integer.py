@@ -0,0 +1,40 @@
+"""archive_reference_columns_as_integer
+
+Revision ID: ece390d9fbbc
+Revises: c60eabe6e0c8
+Create Date: 2026-10-20 09:02:17.318420
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ece390d9fbbc'
+down_revision = 'c60eabe6e0c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The live columns are integers, so INSERT ... SELECT into a UUID column
+    # always failed: the archive tables are empty and the cast never runs
+    op.alter_column(
+        'contracts_archive', 'announcement_id',
+        type_=sa.Integer(), postgresql_using='announcement_id::text::integer',
+    )
+    op.alter_column(
+        'transactions_archive', 'contract_id',
+        type_=sa.Integer(), postgresql_using='contract_id::text::integer',
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'transactions_archive', 'contract_id',
+        type_=sa.UUID(), postgresql_using='NULL::uuid',
+    )
+    op.alter_column(
+        'contracts_archive', 'announcement_id',
+        type_=sa.UUID(), postgresql_using='NULL::uuid',
+    )
@@ -0,0 +1,28 @@
+"""add_announcement_filter_indexes
+
+Revision ID: fa18f95fa51a
+Revises: 67fb83deb1de
+Create Date: 2026-10-19 16:48:27.604139
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fa18f95fa51a'
+down_revision = '67fb83deb1de'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_announcements_status_created_at', 'announcements', ['status', 'created_at'], unique=False)
+    op.create_index('ix_announcements_offerer_id', 'announcements', ['offerer_id'], unique=False)
+    op.create_index('ix_announcements_category_id', 'announcements', ['category_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_announcements_category_id', table_name='announcements')
+    op.drop_index('ix_announcements_offerer_id', table_name='announcements')
+    op.drop_index('ix_announcements_status_created_at', table_name='announcements')
@@ -0,0 +1,136 @@
+"""
+Comprobación en segundo plano de las conexiones del pool.
+
+Con ``pool_pre_ping`` cada checkout hace un ``SELECT 1`` antes de entregar
+la conexión, un viaje de ida y vuelta extra en cada petición. En su lugar,
+``PoolHealthChecker`` recorre periódicamente las conexiones inactivas del
+pool: las caídas se detectan fuera del camino de las peticiones y, cuando la
+comprobación ve una desconexión, SQLAlchemy invalida todo el pool para que
+ninguna petición reciba una conexión anterior al corte.
+
+El último resultado queda en ``healthy`` y lo usan los endpoints de salud,
+que así no necesitan abrir una conexión propia.
+
+``InstrumentedQueuePool`` mide además cuánto espera cada checkout por una
+conexión libre y cuenta los que agotan ``DB_POOL_TIMEOUT_SECONDS``, para
+dimensionar el pool de cada despliegue.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+POOL_WAIT = registry.histogram(
+    "db_pool_wait_seconds",
+    "Espera por una conexión del pool (incluye abrir una nueva dentro del overflow)",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+POOL_TIMEOUTS = registry.counter(
+    "db_pool_timeouts_total", "Checkouts que agotaron DB_POOL_TIMEOUT_SECONDS sin conexión"
+)
+POOL_CHECKED_OUT = registry.gauge(
+    "db_pool_checked_out", "Conexiones del pool en uso en este proceso"
+)
+POOL_HEALTHY = registry.gauge(
+    "db_pool_healthy", "1 si la última comprobación del pool tuvo éxito"
+)
+POOL_CHECK_FAILURES = registry.counter(
+    "db_pool_health_check_failures_total", "Comprobaciones del pool fallidas"
+)
+POOL_CHECK_DURATION = registry.histogram(
+    "db_pool_health_check_duration_seconds", "Duración de una comprobación del pool"
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """``QueuePool`` que registra la espera de cada checkout y los timeouts."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started)
+
+
+class PoolHealthChecker:
+    """Hilo que hace ping a las conexiones inactivas del pool.
+
+    El pool entrega las conexiones en orden FIFO, así que sacar y devolver
+    una conexión tantas veces como conexiones inactivas haya visita cada una
+    de ellas una vez, sin retener más de una a la vez.
+    """
+
+    def __init__(self, bind: Optional[Engine] = None) -> None:
+        self._bind = bind
+        self.healthy: Optional[bool] = None
+        self.last_check: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def engine(self) -> Engine:
+        if self._bind is None:
+            from app.db.session import engine  # Evitar la importación circular
+
+            self._bind = engine
+        return self._bind
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-pool-health", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.check_once()
+            self._wake.wait(settings.DB_POOL_HEALTH_CHECK_SECONDS)
+            self._wake.clear()
+
+    def check_once(self) -> bool:
+        """Hacer ping a las conexiones inactivas; devuelve si todas respondieron."""
+        idle = getattr(self.engine.pool, "checkedin", lambda: 0)()
+        try:
+            with POOL_CHECK_DURATION.time():
+                for _ in range(max(idle, 1)):
+                    with self.engine.connect() as connection:
+                        connection.exec_driver_sql("SELECT 1")
+        except Exception as exc:
+            # Una desconexión ya invalida el pool; solo queda registrarla
+            POOL_CHECK_FAILURES.inc()
+            if self.healthy is not False:
+                logger.warning("La comprobación del pool de conexiones falló: %s", exc)
+            self.healthy, self.last_error = False, str(exc)
+        else:
+            if self.healthy is False:
+                logger.info("El pool de conexiones vuelve a responder")
+            self.healthy, self.last_error = True, None
+        self.last_check = time.time()
+        POOL_HEALTHY.set(1 if self.healthy else 0)
+        return self.healthy
+
+
+pool_health = PoolHealthChecker()
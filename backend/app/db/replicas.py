@@ -0,0 +1,221 @@
+"""
+Enrutamiento de lecturas a réplicas de solo lectura.
+
+Con ``DB_REPLICA_URIS`` configurado, las peticiones GET/HEAD ejecutan sus
+``SELECT`` en una réplica; todo lo demás (escrituras, ``FOR UPDATE``, SQL
+textual y cualquier petición que no sea de lectura) sigue yendo al primario.
+
+Dos salvaguardas evitan leer datos desfasados:
+
+* Lee lo que escribes: tras una petición de escritura de un usuario que hace
+  commit, sus lecturas van al primario durante ``DB_READ_YOUR_WRITES_SECONDS``.
+  El aviso viaja en la misma transacción como evento ``db_writes``, de modo
+  que lo reciben todos los procesos y no solo el que atendió la escritura.
+* Retraso de réplica: ``ReplicaMonitor`` mide periódicamente el retraso de
+  cada réplica; las que superan ``DB_REPLICA_MAX_LAG_SECONDS`` o no responden
+  dejan de recibir lecturas hasta que se recuperan. Sin réplicas disponibles
+  se lee del primario.
+
+Sin réplicas configuradas nada de esto se activa y el coste es nulo.
+"""
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from fastapi.security.utils import get_authorization_scheme_param
+from jose import JWTError
+from sqlalchemy import create_engine
+from sqlalchemy import event as sa_event
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.requests import HTTPConnection
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import READ_BIND_KEY, _engine_options
+from app.services import events
+
+logger = logging.getLogger(__name__)
+
+WRITES_CHANNEL = events.bridge.register_channel("db_writes")
+_WRITER_KEY = "read_your_writes_key"
+_READ_METHODS = ("GET", "HEAD")
+
+READ_ROUTING = registry.counter(
+    "db_read_sessions_total",
+    "Sesiones de peticiones de lectura por destino (replica, primary, sticky)",
+    ["target"],
+)
+REPLICA_LAG = registry.gauge(
+    "db_replica_lag_seconds", "Retraso de replicación medido en cada réplica", ["replica"]
+)
+REPLICA_AVAILABLE = registry.gauge(
+    "db_replica_available", "1 si la réplica recibe lecturas", ["replica"]
+)
+
+_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class Replica:
+    """Motor de una réplica y su último estado medido."""
+
+    def __init__(self, url: str) -> None:
+        self.engine: Engine = create_engine(url, **_engine_options())
+        self.name = f"{self.engine.url.host}:{self.engine.url.port or 5432}"
+        self.available = False
+        self.lag: Optional[float] = None
+
+
+class ReplicaSet:
+    """Réplicas configuradas y selección rotatoria entre las disponibles."""
+
+    def __init__(self, urls: List[str]) -> None:
+        self.replicas = [Replica(url) for url in urls]
+        self._next = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self) -> Optional[Engine]:
+        available = [replica for replica in self.replicas if replica.available]
+        if not available:
+            return None
+        return available[next(self._next) % len(available)].engine
+
+    def check(self) -> None:
+        """Medir el retraso de cada réplica y actualizar su disponibilidad."""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    lag = float(connection.execute(_LAG_QUERY).scalar() or 0)
+            except Exception as exc:
+                if replica.available:
+                    logger.warning("Réplica %s no disponible: %s", replica.name, exc)
+                replica.available, replica.lag = False, None
+            else:
+                available = lag <= settings.DB_REPLICA_MAX_LAG_SECONDS
+                if available != replica.available:
+                    logger.info(
+                        "Réplica %s %s (retraso %.1fs)",
+                        replica.name,
+                        "disponible" if available else "retrasada",
+                        lag,
+                    )
+                replica.available, replica.lag = available, lag
+                REPLICA_LAG.set(lag, replica=replica.name)
+            REPLICA_AVAILABLE.set(1 if replica.available else 0, replica=replica.name)
+
+
+class StickyWriters:
+    """Identidades que deben leer del primario hasta un instante dado."""
+
+    def __init__(self, max_entries: int = 100_000) -> None:
+        self.max_entries = max_entries
+        self._until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) >= self.max_entries:
+                self._until = {k: t for k, t in self._until.items() if t > now}
+            self._until[key] = now + settings.DB_READ_YOUR_WRITES_SECONDS
+
+    def is_sticky(self, key: str) -> bool:
+        until = self._until.get(key)
+        return until is not None and until > time.monotonic()
+
+
+class ReplicaMonitor:
+    """Hilo que mide el retraso de las réplicas cada ``DB_REPLICA_LAG_CHECK_SECONDS``."""
+
+    def __init__(self, replica_set: ReplicaSet) -> None:
+        self.replica_set = replica_set
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if not self.replica_set or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-replica-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.replica_set.check()
+            except Exception:
+                logger.exception("Error al comprobar las réplicas")
+            self._stop.wait(settings.DB_REPLICA_LAG_CHECK_SECONDS)
+
+
+replicas = ReplicaSet([url.strip() for url in settings.DB_REPLICA_URIS.split(",") if url.strip()])
+sticky_writers = StickyWriters()
+replica_monitor = ReplicaMonitor(replicas)
+events.hub.add_listener(WRITES_CHANNEL, lambda payload: sticky_writers.mark(payload["key"]))
+
+
+def _writer_key(connection: HTTPConnection) -> Optional[str]:
+    """Identidad del autor de la petición (usuario del token), sin consultar la base de datos."""
+    from app.core.security import decode_access_token  # Evitar la importación circular
+
+    scheme, token = get_authorization_scheme_param(connection.headers.get("Authorization"))
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        user_id = decode_access_token(token).get("user_id")
+    except JWTError:
+        return None
+    return f"user:{user_id}" if user_id is not None else None
+
+
+def route_session(db: Session, connection: HTTPConnection) -> None:
+    """Decidir a qué base de datos lee la sesión de una petición."""
+    if not replicas:
+        return
+    key = _writer_key(connection)
+    if connection.scope.get("method") not in _READ_METHODS:
+        if key is not None:
+            db.info[_WRITER_KEY] = key
+        return
+    if key is not None and sticky_writers.is_sticky(key):
+        READ_ROUTING.inc(target="sticky")
+        return
+    replica = replicas.pick()
+    if replica is None:
+        READ_ROUTING.inc(target="primary")
+        return
+    db.info[READ_BIND_KEY] = replica
+    READ_ROUTING.inc(target="replica")
+
+
+@sa_event.listens_for(Session, "before_commit")
+def _announce_write(session: Session) -> None:
+    key = session.info.get(_WRITER_KEY)
+    if key is not None and session.in_transaction():
+        events.publish(session, WRITES_CHANNEL, {"key": key})
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _mark_writer(session: Session) -> None:
+    # Marcar ya este proceso sin esperar a que llegue el evento
+    key = session.info.get(_WRITER_KEY)
+    if key is not None:
+        sticky_writers.mark(key)
@@ -1,28 +1,101 @@
 """
 Módulo que maneja la configuración de la sesión de base de datos.
 """
-from typing import Generator
+from typing import Any, Dict, Generator
 
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import MetaData, Select, create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool
+from starlette.requests import HTTPConnection
 
 from app.core.config import settings
+from app.db.pool import POOL_CHECKED_OUT, InstrumentedQueuePool
 
 
 # Configuración de la conexión a la base de datos
 # Convertir la URL de la base de datos a string para SQLAlchemy
 SQLALCHEMY_DATABASE_URL = str(settings.SQLALCHEMY_DATABASE_URI)
 
+def _engine_options() -> Dict[str, Any]:
+    """Opciones del pool según la configuración del despliegue.
+
+    Cada proceso (worker de gunicorn, worker de trabajos) tiene su propio
+    pool, así que el total de conexiones es procesos x (DB_POOL_SIZE +
+    DB_MAX_OVERFLOW) y debe quedar por debajo de ``max_connections``.
+
+    Detrás de PgBouncer (modo transacción) es PgBouncer quien mantiene las
+    conexiones al servidor: aquí no se guarda ninguna (``NullPool``) y se
+    desactivan las sentencias preparadas en el servidor, que no sobreviven
+    al cambio de conexión entre transacciones.
+    """
+    # Sin ``pool_pre_ping`` por defecto: ``app.db.pool`` comprueba las
+    # conexiones en segundo plano en lugar de añadir un ping a cada checkout
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if settings.DB_PGBOUNCER:
+        options["poolclass"] = NullPool
+        driver = make_url(SQLALCHEMY_DATABASE_URL).get_driver_name()
+        if driver == "psycopg":
+            options["connect_args"] = {"prepare_threshold": None}
+        elif driver == "asyncpg":
+            options["connect_args"] = {"statement_cache_size": 0}
+        # psycopg2 no usa sentencias preparadas en el servidor
+        return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    return options
+
+
 # Crear el motor de SQLAlchemy
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,  # Verifica la conexión antes de usarla
-    pool_recycle=300,    # Recicla las conexiones después de 5 minutos
-)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options())
+if isinstance(engine.pool, InstrumentedQueuePool):
+    POOL_CHECKED_OUT.set_function(engine.pool.checkedout)
+
+
+def psycopg2_dsn() -> str:
+    """DSN para conexiones psycopg2 directas (LISTEN) fuera del pool.
+
+    LISTEN necesita una sesión de servidor propia, así que detrás de
+    PgBouncer en modo transacción se usa ``DB_DIRECT_URI``.
+    """
+    url = make_url(settings.DB_DIRECT_URI) if settings.DB_DIRECT_URI else engine.url
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+# Clave de ``Session.info`` con el motor de réplica para las lecturas
+READ_BIND_KEY = "read_bind"
+
+
+class RoutingSession(Session):
+    """Sesión que envía los ``SELECT`` a una réplica si la petición lo permite.
+
+    ``app.db.replicas.route_session`` decide la réplica al abrir la sesión
+    de una petición de lectura. Las escrituras, los ``FOR UPDATE`` y el SQL
+    textual van siempre al primario.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        read_bind = self.info.get(READ_BIND_KEY)
+        if (
+            read_bind is not None
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+            and not self._flushing
+        ):
+            return read_bind
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
 
 # Configurar la sesión de SQLAlchemy
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine
+)
 
 # Metadatos para las migraciones
 metadata = MetaData()
@@ -30,12 +103,21 @@ metadata = MetaData()
 # Base para los modelos
 Base = declarative_base(metadata=metadata)
 
-def get_db() -> Generator[Session, None, None]:
+def get_db(connection: HTTPConnection) -> Generator[Session, None, None]:
     """
     Dependencia que proporciona una sesión de base de datos.
     La sesión se cierra automáticamente después de su uso.
+
+    FastAPI la resuelve una vez por petición, así que todas las dependencias
+    y el endpoint comparten la misma sesión. La sesión solo saca una conexión
+    del pool en su primera consulta: una petición que no llega a consultar
+    la base de datos no ocupa ninguna. En las peticiones de lectura, las
+    consultas pueden ir a una réplica (ver ``app.db.replicas``).
     """
+    from app.db.replicas import route_session  # Evitar la importación circular
+
     db = SessionLocal()
+    route_session(db, connection)
     try:
         yield db
     finally:
@@ -17,9 +17,17 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session  # noqa: F401
 
 from app.api.api_v1.api import api_router
+from app.api.pagination import TOTAL_HEADERS
+from app.core import keys as signing_keys
 from app.core.config import settings
+from app.core.password_utils import hasher as password_hasher
+from app.db.pool import pool_health
+from app.db.replicas import replica_monitor
 from app.db.session import SessionLocal, engine
 from app.db.base_class import Base, mapper_registry
+from app.services.events import bridge as event_bridge
+from app.services.notifications import dispatcher as notification_dispatcher
+from app.services.recommendations import feed_refresher
 
 # Configurar logging detallado
 logging.basicConfig(
@@ -55,6 +63,31 @@ def startup_event():
         logger.error(f"Error configuring mappers or creating database tables: {e}")
         logger.error(traceback.format_exc())
 
+    # Cargar las claves de firma ya: una clave ausente debe impedir el arranque
+    signing_keys.get_key_set()
+    # Calibrar el hash de contraseñas antes de atender el primer login
+    password_hasher.calibrate()
+
+    if settings.DB_POOL_HEALTH_CHECK_SECONDS > 0:
+        pool_health.start()
+    replica_monitor.start()
+    if settings.EVENTS_PG_BRIDGE_ENABLED:
+        event_bridge.start()
+    if settings.RECOMMENDATION_WORKER_ENABLED:
+        feed_refresher.start()
+    if settings.NOTIFICATION_WORKER_ENABLED and settings.SMTP_HOST:
+        notification_dispatcher.start()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """Event handler for application shutdown."""
+    notification_dispatcher.stop()
+    feed_refresher.stop()
+    event_bridge.stop()
+    replica_monitor.stop()
+    pool_health.stop()
+
 # Configuración de CORS
 
 app.add_middleware(
@@ -63,6 +96,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=TOTAL_HEADERS,
 )
 
 
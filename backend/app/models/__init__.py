@@ -10,3 +10,10 @@ from .review import Review
 from .skill import Skill
 from .user import User, UserSkill
 from .contract import Contract
+from .archive import announcements_archive, contracts_archive, transactions_archive
+from .recommendation import RecommendationFeedEntry
+from .message import Message
+from .notification import Notification
+from .job import Job
+from .rate_limit import RateLimitCounter
+from .revoked_token import RevokedToken
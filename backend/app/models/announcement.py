@@ -4,6 +4,7 @@ Define la estructura de los anuncios de trabajo publicados en la plataforma, que
 """
 from __future__ import annotations
 from datetime import datetime
+from decimal import Decimal
 from enum import Enum
 from typing import List, Optional
 
@@ -12,9 +13,14 @@ from sqlalchemy import (
     DateTime,
     Enum as SQLEnum,
     ForeignKey,
+    Index,
     Integer,
+    Numeric,
     String,
-    Text
+    Text,
+    func,
+    literal_column,
+    or_,
 )
 from sqlalchemy.orm import Mapped, relationship
 
@@ -38,7 +44,10 @@ class Announcement(Base):
     Atributos:
         title: Título del trabajo.
         description: Descripción detallada del trabajo.
-        budget: Presupuesto o rango salarial.
+        budget: Presupuesto o rango salarial tal como se muestra.
+        budget_min: Importe mínimo del presupuesto (``None`` si no tiene mínimo).
+        budget_max: Importe máximo del presupuesto (``None`` si no tiene máximo).
+        budget_currency: Código ISO 4217 de la moneda del presupuesto.
         deadline: Fecha límite para postular.
         status: Estado actual del anuncio.
         offerer_id: ID del 'Oferente' que publicó el anuncio.
@@ -47,11 +56,19 @@ class Announcement(Base):
         updated_at: Fecha de última actualización.
     """
     __tablename__ = "announcements"
+    __table_args__ = (
+        Index("ix_announcements_status_created_at", "status", "created_at"),
+        # Búsqueda de anuncios abiertos con el plazo vencido (services.expiry)
+        Index("ix_announcements_status_deadline", "status", "deadline"),
+    )
 
     id: Mapped[int] = Column(Integer, primary_key=True, index=True)
     title: Mapped[str] = Column(String(255), nullable=False)
     description: Mapped[str] = Column(Text, nullable=False)
     budget: Mapped[str | None] = Column(String(100), nullable=True)
+    budget_min: Mapped[Decimal | None] = Column(Numeric(12, 2), nullable=True, index=True)
+    budget_max: Mapped[Decimal | None] = Column(Numeric(12, 2), nullable=True, index=True)
+    budget_currency: Mapped[str | None] = Column(String(3), nullable=True)
     deadline: Mapped[datetime | None] = Column(DateTime, nullable=True)
     status: Mapped[str] = Column(
         SQLEnum(AnnouncementStatus), 
@@ -60,8 +77,8 @@ class Announcement(Base):
     )
 
     # --- Claves foráneas ---
-    offerer_id: Mapped[int] = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    category_id: Mapped[int] = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    offerer_id: Mapped[int] = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    category_id: Mapped[int] = Column(Integer, ForeignKey("categories.id"), nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime,
@@ -82,3 +99,30 @@ class Announcement(Base):
 
     def __repr__(self) -> str:
         return f"<Announcement(id={self.id}, title='{self.title}', status='{self.status}')>"
+
+
+# Literal en el SQL (no parámetro) para que la expresión coincida con la del índice
+RANGE_BOUNDS = literal_column("'[]'")
+
+
+def budget_range(source=Announcement):
+    """Rango cerrado ``[budget_min, budget_max]``; un extremo ``NULL`` queda abierto.
+
+    ``source`` es la entidad de la que se leen las columnas (por defecto el
+    modelo; p. ej. un alias sobre los anuncios archivados).
+    """
+    return func.numrange(source.budget_min, source.budget_max, RANGE_BOUNDS)
+
+
+def has_budget(source=Announcement):
+    """Anuncios con algún extremo de presupuesto (los que cubre el índice de rango)."""
+    return or_(source.budget_min.isnot(None), source.budget_max.isnot(None))
+
+
+# Índice GiST para filtrar por solapamiento de rangos (``&&``) en una sola búsqueda
+Index(
+    "ix_announcements_budget_range",
+    budget_range(),
+    postgresql_using="gist",
+    postgresql_where=has_budget(),
+).ddl_if(dialect="postgresql")
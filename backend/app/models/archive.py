@@ -0,0 +1,41 @@
+"""
+Tablas de archivo de anuncios, contratos y transacciones.
+
+Los anuncios, contratos y transacciones terminados hace tiempo se mueven de
+sus tablas a estas (``app.services.archive``) para que las tablas que leen
+los listados, y sus índices, solo contengan las filas vivas. Cada tabla de
+archivo tiene las mismas columnas que la original, con los mismos IDs, más
+``archived_at``; no tiene claves foráneas ni más índices que los de las
+lecturas por usuario o por contrato.
+
+Las filas archivadas no se modifican: el CRUD solo las lee, y solo cuando
+se pide explícitamente (``include_archived``).
+"""
+from sqlalchemy import Column, DateTime, Index, Table
+
+from app.db.base_class import Base
+from app.models.announcement import Announcement
+from app.models.contract import Contract, Transaction
+
+
+def _archive_table(table: Table, *indexes: str) -> Table:
+    """Tabla ``<table>_archive`` con las columnas de ``table`` y ``archived_at``."""
+    name = f"{table.name}_archive"
+    columns = [
+        # Sin secuencia propia: los IDs vienen de la tabla original
+        Column(column.name, column.type, primary_key=column.primary_key,
+               nullable=column.nullable, autoincrement=False)
+        for column in table.columns
+    ]
+    return Table(
+        name,
+        Base.metadata,
+        *columns,
+        Column("archived_at", DateTime, nullable=False),
+        *(Index(f"ix_{name}_{column}", column) for column in indexes),
+    )
+
+
+announcements_archive = _archive_table(Announcement.__table__, "offerer_id")
+contracts_archive = _archive_table(Contract.__table__, "offerer_id", "mercenary_id")
+transactions_archive = _archive_table(Transaction.__table__, "contract_id")
@@ -16,11 +16,16 @@ class Category(Base):
     Atributos:
         id: Identificador único de la categoría.
         name: Nombre de la categoría (ej: "Desarrollo Web", "Diseño Gráfico").
+        open_announcement_count: Anuncios abiertos de la categoría, mantenido
+            por el CRUD de anuncios (ver ``app.services.counters``).
     """
     __tablename__ = "categories"
 
     id: Mapped[int] = Column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = Column(String(100), unique=True, nullable=False, index=True)
+    open_announcement_count: Mapped[int] = Column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     # Relación uno a muchos con anuncios
     announcements: Mapped[List["Announcement"]] = relationship(
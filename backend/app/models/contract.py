@@ -11,7 +11,6 @@ from enum import Enum
 from typing import List, Optional
 
 from sqlalchemy import (
-    UUID,
     Column,
     DateTime,
     Enum as SQLEnum,
@@ -83,7 +82,7 @@ class Contract(Base):
         nullable=False,
         index=True
     )
-    announcement_id: Mapped[UUID] = Column(UUID(as_uuid=True), ForeignKey("announcements.id", ondelete="CASCADE"), nullable=False, index=True)
+    announcement_id: Mapped[int] = Column(Integer, ForeignKey("announcements.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Fechas
     created_at: Mapped[datetime] = Column(
@@ -99,7 +98,7 @@ class Contract(Base):
     )
     completed_at: Mapped[Optional[datetime]] = Column(DateTime, nullable=True)
     
-    # Relaciones ORM (temporalmente desactivadas para resolver errores de mapeo)
+    # Relaciones ORM (las de los usuarios siguen desactivadas)
     # offerer: Mapped[User] = relationship(
     #     User,
     #     foreign_keys=[offerer_id],
@@ -110,11 +109,11 @@ class Contract(Base):
     #     foreign_keys=[mercenary_id],
     #     back_populates="contracts_as_mercenary"
     # )
-    # announcement: Mapped["Announcement"] = relationship("Announcement", back_populates="contracts")
-        # transactions: Mapped[List["Transaction"]] = relationship(
-    #     back_populates="contract",
-    #     cascade="all, delete-orphan"
-    # )
+    announcement: Mapped["Announcement"] = relationship("Announcement", back_populates="contracts")
+    transactions: Mapped[List["Transaction"]] = relationship(
+        back_populates="contract",
+        cascade="all, delete-orphan"
+    )
 
     def __repr__(self) -> str:
         return f"<Contract(id={self.id}, title='{self.title}', status='{self.status}')>"
@@ -157,7 +156,7 @@ class Transaction(Base):
         nullable=False,
         index=True
     )
-    contract_id: Mapped[UUID] = Column(UUID(as_uuid=True), ForeignKey("contracts.id", ondelete="CASCADE"), nullable=False, index=True)
+    contract_id: Mapped[int] = Column(Integer, ForeignKey("contracts.id", ondelete="CASCADE"), nullable=False, index=True)
     processed_at: Mapped[Optional[datetime]] = Column(DateTime, nullable=True)
     notes: Mapped[Optional[str]] = Column(Text, nullable=True)
     
@@ -0,0 +1,80 @@
+"""
+Modelo de la cola de trabajos en segundo plano.
+
+Los trabajos se insertan en la misma transacción que el cambio que los
+origina y los procesa ``worker.py`` reclamándolos con
+``SELECT ... FOR UPDATE SKIP LOCKED``.
+"""
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    Enum as SAEnum,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.orm import Mapped
+
+from app.db.base_class import Base
+
+
+class JobStatus(str, Enum):
+    """Estado de un trabajo."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """Trabajo en cola.
+
+    Atributos:
+        id: Identificador del trabajo.
+        kind: Tipo de trabajo; determina el manejador que lo ejecuta.
+        payload: Argumentos del manejador.
+        status: Estado del trabajo.
+        dedupe_key: Clave opcional que impide encolar dos veces el mismo trabajo.
+        attempts: Intentos realizados.
+        max_attempts: Intentos permitidos antes de marcarlo como fallido.
+        run_at: Momento a partir del cual puede ejecutarse (programación y reintentos).
+        locked_until: Fin del plazo de visibilidad de un trabajo en ejecución;
+            vencido ese plazo, otro worker puede reclamarlo.
+        locked_by: Worker que lo está ejecutando.
+        last_error: Último error producido.
+        created_at: Fecha de creación.
+        started_at: Inicio del último intento.
+        finished_at: Fecha de finalización.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+        Index("ix_jobs_status_locked_until", "status", "locked_until"),
+    )
+
+    id: Mapped[int] = Column(BigInteger, primary_key=True)
+    kind: Mapped[str] = Column(String(100), nullable=False)
+    payload: Mapped[Dict[str, Any]] = Column(JSON, nullable=False, default=dict)
+    status: Mapped[JobStatus] = Column(
+        SAEnum(JobStatus), default=JobStatus.QUEUED, nullable=False
+    )
+    dedupe_key: Mapped[Optional[str]] = Column(String(255), nullable=True, unique=True)
+    attempts: Mapped[int] = Column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = Column(Integer, default=5, nullable=False)
+    run_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_until: Mapped[Optional[datetime]] = Column(DateTime, nullable=True)
+    locked_by: Mapped[Optional[str]] = Column(String(100), nullable=True)
+    last_error: Mapped[Optional[str]] = Column(Text, nullable=True)
+    created_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[Optional[datetime]] = Column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = Column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<Job(id={self.id}, kind='{self.kind}', status='{self.status}')>"
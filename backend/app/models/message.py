@@ -0,0 +1,46 @@
+"""
+Modelo de Mensaje del chat de un contrato.
+
+Los mensajes se intercambian entre el oferente y el mercenario de un
+contrato. El índice (contract_id, id) permite cargar el historial por cursor
+sin ordenar ni recorrer la tabla.
+"""
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, Text
+from sqlalchemy.orm import Mapped
+
+from app.db.base_class import Base
+
+
+class Message(Base):
+    """Mensaje de chat asociado a un contrato.
+
+    Atributos:
+        id: Identificador creciente; sirve también de cursor del historial.
+        contract_id: ID del contrato al que pertenece la conversación.
+        sender_id: ID del usuario que envió el mensaje.
+        body: Texto del mensaje.
+        created_at: Fecha de creación del mensaje.
+    """
+    __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_contract_id_id", "contract_id", "id"),
+    )
+
+    id: Mapped[int] = Column(BigInteger, primary_key=True)
+    contract_id: Mapped[int] = Column(
+        Integer,
+        ForeignKey("contracts.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    sender_id: Mapped[int] = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    body: Mapped[str] = Column(Text, nullable=False)
+    created_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<Message(id={self.id}, contract_id={self.contract_id}, sender_id={self.sender_id})>"
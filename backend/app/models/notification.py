@@ -0,0 +1,75 @@
+"""
+Modelo de la bandeja de salida (outbox) de notificaciones.
+
+Las notificaciones se insertan en la misma transacción que el cambio que las
+origina, de modo que solo existen si ese cambio se confirma. Un proceso en
+segundo plano las envía por lotes y reintenta las fallidas con espera
+exponencial.
+"""
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    Enum as SAEnum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.orm import Mapped
+
+from app.db.base_class import Base
+
+
+class NotificationStatus(str, Enum):
+    """Estado de entrega de una notificación."""
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class Notification(Base):
+    """Notificación pendiente o ya entregada.
+
+    Atributos:
+        id: Identificador de la notificación.
+        kind: Tipo de notificación; determina la plantilla de correo.
+        recipient_id: ID del usuario destinatario.
+        recipient_email: Dirección a la que se envía el correo.
+        context: Variables con las que se renderiza la plantilla.
+        status: Estado de entrega.
+        attempts: Intentos de envío realizados.
+        available_at: Momento a partir del cual puede (re)intentarse el envío.
+        last_error: Último error de envío, si lo hubo.
+        created_at: Fecha de creación.
+        sent_at: Fecha de entrega.
+    """
+    __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_status_available_at", "status", "available_at"),
+    )
+
+    id: Mapped[int] = Column(BigInteger, primary_key=True)
+    kind: Mapped[str] = Column(String(50), nullable=False)
+    recipient_id: Mapped[Optional[int]] = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True
+    )
+    recipient_email: Mapped[str] = Column(String(255), nullable=False)
+    context: Mapped[Dict[str, Any]] = Column(JSON, nullable=False, default=dict)
+    status: Mapped[NotificationStatus] = Column(
+        SAEnum(NotificationStatus), default=NotificationStatus.PENDING, nullable=False
+    )
+    attempts: Mapped[int] = Column(Integer, default=0, nullable=False)
+    available_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error: Mapped[Optional[str]] = Column(Text, nullable=True)
+    created_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at: Mapped[Optional[datetime]] = Column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<Notification(id={self.id}, kind='{self.kind}', status='{self.status}')>"
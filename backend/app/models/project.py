@@ -39,12 +39,15 @@ class Project(Base):
     status: Mapped[ProjectStatus] = Column(SAEnum(ProjectStatus), default=ProjectStatus.OPEN, nullable=False)
     created_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Propuestas recibidas, mantenido por el CRUD de propuestas (ver app.services.counters)
+    proposal_count: Mapped[int] = Column(Integer, nullable=False, default=0, server_default="0")
 
     client_id: Mapped[int] = Column(Integer, ForeignKey("users.id"))
     freelancer_id: Mapped[Optional[int]] = Column(Integer, ForeignKey("users.id"))
 
     client: Mapped[User] = relationship(foreign_keys=[client_id], back_populates="projects_created")
     freelancer: Mapped[Optional[User]] = relationship(foreign_keys=[freelancer_id], back_populates="projects_assigned")
+    proposals: Mapped[List["Proposal"]] = relationship("Proposal", back_populates="project")
 
     # Esta es la relación que faltaba y causaba el error de mapeo.
     # Se vincula con la relación 'projects' en el modelo Skill.
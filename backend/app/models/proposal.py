@@ -35,7 +35,7 @@ class Proposal(Base):
     updated_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Relaciones
-    project_id: Mapped[int] = Column(Integer, ForeignKey("project.id"), nullable=False)
+    project_id: Mapped[int] = Column(Integer, ForeignKey("projects.id"), nullable=False)
     project: Mapped[Project] = relationship(Project, back_populates="proposals")
     
     mercenary_id: Mapped[int] = Column(Integer, ForeignKey("users.id"), nullable=False)
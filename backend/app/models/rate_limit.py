@@ -0,0 +1,30 @@
+"""
+Modelo de los contadores compartidos del limitador de peticiones.
+
+La tabla es UNLOGGED: los contadores son efímeros, así que no merece la pena
+pagar WAL por cada petición, y perderlos tras una caída solo reinicia los
+límites.
+"""
+from sqlalchemy import BigInteger, Column, Integer, String
+from sqlalchemy.orm import Mapped
+
+from app.db.base_class import Base
+
+
+class RateLimitCounter(Base):
+    """Peticiones de una clave dentro de una ventana.
+
+    Atributos:
+        key: Ámbito e identidad limitada (IP, email o usuario).
+        window_start: Inicio de la ventana en segundos desde epoch.
+        count: Peticiones registradas en la ventana.
+    """
+    __tablename__ = "rate_limit_counters"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key: Mapped[str] = Column(String(255), primary_key=True)
+    window_start: Mapped[int] = Column(BigInteger, primary_key=True)
+    count: Mapped[int] = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<RateLimitCounter(key='{self.key}', window_start={self.window_start}, count={self.count})>"
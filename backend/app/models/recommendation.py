@@ -0,0 +1,50 @@
+"""
+Modelo del feed de recomendaciones precalculado.
+
+Cada fila es una posición del top-N de anuncios recomendados para un
+mercenario. La clave primaria (mercenary_id, rank) permite paginar el feed
+con un simple recorrido de rango sobre el índice.
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, SmallInteger
+from sqlalchemy.orm import Mapped
+
+from app.db.base_class import Base
+
+
+class RecommendationFeedEntry(Base):
+    """Entrada del feed de recomendaciones de un mercenario.
+
+    Atributos:
+        mercenary_id: ID del mercenario dueño del feed.
+        rank: Posición (1..N) dentro del feed.
+        announcement_id: ID del anuncio recomendado.
+        score: Puntuación calculada para el anuncio.
+        computed_at: Momento en que se calculó la entrada.
+    """
+    __tablename__ = "recommendation_feed"
+
+    mercenary_id: Mapped[int] = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    rank: Mapped[int] = Column(SmallInteger, primary_key=True)
+    announcement_id: Mapped[int] = Column(
+        Integer,
+        ForeignKey("announcements.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    score: Mapped[float] = Column(Float, nullable=False)
+    # Indexado para leer el recálculo más reciente (recommendation_feed_staleness_seconds)
+    computed_at: Mapped[datetime] = Column(
+        DateTime, default=datetime.utcnow, nullable=False, index=True
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<RecommendationFeedEntry(mercenary_id={self.mercenary_id}, "
+            f"rank={self.rank}, announcement_id={self.announcement_id})>"
+        )
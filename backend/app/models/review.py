@@ -5,10 +5,8 @@ Define la estructura de las calificaciones y reseñas que los usuarios se dejan.
 """
 from __future__ import annotations
 from typing import Optional
-from uuid import UUID
 
 from sqlalchemy import Column, ForeignKey, Integer, Text, CheckConstraint
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, relationship, Session
 
 from app.db.base_class import Base
@@ -37,8 +35,8 @@ class Review(Base):
     comment: Mapped[Optional[str]] = Column(Text, nullable=True)
     
     # Relaciones
-    announcement_id: Mapped[UUID] = Column(
-        PG_UUID(as_uuid=True),
+    announcement_id: Mapped[int] = Column(
+        Integer,
         ForeignKey("announcements.id", ondelete="CASCADE"),
         nullable=False,
         unique=True
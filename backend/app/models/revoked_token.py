@@ -0,0 +1,45 @@
+"""
+Modelo del registro de tokens revocados.
+
+Cada fila revoca una clave: un ``jti`` concreto (refresh token ya usado), una
+familia de refresh tokens (``fid``, una sesión) o todos los tokens emitidos
+a un usuario antes de ``revoked_at``. La tabla respalda el filtro de Bloom
+en memoria de ``app.services.revocation``.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Identity, Index, Integer, String
+from sqlalchemy.orm import Mapped
+
+from app.db.base_class import Base
+
+
+class RevokedToken(Base):
+    """Clave revocada.
+
+    Atributos:
+        key: Clave revocada: ``jti:<id>``, ``fid:<id>`` o ``user:<id>``.
+        seq: Secuencia creciente usada para sincronizar incrementalmente el
+            filtro de cada proceso.
+        user_id: Usuario al que pertenecen los tokens.
+        revoked_at: Momento de la revocación.
+        expires_at: A partir de este momento ningún token afectado puede
+            seguir vigente y la fila puede borrarse.
+    """
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        Index("ix_revoked_tokens_seq", "seq", unique=True),
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
+
+    key: Mapped[str] = Column(String(64), primary_key=True)
+    seq: Mapped[int] = Column(BigInteger, Identity(), nullable=False)
+    user_id: Mapped[Optional[int]] = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True
+    )
+    revoked_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at: Mapped[datetime] = Column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<RevokedToken(key='{self.key}', expires_at={self.expires_at})>"
@@ -7,7 +7,7 @@ from typing import Optional
 
 from pydantic import EmailStr
 from sqlalchemy import Boolean, Column, DateTime, Enum as SAEnum, ForeignKey, Integer, String
-from sqlalchemy.orm import Mapped, Session
+from sqlalchemy.orm import Mapped, Session, relationship
 
 from app.db.base_class import Base
 
@@ -29,6 +29,24 @@ class User(Base):
     created_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    # Lados inversos de las relaciones declaradas en los otros modelos (por
+    # nombre, para no importarlos aquí)
+    announcements = relationship("Announcement", back_populates="owner")
+    reviews_written = relationship(
+        "Review", foreign_keys="Review.reviewer_id", back_populates="reviewer"
+    )
+    reviews_received = relationship(
+        "Review", foreign_keys="Review.reviewee_id", back_populates="reviewee"
+    )
+    projects_created = relationship(
+        "Project", foreign_keys="Project.client_id", back_populates="client"
+    )
+    projects_assigned = relationship(
+        "Project", foreign_keys="Project.freelancer_id", back_populates="freelancer"
+    )
+    proposals = relationship("Proposal", back_populates="mercenary")
+    profile = relationship("Profile", back_populates="user", uselist=False)
+
     def __repr__(self) -> str:
         return f"<User(id={self.id}, email='{self.email}', role='{self.role}')>"
 
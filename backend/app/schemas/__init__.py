@@ -23,6 +23,8 @@ from .announcement import (
     AnnouncementCreate,
     AnnouncementUpdate,
     AnnouncementInDB,
+    AnnouncementFilter,
+    AnnouncementSort,
 )
 
 from .category import (
@@ -39,6 +41,26 @@ from .contract import (
     TransactionCreate,
 )
 
+from .message import (
+    Message,
+    MessageCreate,
+    MessagePage,
+)
+
+from .imports import (
+    ImportFormat,
+    ImportKind,
+    ImportReport,
+    ImportRowError,
+)
+
+from .batch import (
+    BatchRequest,
+    BatchRequestItem,
+    BatchResponse,
+    BatchResponseItem,
+)
+
 
 __all__ = [
     # User schemas
@@ -73,4 +95,21 @@ __all__ = [
     'ContractUpdate',
     'Transaction',
     'TransactionCreate',
+
+    # Message schemas
+    'Message',
+    'MessageCreate',
+    'MessagePage',
+
+    # Import schemas
+    'ImportFormat',
+    'ImportKind',
+    'ImportReport',
+    'ImportRowError',
+
+    # Batch schemas
+    'BatchRequest',
+    'BatchRequestItem',
+    'BatchResponse',
+    'BatchResponseItem',
 ]
@@ -2,15 +2,85 @@
 Pydantic schemas for Announcements.
 """
 from datetime import datetime
-from typing import Optional
+from decimal import Decimal
+from enum import Enum
+from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from app.models.announcement import AnnouncementStatus
 
 
-class AnnouncementBase(BaseModel):
-    """Base schema for an announcement."""
+class AnnouncementSort(str, Enum):
+    """Orderings accepted by the announcements list; a leading `-` means descending."""
+    created_at = "created_at"
+    created_at_desc = "-created_at"
+    budget = "budget"
+    budget_desc = "-budget"
+    deadline = "deadline"
+    deadline_desc = "-deadline"
+
+
+class AnnouncementFilter(BaseModel):
+    """Criteria of the announcements list; criteria left unset do not filter.
+
+    Windows include their `_after` bound and exclude their `_before` bound.
+    The budget criteria keep announcements whose range overlaps
+    [min_budget, max_budget].
+    """
+    status: Optional[List[AnnouncementStatus]] = Field(None, min_length=1)
+    category_id: Optional[List[int]] = Field(None, min_length=1)
+    offerer_id: Optional[int] = None
+    deadline_after: Optional[datetime] = None
+    deadline_before: Optional[datetime] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    min_budget: Optional[Decimal] = Field(None, ge=0)
+    max_budget: Optional[Decimal] = Field(None, ge=0)
+    currency: Optional[str] = Field(None, pattern="^[A-Z]{3}$")
+
+    @model_validator(mode="after")
+    def check_windows(self):
+        for low, high in (
+            ("deadline_after", "deadline_before"),
+            ("created_after", "created_before"),
+            ("min_budget", "max_budget"),
+        ):
+            low_value, high_value = getattr(self, low), getattr(self, high)
+            if low_value is not None and high_value is not None and low_value > high_value:
+                raise ValueError(f"{low} must not exceed {high}")
+        return self
+
+
+class BudgetRangeMixin(BaseModel):
+    """Structured budget fields, validated as a range."""
+    budget_min: Optional[Decimal] = Field(
+        None, ge=0, lt=10**10, description="Lower bound of the budget"
+    )
+    budget_max: Optional[Decimal] = Field(
+        None, ge=0, lt=10**10, description="Upper bound of the budget"
+    )
+    budget_currency: Optional[str] = Field(
+        None, pattern="^[A-Z]{3}$", description="ISO 4217 currency code of the budget"
+    )
+
+    @model_validator(mode="after")
+    def check_budget_range(self):
+        if (
+            self.budget_min is not None
+            and self.budget_max is not None
+            and self.budget_min > self.budget_max
+        ):
+            raise ValueError("budget_min must not exceed budget_max")
+        return self
+
+
+class AnnouncementBase(BudgetRangeMixin):
+    """Base schema for an announcement.
+
+    Clients may send only the free-form `budget`; the structured range is
+    then parsed from it. Sending only the range fills in `budget`.
+    """
     title: str = Field(..., max_length=255, description="Title of the announcement")
     description: str = Field(..., description="Detailed description of the announcement")
     budget: Optional[str] = Field(None, max_length=100, description="Budget or salary range")
@@ -23,7 +93,7 @@ class AnnouncementCreate(AnnouncementBase):
     pass
 
 
-class AnnouncementUpdate(BaseModel):
+class AnnouncementUpdate(BudgetRangeMixin):
     """Schema for updating an announcement."""
     title: Optional[str] = Field(None, max_length=255)
     description: Optional[str] = Field(None)
@@ -0,0 +1,69 @@
+"""
+Pydantic schemas for batched API requests.
+"""
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.config import settings
+
+# Headers a sub-request cannot set: authentication is shared with the batch
+# and the body framing is computed for each sub-request.
+RESERVED_HEADERS = frozenset({"authorization", "cookie", "host", "content-length", "content-type"})
+
+
+class BatchRequestItem(BaseModel):
+    """One API call of a batch."""
+    id: str = Field(..., min_length=1, max_length=64, description="Echoed back on its response")
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str = Field(
+        ...,
+        max_length=2048,
+        description="Path under the API prefix, with an optional query string, e.g. `/users/me`",
+    )
+    body: Optional[Any] = Field(None, description="JSON body of the call")
+    headers: Dict[str, str] = Field(default_factory=dict)
+
+    @field_validator("path")
+    @classmethod
+    def check_path(cls, value: str) -> str:
+        if not value.startswith("/") or value.startswith("//"):
+            raise ValueError("path must be relative to the API prefix and start with '/'")
+        if value.split("?", 1)[0].rstrip("/") == "/batch":
+            raise ValueError("batches cannot be nested")
+        return value
+
+    @field_validator("headers")
+    @classmethod
+    def check_headers(cls, value: Dict[str, str]) -> Dict[str, str]:
+        reserved = sorted(name for name in value if name.lower() in RESERVED_HEADERS)
+        if reserved:
+            raise ValueError(f"headers cannot be set per call: {', '.join(reserved)}")
+        return value
+
+
+class BatchRequest(BaseModel):
+    """A list of API calls executed in one round-trip."""
+    requests: List[BatchRequestItem] = Field(
+        ..., min_length=1, max_length=settings.BATCH_MAX_REQUESTS
+    )
+
+    @field_validator("requests")
+    @classmethod
+    def check_unique_ids(cls, value: List[BatchRequestItem]) -> List[BatchRequestItem]:
+        if len({item.id for item in value}) != len(value):
+            raise ValueError("request ids must be unique")
+        return value
+
+
+class BatchResponseItem(BaseModel):
+    """Result of one call of a batch."""
+    id: str
+    status: int
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """Results of a batch, in request order."""
+    responses: List[BatchResponseItem]
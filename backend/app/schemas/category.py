@@ -24,6 +24,7 @@ class CategoryUpdate(BaseModel):
 class CategoryInDBBase(CategoryBase):
     """Base schema for category data stored in the database."""
     id: int
+    open_announcement_count: int = 0
 
     class Config:
         from_attributes = True
@@ -0,0 +1,36 @@
+"""
+Pydantic schemas for bulk imports.
+"""
+from enum import Enum
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class ImportKind(str, Enum):
+    """Tables that accept bulk imports."""
+    categories = "categories"
+    skills = "skills"
+    announcements = "announcements"
+
+
+class ImportFormat(str, Enum):
+    """File formats accepted by bulk imports."""
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class ImportRowError(BaseModel):
+    """A row of the file that was not imported."""
+    line: int = Field(..., description="Line of the row in the file (1-based, header is line 1 in CSV)")
+    message: str
+
+
+class ImportReport(BaseModel):
+    """Outcome of a bulk import."""
+    kind: ImportKind
+    rows: int = Field(..., description="Data rows read from the file")
+    inserted: int = Field(..., description="Rows created")
+    skipped: int = Field(0, description="Valid rows not created because they already exist")
+    failed: int = Field(0, description="Rows rejected; the first ones are listed in `errors`")
+    errors: List[ImportRowError] = Field(default_factory=list)
@@ -0,0 +1,38 @@
+"""
+Pydantic schemas for contract chat messages.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class MessageBase(BaseModel):
+    """Base schema for a chat message."""
+    body: str = Field(..., min_length=1, description="Text of the message")
+
+
+class MessageCreate(MessageBase):
+    """Schema for a message sent by a client over the chat socket."""
+    client_id: Optional[str] = Field(
+        None, max_length=64, description="Client-side id echoed back to correlate the message"
+    )
+
+
+class Message(MessageBase):
+    """Schema for representing a message in API responses."""
+    id: int
+    contract_id: int
+    sender_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class MessagePage(BaseModel):
+    """A page of chat history, newest first."""
+    items: List[Message]
+    next_cursor: Optional[int] = Field(
+        None, description="Pass as `before` to load older messages; null when exhausted"
+    )
@@ -51,9 +51,10 @@ class ProjectInDBBase(ProjectBase):
     freelancer_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
+    proposal_count: int = 0
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class Project(ProjectInDBBase):
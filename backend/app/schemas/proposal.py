@@ -49,7 +49,7 @@ class ProposalInDBBase(ProposalBase):
     updated_at: datetime
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class Proposal(ProposalInDBBase):
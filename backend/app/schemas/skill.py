@@ -26,7 +26,7 @@ class SkillInDBBase(SkillBase):
     id: int
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class Skill(SkillInDBBase):
@@ -55,7 +55,7 @@ class UserSkillInDBBase(UserSkillBase):
     user_id: int
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class UserSkill(UserSkillInDBBase):
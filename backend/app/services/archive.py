@@ -0,0 +1,135 @@
+"""
+Archivo de anuncios, contratos y transacciones terminados.
+
+El trabajo periódico ``archive.move`` mueve a las tablas de archivo
+(``app.models.archive``) las filas terminadas hace más de
+``ARCHIVE_AFTER_DAYS`` días (por su ``updated_at``):
+
+- contratos completados, cancelados o reembolsados, junto con todas sus
+  transacciones;
+- anuncios cerrados o completados a los que ya no apunta ningún contrato.
+
+Se mueve por lotes de ``ARCHIVE_BATCH_SIZE`` filas, cada uno en su propia
+transacción: se bloquean los IDs del lote (``SKIP LOCKED``, para no esperar
+a las escrituras en curso), se copian al archivo con ``INSERT ... SELECT`` y
+se borran de la tabla viva. Una fila está siempre en una de las dos tablas,
+así que las lecturas con ``include_archived`` no ven huecos ni duplicados.
+
+Las filas a las que apuntan otras tablas con borrado en cascada (reseñas de
+un anuncio, mensajes de un contrato) se quedan en la tabla viva para no
+perder esos datos.
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import bindparam, delete, exists, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.announcement import Announcement, AnnouncementStatus
+from app.models.archive import announcements_archive, contracts_archive, transactions_archive
+from app.models.contract import Contract, ContractStatus, Transaction
+from app.models.message import Message
+from app.models.review import Review
+from app.services import jobs
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_ROWS = "archive.move"
+
+ARCHIVED_ROWS = registry.counter(
+    "archived_rows_total", "Filas movidas a las tablas de archivo", ["table"]
+)
+
+_FINISHED_CONTRACTS = (ContractStatus.COMPLETED, ContractStatus.CANCELLED, ContractStatus.REFUNDED)
+_FINISHED_ANNOUNCEMENTS = (AnnouncementStatus.CLOSED, AnnouncementStatus.COMPLETED)
+
+
+def _move(db: Session, table, archive, key, ids: List[int], archived_at: datetime) -> int:
+    """Copiar al archivo las filas de ``table`` con ``key`` en ``ids`` y borrarlas."""
+    columns = [column.name for column in table.columns]
+    db.execute(
+        insert(archive).from_select(
+            columns + ["archived_at"],
+            select(*table.columns, literal(archived_at).label("archived_at")).where(
+                key.in_(ids)
+            ),
+        )
+    )
+    return db.execute(delete(table).where(key.in_(ids))).rowcount
+
+
+def _archive_contracts(db: Session, cutoff: datetime, archived_at: datetime) -> int:
+    ids = db.scalars(
+        select(Contract.id)
+        .where(
+            Contract.status.in_(_FINISHED_CONTRACTS),
+            Contract.updated_at < cutoff,
+            ~exists().where(Message.contract_id == Contract.id),
+        )
+        .order_by(Contract.id)
+        .limit(bindparam("limit"))
+        .with_for_update(skip_locked=True),
+        {"limit": settings.ARCHIVE_BATCH_SIZE},
+    ).all()
+    if not ids:
+        return 0
+    # Las transacciones primero: borrar el contrato las borraría en cascada
+    moved = _move(db, Transaction.__table__, transactions_archive, Transaction.contract_id, ids, archived_at)
+    ARCHIVED_ROWS.inc(moved, table="transactions")
+    moved = _move(db, Contract.__table__, contracts_archive, Contract.id, ids, archived_at)
+    ARCHIVED_ROWS.inc(moved, table="contracts")
+    return moved
+
+
+def _archive_announcements(db: Session, cutoff: datetime, archived_at: datetime) -> int:
+    ids = db.scalars(
+        select(Announcement.id)
+        .where(
+            Announcement.status.in_(_FINISHED_ANNOUNCEMENTS),
+            Announcement.updated_at < cutoff,
+            ~exists().where(Contract.announcement_id == Announcement.id),
+            ~exists().where(Review.announcement_id == Announcement.id),
+        )
+        .order_by(Announcement.id)
+        .limit(bindparam("limit"))
+        .with_for_update(skip_locked=True),
+        {"limit": settings.ARCHIVE_BATCH_SIZE},
+    ).all()
+    if not ids:
+        return 0
+    moved = _move(db, Announcement.__table__, announcements_archive, Announcement.id, ids, archived_at)
+    ARCHIVED_ROWS.inc(moved, table="announcements")
+    return moved
+
+
+@jobs.job(ARCHIVE_ROWS)
+def archive_finished(db: Session, payload: Dict[str, Any]) -> None:
+    """Mover al archivo los contratos y anuncios terminados, por lotes."""
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+    totals = {}
+    # Contratos antes que anuncios: un anuncio solo se archiva sin contratos vivos
+    for name, archive_batch in (
+        ("contracts", _archive_contracts),
+        ("announcements", _archive_announcements),
+    ):
+        total = 0
+        while True:
+            moved = archive_batch(db, cutoff, now)
+            db.commit()
+            total += moved
+            if moved < settings.ARCHIVE_BATCH_SIZE:
+                break
+        totals[name] = total
+    logger.info(
+        "Archivados %d contratos y %d anuncios en %.2fs",
+        totals["contracts"], totals["announcements"], time.perf_counter() - started,
+    )
+
+
+jobs.periodic(ARCHIVE_ROWS, every=settings.ARCHIVE_INTERVAL_SECONDS)
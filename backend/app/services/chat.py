@@ -0,0 +1,263 @@
+"""
+Chat en tiempo real entre el oferente y el mercenario de un contrato.
+
+Cada conexión WebSocket usa una suscripción del ``EventHub`` con clave
+``contract_id`` y no mantiene ninguna sesión de base de datos abierta, de
+modo que una conexión inactiva solo cuesta su cola y dos corrutinas.
+
+Los mensajes recibidos se encolan en ``MessageWriter``, que los persiste por
+lotes (un INSERT y un NOTIFY por lote) en un hilo del executor. El NOTIFY
+reparte cada mensaje a todos los workers, incluido el emisor, que lo recibe
+ya con su ``id`` definitivo.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.crud.message import message as crud_message
+from app.db.session import SessionLocal
+from app.schemas.message import MessageCreate
+from app.services import events
+
+logger = logging.getLogger(__name__)
+
+CHAT_CHANNEL = events.bridge.register_channel("chat")
+events.hub.set_routing_key(CHAT_CHANNEL, "contract_id")
+
+CONNECTIONS = registry.gauge("chat_connections", "Conexiones de chat abiertas en este proceso")
+MESSAGES_PERSISTED = registry.counter(
+    "chat_messages_persisted_total", "Mensajes de chat guardados"
+)
+PERSIST_FAILURES = registry.counter(
+    "chat_persist_failures_total", "Lotes de mensajes que no se pudieron guardar"
+)
+FLUSH_DURATION = registry.histogram(
+    "chat_flush_duration_seconds", "Duración de la escritura de un lote de mensajes"
+)
+BATCH_SIZE = registry.histogram(
+    "chat_flush_batch_size",
+    "Mensajes por lote escrito",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 200, 500),
+)
+# Mayor ``id`` posible de un mensaje (BIGINT), para medir el peor caso del evento
+_MAX_MESSAGE_ID = 2**63 - 1
+
+SLOW_CONSUMERS = registry.counter(
+    "chat_slow_consumer_disconnects_total",
+    "Conexiones cerradas por no consumir sus mensajes a tiempo",
+)
+
+
+class PendingMessage:
+    """Mensaje recibido por el socket a la espera de ser persistido."""
+
+    __slots__ = ("contract_id", "sender_id", "body", "client_id", "subscription")
+
+    def __init__(
+        self,
+        contract_id: int,
+        sender_id: int,
+        body: str,
+        client_id: Optional[str],
+        subscription: events.Subscription,
+    ):
+        self.contract_id = contract_id
+        self.sender_id = sender_id
+        self.body = body
+        self.client_id = client_id
+        self.subscription = subscription
+
+
+def _send_error(
+    subscription: events.Subscription, detail: str, client_id: Optional[str] = None
+) -> None:
+    """Encolar un error dirigido solo a una conexión."""
+    payload = {"type": "error", "detail": detail, "client_id": client_id}
+    subscription.offer(events.Event(CHAT_CHANNEL, json.dumps(payload), payload))
+
+
+def _message_payload(
+    message_id: int,
+    contract_id: int,
+    sender_id: int,
+    body: str,
+    created_at: datetime,
+    client_id: Optional[str],
+) -> Dict[str, Any]:
+    """Evento que se publica en el canal de chat por cada mensaje guardado."""
+    return {
+        "type": "message",
+        "id": message_id,
+        "contract_id": contract_id,
+        "sender_id": sender_id,
+        "body": body,
+        "created_at": created_at.isoformat(),
+        "client_id": client_id,
+    }
+
+
+def _fits_notify(contract_id: int, sender_id: int, body: str, client_id: Optional[str]) -> bool:
+    """Comprobar si el evento del mensaje, ya codificado, cabe en un NOTIFY.
+
+    Se mide el payload tal como lo codifica ``events.encode``, con el ``id``
+    y la fecha más largos posibles: ``json.dumps`` escapa como ``\\uXXXX`` lo
+    que no es ASCII, así que un cuerpo que cabe en ``CHAT_MESSAGE_MAX_BYTES``
+    puede no caber una vez codificado. Un mensaje que no cabe se rechaza al
+    recibirlo; si llegara al lote, haría fallar el lote entero.
+    """
+    payload = _message_payload(
+        _MAX_MESSAGE_ID, contract_id, sender_id, body, datetime.max, client_id
+    )
+    try:
+        events.encode(payload)
+    except ValueError:
+        return False
+    return True
+
+
+def _persist_batch(batch: List[PendingMessage]) -> None:
+    """Guardar y publicar un lote de mensajes en una sola transacción."""
+    db = SessionLocal()
+    try:
+        rows = [
+            {"contract_id": item.contract_id, "sender_id": item.sender_id, "body": item.body}
+            for item in batch
+        ]
+        created = crud_message.create_many(db, rows=rows)
+        payloads = [
+            _message_payload(
+                obj.id, obj.contract_id, obj.sender_id, obj.body, obj.created_at, item.client_id
+            )
+            for obj, item in zip(created, batch)
+        ]
+        events.publish_many(db, CHAT_CHANNEL, payloads)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class MessageWriter:
+    """Agrupa los mensajes entrantes del proceso y los escribe por lotes.
+
+    Un lote se cierra al alcanzar ``CHAT_BATCH_SIZE`` mensajes o tras
+    ``CHAT_FLUSH_INTERVAL_MS`` desde el primero. La cola es acotada: si la
+    base de datos no da abasto, los sockets dejan de leer y la presión se
+    traslada a los clientes vía TCP.
+    """
+
+    def __init__(self) -> None:
+        self._queue: Optional["asyncio.Queue[PendingMessage]"] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def _ensure_started(self) -> "asyncio.Queue[PendingMessage]":
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=settings.CHAT_WRITE_QUEUE_SIZE)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._queue
+
+    async def submit(self, item: PendingMessage) -> None:
+        await self._ensure_started().put(item)
+
+    async def _collect(self) -> List[PendingMessage]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + settings.CHAT_FLUSH_INTERVAL_MS / 1000
+        while len(batch) < settings.CHAT_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            BATCH_SIZE.observe(len(batch))
+            try:
+                with FLUSH_DURATION.time():
+                    await loop.run_in_executor(None, _persist_batch, batch)
+                MESSAGES_PERSISTED.inc(len(batch))
+            except Exception:
+                PERSIST_FAILURES.inc()
+                logger.exception("No se pudo guardar un lote de %s mensajes", len(batch))
+                for item in batch:
+                    _send_error(item.subscription, "No se pudo enviar el mensaje", item.client_id)
+
+
+writer = MessageWriter()
+
+
+async def _send_loop(websocket: WebSocket, subscription: events.Subscription) -> None:
+    """Enviar al cliente los eventos de su suscripción.
+
+    Si el cliente no consume a tiempo (cola desbordada o envío bloqueado más
+    de ``CHAT_SEND_TIMEOUT_SECONDS``) se cierra la conexión con 1013 para que
+    reconecte y recupere lo perdido desde el historial.
+    """
+    while True:
+        event = await subscription.get()
+        if subscription.overflowed:
+            break
+        try:
+            await asyncio.wait_for(
+                websocket.send_text(event.data), settings.CHAT_SEND_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            break
+    SLOW_CONSUMERS.inc()
+    try:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+    except RuntimeError:
+        # El cliente ya había cerrado
+        pass
+
+
+async def serve(websocket: WebSocket, *, contract_id: int, user_id: int) -> None:
+    """Atender una conexión ya aceptada y autorizada hasta que se cierre."""
+    subscription = events.hub.subscribe(
+        CHAT_CHANNEL,
+        key=contract_id,
+        maxsize=settings.CHAT_SEND_QUEUE_SIZE,
+        overflow=events.DISCONNECT,
+    )
+    sender = asyncio.create_task(_send_loop(websocket, subscription))
+    CONNECTIONS.inc()
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message_in = MessageCreate(**json.loads(raw))
+            except (ValueError, TypeError, ValidationError):
+                _send_error(subscription, "Mensaje inválido")
+                continue
+            too_long = len(message_in.body.encode("utf-8")) > settings.CHAT_MESSAGE_MAX_BYTES
+            if too_long or not _fits_notify(
+                contract_id, user_id, message_in.body, message_in.client_id
+            ):
+                _send_error(subscription, "Mensaje demasiado largo", message_in.client_id)
+                continue
+            await writer.submit(
+                PendingMessage(
+                    contract_id, user_id, message_in.body, message_in.client_id, subscription
+                )
+            )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        CONNECTIONS.dec()
+        sender.cancel()
+        events.hub.unsubscribe(subscription)
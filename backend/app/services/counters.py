@@ -0,0 +1,129 @@
+"""
+Contadores mantenidos en columnas para los listados.
+
+``Category.open_announcement_count`` y ``Project.proposal_count`` evitan un
+``COUNT`` por fila al listar categorías y proyectos. Los métodos CRUD que
+crean, cambian o borran anuncios y propuestas los ajustan en su misma
+transacción con ``UPDATE ... SET n = n + :delta``, que es atómico frente a
+escrituras concurrentes: la fila del contador queda bloqueada hasta el commit.
+Cuando una escritura toca varios contadores se actualizan por orden de id
+para que dos transacciones no se esperen mutuamente.
+
+Cualquier cambio que no pase por el CRUD (SQL a mano, migraciones, borrados en
+cascada) desvía los contadores. El trabajo periódico ``counters.reconcile``
+los recalcula y corrige los que no coinciden, por lotes; bloquea antes las
+filas de cada lote para que ninguna escritura confirme entre el recuento y
+la corrección, y confirma el lote antes de pasar al siguiente.
+"""
+import logging
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.metrics import registry
+from app.models.announcement import Announcement, AnnouncementStatus
+from app.models.category import Category
+from app.models.project import Project
+from app.models.proposal import Proposal
+from app.services import jobs
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_COUNTERS = "counters.reconcile"
+BATCH_SIZE = 1000
+
+COUNTER_DRIFT = registry.counter(
+    "counter_drift_repaired_total",
+    "Filas con un contador desviado corregidas por la reconciliación",
+    ["counter"],
+)
+
+
+def _adjust(db: Session, column, deltas: Dict[Optional[int], int]) -> None:
+    """Sumar ``deltas[id]`` al contador ``column`` de cada fila. No hace commit."""
+    model = column.class_
+    for row_id in sorted(key for key, delta in deltas.items() if key is not None and delta):
+        db.execute(
+            update(model)
+            .where(model.id == row_id)
+            .values({column.key: column + deltas[row_id]})
+            .execution_options(synchronize_session=False)
+        )
+
+
+def adjust_open_announcements(db: Session, deltas: Dict[Optional[int], int]) -> None:
+    """Ajustar ``Category.open_announcement_count`` por id de categoría."""
+    _adjust(db, Category.open_announcement_count, deltas)
+
+
+def adjust_proposals(db: Session, deltas: Dict[Optional[int], int]) -> None:
+    """Ajustar ``Project.proposal_count`` por id de proyecto."""
+    _adjust(db, Project.proposal_count, deltas)
+
+
+def _reconcile(
+    db: Session,
+    column,
+    child_key: ColumnElement,
+    child_filter: Sequence[ColumnElement] = (),
+) -> int:
+    """Corregir ``column`` con el recuento real de hijos, por lotes de ids.
+
+    Cada lote se confirma por separado, de modo que sus filas solo quedan
+    bloqueadas mientras se corrige ese lote. Devuelve el número de filas
+    corregidas.
+    """
+    model = column.class_
+    repaired = 0
+    last_id = 0
+    while True:
+        # Bloquear el lote antes de contar: las escrituras que lleguen ahora
+        # esperan y aplican su delta sobre el valor ya corregido.
+        ids = db.scalars(
+            select(model.id)
+            .where(model.id > last_id)
+            .order_by(model.id)
+            .limit(BATCH_SIZE)
+            .with_for_update()
+        ).all()
+        if not ids:
+            return repaired
+        actual = (
+            select(func.count())
+            .where(child_key == model.id, *child_filter)
+            .correlate(model)
+            .scalar_subquery()
+        )
+        result = db.execute(
+            update(model)
+            .where(model.id.in_(ids), column != actual)
+            .values({column.key: actual})
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        repaired += result.rowcount
+        last_id = ids[-1]
+
+
+@jobs.job(RECONCILE_COUNTERS)
+def reconcile(db: Session, payload: Dict[str, Any]) -> None:
+    """Recalcular los contadores mantenidos y corregir los desviados."""
+    counters = (
+        (
+            "category.open_announcement_count",
+            Category.open_announcement_count,
+            Announcement.category_id,
+            (Announcement.status == AnnouncementStatus.OPEN,),
+        ),
+        ("project.proposal_count", Project.proposal_count, Proposal.project_id, ()),
+    )
+    for name, column, child_key, child_filter in counters:
+        repaired = _reconcile(db, column, child_key, child_filter)
+        if repaired:
+            COUNTER_DRIFT.inc(repaired, counter=name)
+            logger.warning("Corregidos %d contadores %s desviados", repaired, name)
+
+
+jobs.periodic(RECONCILE_COUNTERS, every=3600)
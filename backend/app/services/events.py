@@ -0,0 +1,337 @@
+"""
+Publicación y suscripción de eventos en tiempo real.
+
+``EventHub`` reparte eventos entre los suscriptores del proceso (conexiones
+SSE o WebSocket), cada uno con una cola acotada: si un cliente lento la
+llena, se descartan sus eventos más antiguos en lugar de acumular memoria.
+
+Para que todos los workers de gunicorn vean cada evento, ``publish`` emite un
+``NOTIFY`` de PostgreSQL dentro de la misma transacción que el cambio (se
+entrega solo si hay commit) y ``PostgresEventBridge`` escucha esos canales en
+cada proceso y los reenvía a su hub local. Sin puente, los eventos se
+publican localmente tras el commit.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import event as sa_event
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import psycopg2_dsn
+
+logger = logging.getLogger(__name__)
+
+# Límite de PostgreSQL para el payload de NOTIFY (8000 bytes menos margen).
+MAX_NOTIFY_PAYLOAD = 7900
+
+_PENDING_EVENTS_KEY = "pending_events"
+
+EVENTS_PUBLISHED = registry.counter(
+    "events_published_total", "Eventos publicados", ["channel"]
+)
+EVENTS_DELIVERED = registry.counter(
+    "events_delivered_total", "Eventos entregados a suscriptores locales", ["channel"]
+)
+EVENTS_DROPPED = registry.counter(
+    "events_dropped_total",
+    "Eventos descartados por colas de suscriptores llenas",
+    ["channel"],
+)
+SUBSCRIBERS = registry.gauge(
+    "event_subscribers", "Suscriptores activos en este proceso", ["channel"]
+)
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+
+class Event:
+    """Evento ya decodificado; ``data`` conserva el JSON original para reenviarlo."""
+
+    __slots__ = ("channel", "data", "payload")
+
+    def __init__(self, channel: str, data: str, payload: Dict[str, Any]):
+        self.channel = channel
+        self.data = data
+        self.payload = payload
+
+
+# Políticas ante una cola de suscriptor llena.
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+
+
+class Subscription:
+    """Suscripción con cola acotada ligada al event loop que la creó.
+
+    Con ``DROP_OLDEST`` se pierden los eventos más antiguos; con
+    ``DISCONNECT`` se deja de encolar y se marca ``overflowed`` para que el
+    consumidor cierre la conexión y el cliente recupere el historial.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        predicate: Optional[Predicate],
+        maxsize: int,
+        key: Any = None,
+        overflow: str = DROP_OLDEST,
+    ):
+        self.channel = channel
+        self.predicate = predicate
+        self.key = key
+        self.overflow = overflow
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.overflowed = False
+
+    def offer(self, event: Event) -> None:
+        """Encolar un evento aplicando la política de desbordamiento."""
+        if self.queue.full():
+            self.dropped += 1
+            EVENTS_DROPPED.inc(channel=self.channel)
+            if self.overflow == DISCONNECT:
+                self.overflowed = True
+                return
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Esperar el siguiente evento; devuelve None si vence el tiempo."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+    """Reparto en proceso de eventos por canal.
+
+    Un canal puede declarar un campo del payload como clave de enrutamiento
+    (p. ej. ``contract_id``); las suscripciones con esa clave solo reciben sus
+    eventos sin recorrer al resto, lo que mantiene el coste de cada evento
+    independiente del número de conexiones abiertas.
+    """
+
+    def __init__(self) -> None:
+        self._subscriptions: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._keyed: Dict[str, Dict[Any, Set[Subscription]]] = defaultdict(dict)
+        self._routing_keys: Dict[str, str] = {}
+        self._listeners: Dict[str, List[Callable[[Dict[str, Any]], None]]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def set_routing_key(self, channel: str, field: str) -> None:
+        self._routing_keys[channel] = field
+
+    def add_listener(self, channel: str, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Registrar una función síncrona que recibe cada payload del canal.
+
+        Se invoca en el hilo que despacha (puente LISTEN o commit local), así
+        que debe ser rápida y segura entre hilos.
+        """
+        self._listeners[channel].append(callback)
+
+    def subscribe(
+        self,
+        channel: str,
+        predicate: Optional[Predicate] = None,
+        maxsize: Optional[int] = None,
+        key: Any = None,
+        overflow: str = DROP_OLDEST,
+    ) -> Subscription:
+        """Crear una suscripción; debe llamarse desde el event loop."""
+        subscription = Subscription(
+            channel,
+            predicate,
+            maxsize or settings.EVENT_SUBSCRIBER_QUEUE_SIZE,
+            key=key,
+            overflow=overflow,
+        )
+        with self._lock:
+            if key is None:
+                self._subscriptions[channel].add(subscription)
+            else:
+                self._keyed[channel].setdefault(key, set()).add(subscription)
+        SUBSCRIBERS.inc(channel=channel)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        channel = subscription.channel
+        with self._lock:
+            if subscription.key is None:
+                subscriptions = self._subscriptions.get(channel)
+            else:
+                subscriptions = self._keyed[channel].get(subscription.key)
+            if subscriptions is None or subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            if subscription.key is not None and not subscriptions:
+                del self._keyed[channel][subscription.key]
+        SUBSCRIBERS.dec(channel=channel)
+
+    def subscriber_count(self, channel: str) -> int:
+        keyed = sum(len(subs) for subs in self._keyed.get(channel, {}).values())
+        return len(self._subscriptions.get(channel, ())) + keyed
+
+    def dispatch(self, channel: str, data: str) -> None:
+        """Entregar un evento a los suscriptores locales. Seguro entre hilos.
+
+        El JSON se decodifica una sola vez y se programa una única llamada por
+        event loop, sin importar cuántos suscriptores tenga.
+        """
+        routing_field = self._routing_keys.get(channel)
+        listeners = self._listeners.get(channel)
+        if not self._subscriptions.get(channel) and not self._keyed.get(channel) and not listeners:
+            return
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            logger.warning("Evento con JSON inválido en el canal %s", channel)
+            return
+        for callback in listeners or ():
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("Error en un listener del canal %s", channel)
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+            if routing_field is not None:
+                keyed = self._keyed[channel].get(payload.get(routing_field))
+                if keyed:
+                    subscriptions.extend(keyed)
+        if not subscriptions:
+            return
+        event = Event(channel, data, payload)
+        by_loop: Dict[asyncio.AbstractEventLoop, List[Subscription]] = defaultdict(list)
+        for subscription in subscriptions:
+            if subscription.predicate is None or subscription.predicate(payload):
+                by_loop[subscription.loop].append(subscription)
+        for loop, targets in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self._fanout, targets, event)
+            except RuntimeError:
+                # El loop ya se cerró (apagado del proceso)
+                continue
+
+    @staticmethod
+    def _fanout(targets: List[Subscription], event: Event) -> None:
+        for subscription in targets:
+            subscription.offer(event)
+        EVENTS_DELIVERED.inc(len(targets), channel=event.channel)
+
+
+hub = EventHub()
+
+
+def encode(payload: Dict[str, Any]) -> str:
+    """Serializar un payload comprobando que cabe en un NOTIFY."""
+    data = json.dumps(payload, default=str, separators=(",", ":"))
+    if len(data.encode("utf-8")) > MAX_NOTIFY_PAYLOAD:
+        raise ValueError("El evento supera el tamaño máximo de NOTIFY")
+    return data
+
+
+def publish(db: Session, channel: str, payload: Dict[str, Any]) -> None:
+    """Publicar un evento ligado a la transacción actual de ``db``.
+
+    El evento solo se entrega si la transacción hace commit.
+    """
+    publish_many(db, channel, [payload])
+
+
+def publish_many(db: Session, channel: str, payloads: List[Dict[str, Any]]) -> None:
+    """Publicar varios eventos del mismo canal con una sola sentencia."""
+    if not payloads:
+        return
+    data = [encode(payload) for payload in payloads]
+    EVENTS_PUBLISHED.inc(len(data), channel=channel)
+    if settings.EVENTS_PG_BRIDGE_ENABLED:
+        db.execute(
+            text(
+                "SELECT pg_notify(:channel, payload) "
+                "FROM unnest(CAST(:payloads AS text[])) AS payload"
+            ),
+            {"channel": channel, "payloads": data},
+        )
+    else:
+        pending = db.info.setdefault(_PENDING_EVENTS_KEY, [])
+        pending.extend((channel, item) for item in data)
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _dispatch_pending_events(session: Session) -> None:
+    for channel, data in session.info.pop(_PENDING_EVENTS_KEY, ()):
+        hub.dispatch(channel, data)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session) -> None:
+    session.info.pop(_PENDING_EVENTS_KEY, None)
+
+
+class PostgresEventBridge:
+    """Hilo que escucha canales con LISTEN y los reenvía al hub local."""
+
+    def __init__(self, event_hub: EventHub) -> None:
+        self._hub = event_hub
+        self._channels: Set[str] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register_channel(self, channel: str) -> str:
+        """Declarar un canal a escuchar; debe hacerse antes de ``start``."""
+        self._channels.add(channel)
+        return channel
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pg-event-bridge", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(psycopg2_dsn())
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    for channel in sorted(self._channels):
+                        cursor.execute(f'LISTEN "{channel}"')
+                logger.info("Escuchando eventos de PostgreSQL en %s", sorted(self._channels))
+                backoff = 1.0
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self._hub.dispatch(notify.channel, notify.payload)
+            except psycopg2.Error:
+                logger.exception("Conexión LISTEN perdida; reintentando en %.0fs", backoff)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+bridge = PostgresEventBridge(hub)
@@ -0,0 +1,60 @@
+"""
+Cierre de los anuncios abiertos con el plazo vencido.
+
+Un anuncio cuyo ``deadline`` ha pasado ya no admite candidatos, pero seguía
+``OPEN`` y aparecía en los listados de abiertos. El trabajo periódico
+``announcements.expire`` los pasa a ``CLOSED`` por lotes de
+``ANNOUNCEMENT_EXPIRY_BATCH_SIZE`` filas, buscándolos por el índice
+``(status, deadline)``. Cada lote es una transacción corta: ajusta los
+contadores de sus categorías y publica un evento ``expired`` por anuncio en
+el canal de anuncios, como cualquier cambio hecho por el CRUD.
+
+Las filas bloqueadas por otra transacción se saltan y se cierran en la
+siguiente ejecución; repetir el trabajo es inocuo. La duración de cada
+ejecución queda en ``job_duration_seconds``.
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.metrics import registry
+from app.services import jobs
+from app.services.recommendations import feed_refresher
+
+logger = logging.getLogger(__name__)
+
+EXPIRE_ANNOUNCEMENTS = "announcements.expire"
+
+ANNOUNCEMENTS_EXPIRED = registry.counter(
+    "announcements_expired_total", "Anuncios abiertos cerrados al vencer su plazo"
+)
+
+
+@jobs.job(EXPIRE_ANNOUNCEMENTS)
+def expire_announcements(db: Session, payload: Dict[str, Any]) -> None:
+    """Cerrar todos los anuncios abiertos cuyo plazo venció antes de empezar."""
+    started = time.perf_counter()
+    # Un corte fijo: los anuncios que venzan durante la ejecución esperan a la siguiente
+    now = datetime.utcnow()
+    batch_size = settings.ANNOUNCEMENT_EXPIRY_BATCH_SIZE
+    total = 0
+    while True:
+        closed = crud.announcement.close_expired(db, now=now, limit=batch_size)
+        db.commit()
+        total += closed
+        ANNOUNCEMENTS_EXPIRED.inc(closed)
+        if closed < batch_size:
+            break
+    if total:
+        feed_refresher.request_refresh()
+    logger.info(
+        "Cerrados %d anuncios vencidos en %.2fs", total, time.perf_counter() - started
+    )
+
+
+jobs.periodic(EXPIRE_ANNOUNCEMENTS, every=settings.ANNOUNCEMENT_EXPIRY_INTERVAL_SECONDS)
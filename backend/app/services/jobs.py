@@ -0,0 +1,430 @@
+"""
+Cola de trabajos en segundo plano sobre una tabla de PostgreSQL.
+
+Cualquier módulo CRUD puede llamar a ``enqueue`` dentro de su transacción:
+el trabajo solo existe si el cambio que lo origina se confirma, y un
+``NOTIFY`` despierta a los workers en cuanto hay commit. ``worker.py`` ejecuta
+los trabajos con ``Worker``, que los reclama con
+``SELECT ... FOR UPDATE SKIP LOCKED`` para que varios procesos e hilos se
+repartan la cola sin bloquearse entre sí.
+
+Semántica: al menos una vez. Un trabajo en ejecución queda oculto durante su
+plazo de visibilidad; si el worker muere o lo supera, otro lo vuelve a
+reclamar. Los cambios que el manejador hace con la sesión recibida se
+confirman junto con la marca de completado, y se descartan si el plazo se
+perdió entretanto.
+
+Los manejadores se registran con el decorador ``job`` y los trabajos
+periódicos con ``periodic``; ``load_handlers`` importa los módulos de
+``HANDLER_MODULES`` para que el worker los conozca.
+"""
+import importlib
+import logging
+import os
+import select as select_module
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import and_, delete, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import SessionLocal, psycopg2_dsn
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JOBS_CHANNEL = "jobs"
+
+# Módulos que registran manejadores; los importa el worker al arrancar.
+HANDLER_MODULES = (
+    "app.services.jobs",
+    "app.core.rate_limit",
+    "app.services.revocation",
+    "app.services.counters",
+    "app.services.expiry",
+    "app.services.archive",
+)
+
+JOBS_ENQUEUED = registry.counter("jobs_enqueued_total", "Trabajos encolados", ["kind"])
+JOBS_FINISHED = registry.counter(
+    "jobs_finished_total",
+    "Intentos de ejecución terminados por resultado (done, retry, failed, lost)",
+    ["kind", "outcome"],
+)
+JOB_QUEUE_LATENCY = registry.histogram(
+    "job_queue_latency_seconds",
+    "Espera entre el momento programado de un trabajo y el inicio de su ejecución",
+    ["kind"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0),
+)
+JOB_DURATION = registry.histogram(
+    "job_duration_seconds", "Duración de la ejecución de un trabajo", ["kind"]
+)
+JOBS_RUNNING = registry.gauge("jobs_running", "Trabajos en ejecución en este proceso")
+
+Handler = Callable[[Session, Dict[str, Any]], None]
+
+
+class JobHandler:
+    """Manejador registrado para un tipo de trabajo."""
+
+    __slots__ = ("kind", "function", "timeout", "max_attempts")
+
+    def __init__(
+        self, kind: str, function: Handler, timeout: Optional[int], max_attempts: Optional[int]
+    ):
+        self.kind = kind
+        self.function = function
+        self.timeout = timeout or settings.JOB_VISIBILITY_TIMEOUT_SECONDS
+        self.max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+
+
+class PeriodicJob:
+    """Trabajo que se encola automáticamente cada ``every`` segundos."""
+
+    __slots__ = ("kind", "every", "payload")
+
+    def __init__(self, kind: str, every: int, payload: Dict[str, Any]):
+        self.kind = kind
+        self.every = every
+        self.payload = payload
+
+
+HANDLERS: Dict[str, JobHandler] = {}
+PERIODIC: List[PeriodicJob] = []
+
+
+def job(
+    kind: str, *, timeout: Optional[int] = None, max_attempts: Optional[int] = None
+) -> Callable[[Handler], Handler]:
+    """Registrar una función ``(db, payload)`` como manejador de ``kind``.
+
+    ``timeout`` es el plazo de visibilidad en segundos: el manejador debe
+    terminar antes o el trabajo se volverá a ejecutar en otro worker.
+    """
+
+    def decorator(function: Handler) -> Handler:
+        HANDLERS[kind] = JobHandler(kind, function, timeout, max_attempts)
+        return function
+
+    return decorator
+
+
+def periodic(kind: str, *, every: int, payload: Optional[Dict[str, Any]] = None) -> None:
+    """Programar ``kind`` cada ``every`` segundos.
+
+    Cada periodo genera un único trabajo aunque haya varios workers, gracias
+    a su ``dedupe_key``.
+    """
+    PERIODIC.append(PeriodicJob(kind, every, payload or {}))
+
+
+def load_handlers(modules: Sequence[str] = HANDLER_MODULES) -> Dict[str, JobHandler]:
+    for module in modules:
+        importlib.import_module(module)
+    return HANDLERS
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    run_at: Optional[datetime] = None,
+    delay: Optional[float] = None,
+    dedupe_key: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+) -> Optional[int]:
+    """Encolar un trabajo en la transacción actual de ``db``. No hace commit.
+
+    Devuelve el ID del trabajo, o None si ``dedupe_key`` ya existía.
+    """
+    now = datetime.utcnow()
+    if run_at is None:
+        run_at = now + timedelta(seconds=delay or 0)
+    handler = HANDLERS.get(kind)
+    job_id = db.execute(
+        insert(Job)
+        .values(
+            kind=kind,
+            payload=payload or {},
+            status=JobStatus.QUEUED,
+            dedupe_key=dedupe_key,
+            attempts=0,
+            max_attempts=max_attempts
+            or (handler.max_attempts if handler else settings.JOB_MAX_ATTEMPTS),
+            run_at=run_at,
+            created_at=now,
+        )
+        .on_conflict_do_nothing(index_elements=["dedupe_key"])
+        .returning(Job.id)
+    ).scalar()
+    if job_id is None:
+        return None
+    JOBS_ENQUEUED.inc(kind=kind)
+    if run_at <= now:
+        db.execute(text("SELECT pg_notify(:channel, :kind)"), {"channel": JOBS_CHANNEL, "kind": kind})
+    return job_id
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Espera antes del siguiente intento: exponencial y acotada."""
+    seconds = settings.JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, settings.JOB_RETRY_MAX_SECONDS))
+
+
+class Worker:
+    """Ejecuta trabajos de la cola con ``concurrency`` hilos.
+
+    Cada hilo reclama un trabajo cada vez. Los hilos sin trabajo esperan a un
+    ``NOTIFY`` del canal ``jobs`` o, como mucho,
+    ``JOB_POLL_INTERVAL_SECONDS`` (para trabajos programados y reintentos).
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, kinds: Optional[Sequence[str]] = None):
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self.kinds = list(kinds) if kinds else None
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._wake = threading.Condition()
+        self._threads: List[threading.Thread] = []
+
+    def _handled_kinds(self) -> List[str]:
+        kinds = self.kinds or list(HANDLERS)
+        return [kind for kind in kinds if kind in HANDLERS]
+
+    def run(self) -> None:
+        """Arrancar los hilos y escuchar notificaciones hasta ``stop``."""
+        kinds = self._handled_kinds()
+        if not kinds:
+            raise RuntimeError("No hay manejadores registrados para los tipos pedidos")
+        logger.info(
+            "Worker %s: %s hilos para %s", self.name, self.concurrency, ", ".join(sorted(kinds))
+        )
+        for index in range(self.concurrency):
+            thread = threading.Thread(
+                target=self._slot_loop, args=(kinds,), name=f"job-worker-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        if PERIODIC:
+            scheduler = threading.Thread(target=self._schedule_loop, name="job-scheduler", daemon=True)
+            scheduler.start()
+            self._threads.append(scheduler)
+        self._listen()
+        for thread in self._threads:
+            thread.join()
+
+    def stop(self) -> None:
+        """Dejar de reclamar trabajos; los que están en curso terminan."""
+        self._stop.set()
+        self._notify_all()
+
+    def _notify_all(self) -> None:
+        with self._wake:
+            self._wake.notify_all()
+
+    def _listen(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(psycopg2_dsn())
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{JOBS_CHANNEL}"')
+                backoff = 1.0
+                while not self._stop.is_set():
+                    if select_module.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    if conn.notifies:
+                        conn.notifies.clear()
+                        self._notify_all()
+            except psycopg2.Error:
+                logger.exception("Conexión LISTEN perdida; reintentando en %.0fs", backoff)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _slot_loop(self, kinds: List[str]) -> None:
+        while not self._stop.is_set():
+            try:
+                worked = self.run_one(kinds)
+            except Exception:
+                logger.exception("Error inesperado en el worker de trabajos")
+                worked = False
+                self._stop.wait(1.0)
+            if not worked and not self._stop.is_set():
+                with self._wake:
+                    self._wake.wait(settings.JOB_POLL_INTERVAL_SECONDS)
+
+    def claim(self, db: Session, kinds: List[str]) -> Optional[Job]:
+        """Reservar el siguiente trabajo disponible y confirmar la reserva."""
+        now = datetime.utcnow()
+        claimed = db.scalars(
+            select(Job)
+            .where(
+                Job.kind.in_(kinds),
+                or_(
+                    and_(Job.status == JobStatus.QUEUED, Job.run_at <= now),
+                    and_(Job.status == JobStatus.RUNNING, Job.locked_until < now),
+                ),
+            )
+            .order_by(Job.run_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).first()
+        if claimed is None:
+            db.rollback()
+            return None
+        claimed.status = JobStatus.RUNNING
+        claimed.attempts += 1
+        claimed.started_at = now
+        claimed.locked_by = self.name
+        claimed.locked_until = now + timedelta(seconds=HANDLERS[claimed.kind].timeout)
+        db.commit()
+        return claimed
+
+    def run_one(self, kinds: List[str]) -> bool:
+        """Reclamar y ejecutar un trabajo; devuelve False si la cola estaba vacía."""
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            claimed = self.claim(db, kinds)
+            if claimed is None:
+                return False
+            self._execute(db, claimed)
+            return True
+        finally:
+            db.close()
+
+    def _finish(self, db: Session, claimed: Job, **values: Any) -> bool:
+        """Actualizar el trabajo solo si esta reserva sigue vigente."""
+        result = db.execute(
+            update(Job)
+            .where(
+                Job.id == claimed.id,
+                Job.status == JobStatus.RUNNING,
+                Job.locked_by == self.name,
+                Job.started_at == claimed.started_at,
+            )
+            .values(locked_until=None, locked_by=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    def _execute(self, db: Session, claimed: Job) -> None:
+        handler = HANDLERS[claimed.kind]
+        kind = claimed.kind
+        JOB_QUEUE_LATENCY.observe(
+            max((claimed.started_at - claimed.run_at).total_seconds(), 0.0), kind=kind
+        )
+        JOBS_RUNNING.inc()
+        try:
+            with JOB_DURATION.time(kind=kind):
+                handler.function(db, dict(claimed.payload or {}))
+                finished = self._finish(
+                    db, claimed, status=JobStatus.DONE, finished_at=datetime.utcnow()
+                )
+                if not finished:
+                    # Otro worker reclamó el trabajo al vencer el plazo
+                    db.rollback()
+                    JOBS_FINISHED.inc(kind=kind, outcome="lost")
+                    logger.warning("El trabajo %s superó su plazo de visibilidad", claimed.id)
+                    return
+                db.commit()
+            JOBS_FINISHED.inc(kind=kind, outcome="done")
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Error en el trabajo %s (%s)", claimed.id, kind)
+            error = f"{type(exc).__name__}: {exc}"[:1000]
+            if claimed.attempts >= claimed.max_attempts:
+                values = {"status": JobStatus.FAILED, "finished_at": datetime.utcnow()}
+                outcome = "failed"
+            else:
+                values = {
+                    "status": JobStatus.QUEUED,
+                    "run_at": datetime.utcnow() + retry_delay(claimed.attempts),
+                }
+                outcome = "retry"
+            if self._finish(db, claimed, last_error=error, **values):
+                db.commit()
+                JOBS_FINISHED.inc(kind=kind, outcome=outcome)
+            else:
+                db.rollback()
+                JOBS_FINISHED.inc(kind=kind, outcome="lost")
+        finally:
+            JOBS_RUNNING.dec()
+
+    def _schedule_loop(self) -> None:
+        """Encolar los trabajos periódicos del periodo en curso."""
+        while not self._stop.is_set():
+            # ``datetime.utcnow().timestamp()`` leería la hora UTC como local
+            epoch = int(time.time())
+            db = SessionLocal()
+            try:
+                for entry in PERIODIC:
+                    slot = epoch - epoch % entry.every
+                    enqueue(
+                        db,
+                        entry.kind,
+                        entry.payload,
+                        run_at=datetime.utcfromtimestamp(slot),
+                        dedupe_key=f"{entry.kind}@{slot}",
+                    )
+                db.commit()
+            except Exception:
+                db.rollback()
+                logger.exception("Error al programar trabajos periódicos")
+            finally:
+                db.close()
+            self._stop.wait(settings.JOB_SCHEDULER_TICK_SECONDS)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+
+def serve_metrics(port: int) -> ThreadingHTTPServer:
+    """Exponer las métricas del worker, que no sirve la API, en ``port``."""
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="job-metrics", daemon=True).start()
+    return server
+
+
+PURGE_FINISHED_JOBS = "jobs.purge_finished"
+
+
+@job(PURGE_FINISHED_JOBS)
+def purge_finished_jobs(db: Session, payload: Dict[str, Any]) -> None:
+    """Borrar los trabajos terminados con más antigüedad que la retención."""
+    cutoff = datetime.utcnow() - timedelta(days=settings.JOB_RETENTION_DAYS)
+    db.execute(
+        delete(Job).where(
+            Job.status.in_([JobStatus.DONE, JobStatus.FAILED]),
+            Job.finished_at < cutoff,
+        )
+    )
+
+
+periodic(PURGE_FINISHED_JOBS, every=3600)
@@ -0,0 +1,357 @@
+"""
+Servicio de notificaciones por correo electrónico.
+
+Las notificaciones se escriben con ``enqueue`` en la tabla ``notifications``
+dentro de la transacción que las origina, sin añadir latencia SMTP a la
+petición. ``NotificationDispatcher`` las reclama por lotes con
+``FOR UPDATE SKIP LOCKED`` (varios workers pueden drenar la tabla a la vez),
+las envía reutilizando una única conexión SMTP y reprograma las fallidas con
+espera exponencial hasta ``NOTIFICATION_MAX_ATTEMPTS``. Cada envío se confirma
+en cuanto sale, y un lote que agota su reserva devuelve a la cola lo que no
+llegó a enviar, para que otro worker no repita los correos ya enviados.
+
+Las plantillas Jinja se compilan una sola vez al importar el módulo, por lo
+que una plantilla ausente o con errores falla al arrancar y no al enviar.
+"""
+import logging
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+from sqlalchemy import event as sa_event
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import SessionLocal
+from app.models.notification import Notification, NotificationStatus
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+
+# Tipos de notificación; cada uno necesita ``<tipo>.subject.txt`` y ``<tipo>.html``.
+PROPOSAL_ACCEPTED = "proposal_accepted"
+CONTRACT_CREATED = "contract_created"
+KINDS = (PROPOSAL_ACCEPTED, CONTRACT_CREATED)
+
+_WAKE_KEY = "wake_notification_dispatcher"
+
+NOTIFICATIONS_SENT = registry.counter(
+    "notifications_sent_total", "Notificaciones entregadas", ["kind"]
+)
+NOTIFICATION_FAILURES = registry.counter(
+    "notifications_send_failures_total", "Intentos de envío fallidos", ["kind"]
+)
+NOTIFICATIONS_ABANDONED = registry.counter(
+    "notifications_abandoned_total",
+    "Notificaciones descartadas tras agotar los reintentos",
+    ["kind"],
+)
+BATCH_DURATION = registry.histogram(
+    "notification_batch_duration_seconds", "Duración del envío de un lote de notificaciones"
+)
+DELIVERY_LATENCY = registry.histogram(
+    "notification_delivery_latency_seconds",
+    "Tiempo entre la creación de una notificación y su entrega",
+    buckets=(1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0, 21600.0),
+)
+
+_environment = Environment(
+    loader=FileSystemLoader(str(TEMPLATE_DIR)),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+    cache_size=-1,
+)
+TEMPLATES: Dict[str, Tuple[Template, Template]] = {
+    kind: (
+        _environment.get_template(f"{kind}.subject.txt"),
+        _environment.get_template(f"{kind}.html"),
+    )
+    for kind in KINDS
+}
+
+
+def render(kind: str, context: Dict[str, Any]) -> Tuple[str, str]:
+    """Renderizar el asunto y el cuerpo HTML de una notificación."""
+    subject_template, body_template = TEMPLATES[kind]
+    values = {"project_name": settings.PROJECT_NAME, **context}
+    subject = subject_template.render(values).strip()
+    return subject, body_template.render(subject=subject, **values)
+
+
+def enqueue(db: Session, *, kind: str, recipient: User, context: Dict[str, Any]) -> Notification:
+    """Añadir una notificación a la transacción actual de ``db``. No hace commit."""
+    if kind not in TEMPLATES:
+        raise ValueError(f"Tipo de notificación desconocido: {kind}")
+    notification = Notification(
+        kind=kind,
+        recipient_id=recipient.id,
+        recipient_email=recipient.email,
+        context=jsonable_encoder(context),
+    )
+    db.add(notification)
+    db.info[_WAKE_KEY] = True
+    return notification
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session: Session) -> None:
+    if session.info.pop(_WAKE_KEY, False):
+        dispatcher.request_dispatch()
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_wake(session: Session) -> None:
+    session.info.pop(_WAKE_KEY, None)
+
+
+class SMTPMailer:
+    """Cliente SMTP que mantiene abierta la conexión entre envíos.
+
+    Si el servidor cierra una conexión reutilizada, se reconecta y se
+    reintenta el envío una vez antes de dar el error por bueno.
+    """
+
+    def __init__(self) -> None:
+        self._connection: Optional[smtplib.SMTP] = None
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(
+            settings.SMTP_HOST, settings.SMTP_PORT or 0, timeout=settings.SMTP_TIMEOUT_SECONDS
+        )
+        try:
+            if settings.SMTP_TLS:
+                connection.starttls()
+            if settings.SMTP_USER:
+                connection.login(settings.SMTP_USER, settings.SMTP_PASSWORD or "")
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def send(self, to: str, subject: str, html: str) -> None:
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = formataddr(
+            (settings.EMAILS_FROM_NAME or settings.PROJECT_NAME, settings.EMAILS_FROM_EMAIL or "")
+        )
+        message["To"] = to
+        message.set_content(html, subtype="html")
+
+        reused = self._connection is not None
+        if self._connection is None:
+            self._connection = self._connect()
+        try:
+            self._connection.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            if not reused:
+                raise
+            self._connection = self._connect()
+            self._connection.send_message(message)
+
+    def close(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._connection.quit()
+        except (smtplib.SMTPException, OSError):
+            self._connection.close()
+        finally:
+            self._connection = None
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Espera antes del siguiente intento: exponencial y acotada."""
+    seconds = settings.NOTIFICATION_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, settings.NOTIFICATION_RETRY_MAX_SECONDS))
+
+
+def lease_duration() -> timedelta:
+    """Plazo de la reserva de un lote."""
+    return timedelta(seconds=settings.NOTIFICATION_LEASE_SECONDS)
+
+
+def send_margin() -> timedelta:
+    """Lo que puede tardar un envío: el intento y una reconexión."""
+    return timedelta(seconds=2 * settings.SMTP_TIMEOUT_SECONDS)
+
+
+def claim_batch(db: Session, now: datetime) -> List[Notification]:
+    """Reservar un lote de notificaciones pendientes y confirmar la reserva.
+
+    Las filas reservadas se ocultan a otros workers durante
+    ``NOTIFICATION_LEASE_SECONDS``; si el proceso muere a mitad de envío,
+    vuelven a estar disponibles al vencer ese plazo.
+    """
+    batch = db.scalars(
+        select(Notification)
+        .where(
+            Notification.status == NotificationStatus.PENDING,
+            Notification.available_at <= now,
+        )
+        .order_by(Notification.available_at)
+        .limit(settings.NOTIFICATION_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    ).all()
+    lease_until = now + lease_duration()
+    for notification in batch:
+        notification.attempts += 1
+        notification.available_at = lease_until
+    db.commit()
+    return batch
+
+
+def _update_leased(db: Session, ids: List[int], lease_until: datetime, **values: Any) -> None:
+    """Actualizar las filas de ``ids`` que siguen reservadas por este lote."""
+    db.execute(
+        update(Notification)
+        .where(Notification.id.in_(ids), Notification.available_at == lease_until)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def deliver_batch(db: Session, mailer: SMTPMailer) -> int:
+    """Enviar un lote de notificaciones; devuelve cuántas se reservaron.
+
+    Antes de cada envío se comprueba que a la reserva le quede al menos
+    ``send_margin``; si no, las que faltan se devuelven a la cola sin contar
+    el intento y el lote termina.
+    """
+    claimed_at = datetime.utcnow()
+    batch = claim_batch(db, claimed_at)
+    if not batch:
+        return 0
+    lease_until = claimed_at + lease_duration()
+
+    with BATCH_DURATION.time():
+        for index, notification in enumerate(batch):
+            now = datetime.utcnow()
+            if now + send_margin() > lease_until:
+                unsent = [pending.id for pending in batch[index:]]
+                logger.warning(
+                    "Reserva de notificaciones agotada; %d vuelven a la cola", len(unsent)
+                )
+                _update_leased(
+                    db, unsent, lease_until,
+                    available_at=now, attempts=Notification.attempts - 1,
+                )
+                break
+            try:
+                subject, html = render(notification.kind, notification.context)
+                mailer.send(notification.recipient_email, subject, html)
+            except Exception as exc:
+                NOTIFICATION_FAILURES.inc(kind=notification.kind)
+                logger.warning(
+                    "No se pudo enviar la notificación %s (intento %s): %s",
+                    notification.id,
+                    notification.attempts,
+                    exc,
+                )
+                # Forzar una conexión nueva para el siguiente envío
+                mailer.close()
+                values: Dict[str, Any] = {"last_error": str(exc)[:1000]}
+                if notification.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                    values["status"] = NotificationStatus.FAILED
+                    NOTIFICATIONS_ABANDONED.inc(kind=notification.kind)
+                else:
+                    values["available_at"] = datetime.utcnow() + retry_delay(
+                        notification.attempts
+                    )
+                _update_leased(db, [notification.id], lease_until, **values)
+                continue
+            sent_at = datetime.utcnow()
+            # Sin comprobar la reserva: el correo ya salió y no debe repetirse
+            db.execute(
+                update(Notification)
+                .where(Notification.id == notification.id)
+                .values(status=NotificationStatus.SENT, sent_at=sent_at, last_error=None)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            NOTIFICATIONS_SENT.inc(kind=notification.kind)
+            DELIVERY_LATENCY.observe((sent_at - notification.created_at).total_seconds())
+    return len(batch)
+
+
+class NotificationDispatcher:
+    """Hilo en segundo plano que drena la bandeja de salida.
+
+    Se despierta cada ``NOTIFICATION_POLL_INTERVAL_SECONDS`` o, en este
+    proceso, justo después del commit que encoló una notificación. Mientras
+    haya lotes completos los envía seguidos con la misma conexión SMTP y la
+    cierra al quedarse sin trabajo.
+    """
+
+    def __init__(self) -> None:
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._wake.set()  # Drenar lo pendiente al arrancar
+        self._thread = threading.Thread(
+            target=self._run, name="notification-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def request_dispatch(self) -> None:
+        """Pedir un envío lo antes posible (no bloquea)."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        mailer = SMTPMailer()
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(settings.NOTIFICATION_POLL_INTERVAL_SECONDS)
+                if self._stop.is_set():
+                    break
+                self._wake.clear()
+                self.run_once(mailer)
+                mailer.close()
+        finally:
+            mailer.close()
+
+    def run_once(self, mailer: SMTPMailer) -> int:
+        """Enviar lotes hasta vaciar lo disponible; devuelve cuántas se procesaron."""
+        processed = 0
+        # Sin expirar al confirmar la reserva: el lote se usa tras el commit
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            while not self._stop.is_set():
+                claimed = deliver_batch(db, mailer)
+                processed += claimed
+                if claimed < settings.NOTIFICATION_BATCH_SIZE:
+                    break
+        except Exception:
+            db.rollback()
+            logger.exception("Error al enviar notificaciones")
+            # Evitar un bucle de errores si la base de datos no responde
+            self._stop.wait(1.0)
+        finally:
+            db.close()
+        return processed
+
+
+dispatcher = NotificationDispatcher()
@@ -0,0 +1,300 @@
+"""
+Servicio del feed de recomendaciones precalculado.
+
+Un proceso en segundo plano recalcula periódicamente (y cuando se publica un
+anuncio) el top-N de anuncios abiertos para cada mercenario, procesando a los
+mercenarios por lotes, y guarda el resultado en ``recommendation_feed``. El
+endpoint de lectura solo pagina esa tabla.
+"""
+import heapq
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, or_, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import SessionLocal, engine
+from app.models.announcement import Announcement, AnnouncementStatus
+from app.models.contract import Contract
+from app.models.recommendation import RecommendationFeedEntry
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+# Clave del advisory lock de PostgreSQL que garantiza un solo recálculo a la vez
+# aunque cada worker de gunicorn tenga su propio hilo de refresco.
+FEED_REFRESH_LOCK_KEY = 7_326_001
+
+# Peso de la afinidad por categoría frente a la frescura del anuncio.
+CATEGORY_AFFINITY_WEIGHT = 1.0
+
+BATCH_DURATION = registry.histogram(
+    "recommendation_feed_batch_duration_seconds",
+    "Duración del recálculo de un lote de mercenarios",
+)
+REFRESH_DURATION = registry.histogram(
+    "recommendation_feed_refresh_duration_seconds",
+    "Duración de un recálculo completo del feed",
+    buckets=(1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+MERCENARIES_PROCESSED = registry.counter(
+    "recommendation_feed_mercenaries_total",
+    "Mercenarios cuyo feed fue recalculado",
+)
+REFRESH_FAILURES = registry.counter(
+    "recommendation_feed_refresh_failures_total",
+    "Recálculos del feed que terminaron con error",
+)
+LAST_REFRESH = registry.gauge(
+    "recommendation_feed_last_refresh_timestamp_seconds",
+    "Marca de tiempo del último recálculo completo en este proceso",
+)
+STALENESS = registry.gauge(
+    "recommendation_feed_staleness_seconds",
+    "Segundos desde el cálculo más reciente del feed guardado en la base de datos",
+)
+
+
+def feed_staleness() -> float:
+    """Antigüedad del feed según el ``computed_at`` más reciente.
+
+    Se lee de la base de datos, así que es la misma en todos los procesos,
+    lo haga o no el recálculo el de este. Sin feed devuelve 0 y, si la base
+    de datos no responde, NaN.
+    """
+    db = SessionLocal()
+    try:
+        computed_at = db.scalar(select(func.max(RecommendationFeedEntry.computed_at)))
+    except SQLAlchemyError:
+        logger.warning("No se pudo leer la antigüedad del feed de recomendaciones", exc_info=True)
+        return math.nan
+    finally:
+        db.close()
+    if computed_at is None:
+        return 0.0
+    return max((datetime.utcnow() - computed_at).total_seconds(), 0.0)
+
+
+STALENESS.set_function(feed_staleness)
+
+
+class CandidatePool:
+    """Anuncios abiertos candidatos, agrupados por categoría.
+
+    Cada grupo se ordena por frescura descendente una sola vez; como la
+    afinidad suma una constante por categoría, el top-N de un mercenario está
+    siempre entre los N primeros de cada grupo.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, int, datetime]], now: datetime, size: int):
+        self.size = size
+        by_category: Dict[int, List[Tuple[float, int]]] = defaultdict(list)
+        for announcement_id, category_id, created_at in rows:
+            age_days = max((now - created_at).total_seconds(), 0.0) / 86400
+            by_category[category_id].append((1.0 / (1.0 + age_days), announcement_id))
+        self.by_category = {
+            category_id: heapq.nlargest(size, entries)
+            for category_id, entries in by_category.items()
+        }
+        self.baseline = heapq.nlargest(
+            size, (entry for entries in self.by_category.values() for entry in entries)
+        )
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.by_category.values())
+
+    def rank(self, affinity: Optional[Dict[int, int]]) -> List[Tuple[float, int]]:
+        """Devolver el top-N (puntuación, announcement_id) para una afinidad."""
+        if not affinity:
+            return self.baseline
+        scored = []
+        for category_id, entries in self.by_category.items():
+            boost = CATEGORY_AFFINITY_WEIGHT * math.log1p(affinity.get(category_id, 0))
+            scored.extend((freshness + boost, announcement_id) for freshness, announcement_id in entries)
+        return heapq.nlargest(self.size, scored)
+
+
+def load_candidates(db: Session, now: datetime) -> CandidatePool:
+    """Cargar los anuncios abiertos y vigentes más recientes."""
+    rows = db.execute(
+        select(Announcement.id, Announcement.category_id, Announcement.created_at)
+        .where(
+            Announcement.status == AnnouncementStatus.OPEN,
+            or_(Announcement.deadline.is_(None), Announcement.deadline > now),
+        )
+        .order_by(Announcement.created_at.desc())
+        .limit(settings.RECOMMENDATION_CANDIDATE_POOL)
+    ).all()
+    return CandidatePool(rows, now, settings.RECOMMENDATION_FEED_SIZE)
+
+
+def load_affinities(db: Session, mercenary_ids: Sequence[int]) -> Dict[int, Dict[int, int]]:
+    """Contar los contratos de cada mercenario por categoría de anuncio."""
+    rows = db.execute(
+        select(Contract.mercenary_id, Announcement.category_id, func.count())
+        .join(Announcement, Announcement.id == Contract.announcement_id)
+        .where(Contract.mercenary_id.in_(mercenary_ids))
+        .group_by(Contract.mercenary_id, Announcement.category_id)
+    ).all()
+    affinities: Dict[int, Dict[int, int]] = defaultdict(dict)
+    for mercenary_id, category_id, total in rows:
+        affinities[mercenary_id][category_id] = total
+    return affinities
+
+
+def refresh_batch(
+    db: Session, mercenary_ids: Sequence[int], pool: CandidatePool, now: datetime
+) -> int:
+    """Reemplazar el feed de un lote de mercenarios. No hace commit."""
+    affinities = load_affinities(db, mercenary_ids)
+    rows = []
+    for mercenary_id in mercenary_ids:
+        for rank, (score, announcement_id) in enumerate(
+            pool.rank(affinities.get(mercenary_id)), start=1
+        ):
+            rows.append(
+                {
+                    "mercenary_id": mercenary_id,
+                    "rank": rank,
+                    "announcement_id": announcement_id,
+                    "score": score,
+                    "computed_at": now,
+                }
+            )
+    db.execute(
+        delete(RecommendationFeedEntry).where(
+            RecommendationFeedEntry.mercenary_id.in_(mercenary_ids)
+        )
+    )
+    if rows:
+        db.execute(insert(RecommendationFeedEntry), rows)
+    return len(rows)
+
+
+def refresh_all(db: Session) -> int:
+    """Recalcular el feed de todos los mercenarios activos, lote a lote.
+
+    Cada lote se confirma por separado para no mantener bloqueos largos;
+    los lectores ven el feed anterior o el nuevo, nunca uno a medias.
+    """
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    pool = load_candidates(db, now)
+    processed = 0
+    last_id = 0
+    while True:
+        mercenary_ids = db.execute(
+            select(User.id)
+            .where(
+                User.role == UserRole.FREELANCER,
+                User.is_active.is_(True),
+                User.id > last_id,
+            )
+            .order_by(User.id)
+            .limit(settings.RECOMMENDATION_BATCH_SIZE)
+        ).scalars().all()
+        if not mercenary_ids:
+            break
+        with BATCH_DURATION.time():
+            refresh_batch(db, mercenary_ids, pool, now)
+            db.commit()
+        processed += len(mercenary_ids)
+        last_id = mercenary_ids[-1]
+
+    elapsed = time.perf_counter() - started
+    REFRESH_DURATION.observe(elapsed)
+    MERCENARIES_PROCESSED.inc(processed)
+    LAST_REFRESH.set(time.time())
+    logger.info(
+        "Feed de recomendaciones recalculado: %s mercenarios, %s candidatos, %.2fs",
+        processed,
+        len(pool),
+        elapsed,
+    )
+    return processed
+
+
+class FeedRefresher:
+    """Hilo en segundo plano que mantiene el feed actualizado.
+
+    Se despierta cada ``RECOMMENDATION_REFRESH_INTERVAL_SECONDS`` o cuando se
+    llama a ``request_refresh``; las peticiones que llegan durante un
+    recálculo se agrupan en el siguiente, respetando un intervalo mínimo.
+    """
+
+    def __init__(self) -> None:
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._wake.set()  # Primer recálculo inmediato
+        self._thread = threading.Thread(
+            target=self._run, name="recommendation-feed", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def request_refresh(self) -> None:
+        """Pedir un recálculo lo antes posible (no bloquea)."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(settings.RECOMMENDATION_REFRESH_INTERVAL_SECONDS)
+            if self._stop.is_set():
+                break
+            self._wake.clear()
+            # run_once registra y absorbe sus errores: una caída de la base
+            # de datos no detiene el hilo, se reintenta en la próxima vuelta
+            self.run_once()
+            self._stop.wait(settings.RECOMMENDATION_MIN_REFRESH_SECONDS)
+
+    def run_once(self) -> bool:
+        """Ejecutar un recálculo si ningún otro proceso lo está haciendo.
+
+        Devuelve ``False`` si otro proceso tiene el lock o si el recálculo
+        falla, incluso al conectar o al tomar el lock.
+        """
+        try:
+            with engine.connect() as lock_conn:
+                acquired = lock_conn.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": FEED_REFRESH_LOCK_KEY}
+                ).scalar()
+                if not acquired:
+                    return False
+                try:
+                    db = SessionLocal()
+                    try:
+                        refresh_all(db)
+                    finally:
+                        db.close()
+                finally:
+                    lock_conn.execute(
+                        text("SELECT pg_advisory_unlock(:key)"), {"key": FEED_REFRESH_LOCK_KEY}
+                    )
+            return True
+        except Exception:
+            REFRESH_FAILURES.inc()
+            logger.exception("Error al recalcular el feed de recomendaciones")
+            return False
+
+
+feed_refresher = FeedRefresher()
@@ -0,0 +1,297 @@
+"""
+Revocación de tokens JWT con filtro de Bloom en memoria.
+
+La fuente de verdad es la tabla ``revoked_tokens``. Cada proceso mantiene un
+filtro de Bloom con sus claves, de modo que comprobar un token que no está
+revocado (el caso de casi todas las peticiones) no toca la base de datos: un
+filtro de Bloom no tiene falsos negativos. Solo cuando el filtro responde
+"quizá" se consulta la tabla para confirmar.
+
+El filtro se mantiene al día entre workers de tres formas:
+
+* cada revocación publica un evento ``token_revocations`` en la misma
+  transacción, que el puente LISTEN de cada proceso añade al filtro;
+* como respaldo ante notificaciones perdidas, cada
+  ``REVOCATION_SYNC_SECONDS`` se leen las filas nuevas por ``seq``. Los
+  ``seq`` se asignan al insertar pero las filas se ven al hacer commit, así
+  que una revocación puede aparecer después de otra con ``seq`` mayor: cada
+  lectura empieza ``REVOCATION_SYNC_SEQ_WINDOW`` secuencias por debajo de la
+  última vista;
+* cada ``REVOCATION_REBUILD_SECONDS`` se reconstruye desde las filas vigentes
+  para soltar las claves caducadas.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import SessionLocal
+from app.models.revoked_token import RevokedToken
+from app.services import events, jobs
+
+logger = logging.getLogger(__name__)
+
+REVOCATIONS_CHANNEL = events.bridge.register_channel("token_revocations")
+
+REVOCATION_CHECKS = registry.counter(
+    "token_revocation_checks_total",
+    "Comprobaciones de revocación por resultado (clear, revoked, false_positive)",
+    ["result"],
+)
+REVOCATION_FILTER_SIZE = registry.gauge(
+    "token_revocation_filter_keys", "Claves cargadas en el filtro de Bloom de este proceso"
+)
+
+
+def jti_key(jti: str) -> str:
+    return f"jti:{jti}"
+
+
+def family_key(family_id: str) -> str:
+    return f"fid:{family_id}"
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def max_token_lifetime() -> timedelta:
+    """Vida máxima de cualquier token emitido, para caducar las revocaciones."""
+    return max(
+        timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+
+class BloomFilter:
+    """Filtro de Bloom con doble hashing sobre un único digest BLAKE2b."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return ((first + index * step) % self.size for index in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationStore:
+    """Comprobación y registro de revocaciones respaldados por la tabla."""
+
+    def __init__(self) -> None:
+        self._filter: Optional[BloomFilter] = None
+        self._last_seq = 0
+        self._last_sync = 0.0
+        self._last_rebuild = 0.0
+        self._lock = threading.Lock()
+
+    # Mantenimiento del filtro
+
+    def _new_filter(self) -> BloomFilter:
+        return BloomFilter(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE)
+
+    def _rebuild(self) -> None:
+        bloom = self._new_filter()
+        last_seq = 0
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(RevokedToken.key, RevokedToken.seq).where(
+                    RevokedToken.expires_at > datetime.utcnow()
+                )
+            )
+            for key, seq in rows:
+                bloom.add(key)
+                last_seq = max(last_seq, seq)
+        self._filter, self._last_seq = bloom, last_seq
+        self._last_rebuild = self._last_sync = time.monotonic()
+        REVOCATION_FILTER_SIZE.set(bloom.count)
+
+    def _sync(self) -> None:
+        since = self._last_seq - settings.REVOCATION_SYNC_SEQ_WINDOW
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(RevokedToken.key, RevokedToken.seq)
+                .where(RevokedToken.seq > since)
+                .order_by(RevokedToken.seq)
+            ).all()
+        for key, seq in rows:
+            # La ventana relee claves ya cargadas; no deben contar para la capacidad
+            if key not in self._filter:
+                self._filter.add(key)
+            self._last_seq = max(self._last_seq, seq)
+        self._last_sync = time.monotonic()
+        REVOCATION_FILTER_SIZE.set(self._filter.count)
+
+    def _ensure_fresh(self) -> BloomFilter:
+        if self._filter is None:
+            with self._lock:
+                if self._filter is None:
+                    self._rebuild()
+            return self._filter
+        now = time.monotonic()
+        stale = now - self._last_sync > settings.REVOCATION_SYNC_SECONDS
+        expired = (
+            now - self._last_rebuild > settings.REVOCATION_REBUILD_SECONDS
+            or self._filter.count > self._filter.capacity
+        )
+        # Un solo hilo mantiene el filtro; el resto usa el actual sin esperar
+        if (stale or expired) and self._lock.acquire(blocking=False):
+            try:
+                if expired:
+                    self._rebuild()
+                else:
+                    self._sync()
+            except Exception:
+                logger.exception("No se pudo sincronizar el filtro de revocaciones")
+                self._last_sync = now
+            finally:
+                self._lock.release()
+        return self._filter
+
+    def add_key(self, key: str) -> None:
+        """Añadir una clave al filtro local (llamado por el puente de eventos)."""
+        if self._filter is not None:
+            self._filter.add(key)
+            REVOCATION_FILTER_SIZE.set(self._filter.count)
+
+    # Consulta
+
+    def is_revoked(self, claims: Dict[str, Any], db: Optional[Session] = None) -> bool:
+        """Indicar si un token decodificado está revocado.
+
+        Sin coincidencias en el filtro no hay acceso a la base de datos.
+        """
+        bloom = self._ensure_fresh()
+        keys: List[str] = []
+        if claims.get("jti"):
+            keys.append(jti_key(claims["jti"]))
+        if claims.get("fid"):
+            keys.append(family_key(claims["fid"]))
+        if claims.get("user_id") is not None:
+            keys.append(user_key(claims["user_id"]))
+        candidates = [key for key in keys if key in bloom]
+        if not candidates:
+            REVOCATION_CHECKS.inc(result="clear")
+            return False
+
+        statement = select(RevokedToken.key, RevokedToken.revoked_at).where(
+            RevokedToken.key.in_(candidates), RevokedToken.expires_at > datetime.utcnow()
+        )
+        if db is not None:
+            rows = db.execute(statement).all()
+        else:
+            with SessionLocal() as own_db:
+                rows = own_db.execute(statement).all()
+
+        issued_at = claims.get("iat")
+        for key, revoked_at in rows:
+            if not key.startswith("user:"):
+                REVOCATION_CHECKS.inc(result="revoked")
+                return True
+            # Revocación por usuario: afecta a los tokens emitidos hasta ese segundo
+            revoked_ts = revoked_at.replace(tzinfo=timezone.utc).timestamp()
+            if issued_at is None or issued_at <= revoked_ts:
+                REVOCATION_CHECKS.inc(result="revoked")
+                return True
+        REVOCATION_CHECKS.inc(result="false_positive")
+        return False
+
+    # Registro (dentro de la transacción del llamador; no hacen commit)
+
+    def _publish(self, db: Session, key: str) -> None:
+        events.publish(db, REVOCATIONS_CHANNEL, {"key": key})
+        self.add_key(key)
+
+    def revoke(
+        self, db: Session, key: str, *, user_id: Optional[int], expires_at: datetime
+    ) -> None:
+        """Revocar una clave; si ya existía se actualiza su momento de revocación."""
+        now = datetime.utcnow()
+        statement = insert(RevokedToken).values(
+            key=key, user_id=user_id, revoked_at=now, expires_at=expires_at
+        )
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[RevokedToken.key],
+                set_={"revoked_at": now, "expires_at": statement.excluded.expires_at},
+            )
+        )
+        self._publish(db, key)
+
+    def revoke_family(self, db: Session, family_id: str, *, user_id: Optional[int]) -> None:
+        """Revocar todos los tokens de una sesión."""
+        self.revoke(
+            db,
+            family_key(family_id),
+            user_id=user_id,
+            expires_at=datetime.utcnow() + max_token_lifetime(),
+        )
+
+    def revoke_user(self, db: Session, user_id: int) -> None:
+        """Revocar todos los tokens emitidos hasta ahora a un usuario."""
+        self.revoke(
+            db,
+            user_key(user_id),
+            user_id=user_id,
+            expires_at=datetime.utcnow() + max_token_lifetime(),
+        )
+
+    def consume(
+        self, db: Session, jti: str, *, user_id: Optional[int], expires_at: datetime
+    ) -> bool:
+        """Marcar un refresh token como usado.
+
+        Devuelve False si ya se había usado, lo que indica una reutilización.
+        La inserción condicional es atómica, así que dos usos concurrentes no
+        pueden tener éxito a la vez.
+        """
+        key = jti_key(jti)
+        inserted = db.execute(
+            insert(RevokedToken)
+            .values(key=key, user_id=user_id, revoked_at=datetime.utcnow(), expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[RevokedToken.key])
+            .returning(RevokedToken.key)
+        ).scalar()
+        if inserted is None:
+            return False
+        self._publish(db, key)
+        return True
+
+
+store = RevocationStore()
+events.hub.add_listener(REVOCATIONS_CHANNEL, lambda payload: store.add_key(payload["key"]))
+
+
+PURGE_REVOKED_TOKENS = "revocation.purge_expired"
+
+
+@jobs.job(PURGE_REVOKED_TOKENS)
+def purge_expired(db: Session, payload: Dict[str, Any]) -> None:
+    """Borrar las revocaciones de tokens que ya han caducado."""
+    db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+
+
+jobs.periodic(PURGE_REVOKED_TOKENS, every=3600)
@@ -0,0 +1,170 @@
+"""
+Mide el coste por llamada de los métodos CRUD más usados.
+
+Uso: python scripts/benchmark_crud_queries.py [--database-url URL]
+     [--iterations N] [--rounds R]
+
+Compara, para los diez métodos de lectura más llamados por la API, la versión
+anterior con ``db.query(...)`` (reproducida aquí) con la actual, que reutiliza
+sentencias ``select()`` ya construidas (ver ``CRUDBase``). Sin
+``--database-url`` se usa SQLite en memoria con las tablas vacías: así casi
+todo el tiempo medido es construir, compilar y ejecutar la consulta, que es
+lo que cambia entre versiones. Con una URL se mide contra esa base de datos
+ya migrada, con sus datos.
+
+La sesión se vacía tras cada llamada para que ``get`` no se resuelva desde
+el mapa de identidad y ambas versiones consulten la base de datos.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+# Añadir el directorio raíz al path para importaciones
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import crud  # noqa: E402
+from app.db.base_class import Base  # noqa: E402
+from app.models.announcement import Announcement, AnnouncementStatus  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.contract import Contract  # noqa: E402
+from app.models.message import Message  # noqa: E402
+from app.models.recommendation import RecommendationFeedEntry  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+USER_ID = 1
+EMAIL = "benchmark@example.com"
+
+Case = Tuple[str, Callable[[Session], object], Callable[[Session], object]]
+
+
+def _cases() -> List[Case]:
+    """(método, versión con ``db.query``, versión actual)."""
+    return [
+        (
+            "user.get",
+            lambda db: db.query(User).filter(User.id == USER_ID).first(),
+            lambda db: crud.user.get(db, USER_ID),
+        ),
+        (
+            "user.get_by_email",
+            lambda db: db.query(User).filter(User.email == EMAIL).first(),
+            lambda db: crud.user.get_by_email(db, email=EMAIL),
+        ),
+        (
+            "contract.get",
+            lambda db: db.query(Contract).filter(Contract.id == USER_ID).first(),
+            lambda db: crud.contract.get(db, USER_ID),
+        ),
+        (
+            "category.get_multi",
+            lambda db: db.query(Category).offset(0).limit(100).all(),
+            lambda db: crud.category.get_multi(db, skip=0, limit=100),
+        ),
+        (
+            "announcement.get_multi",
+            lambda db: db.query(Announcement).offset(0).limit(100).all(),
+            lambda db: crud.announcement.get_multi(db, skip=0, limit=100),
+        ),
+        (
+            "announcement.get_multi_open",
+            lambda db: db.query(Announcement)
+            .filter(Announcement.status == AnnouncementStatus.OPEN)
+            .order_by(Announcement.created_at.desc())
+            .offset(0)
+            .limit(100)
+            .all(),
+            lambda db: crud.announcement.get_multi_open(db, skip=0, limit=100),
+        ),
+        (
+            "announcement.get_multi_by_offerer",
+            lambda db: db.query(Announcement)
+            .filter(Announcement.offerer_id == USER_ID)
+            .offset(0)
+            .limit(100)
+            .all(),
+            lambda db: crud.announcement.get_multi_by_offerer(db, offerer_id=USER_ID),
+        ),
+        (
+            "announcement.get_multi_recommended",
+            lambda db: db.query(Announcement)
+            .join(
+                RecommendationFeedEntry,
+                RecommendationFeedEntry.announcement_id == Announcement.id,
+            )
+            .filter(
+                RecommendationFeedEntry.mercenary_id == USER_ID,
+                RecommendationFeedEntry.rank > 0,
+                RecommendationFeedEntry.rank <= 0 + 100,
+                Announcement.status == AnnouncementStatus.OPEN,
+            )
+            .order_by(RecommendationFeedEntry.rank)
+            .all(),
+            lambda db: crud.announcement.get_multi_recommended(db, mercenary_id=USER_ID),
+        ),
+        (
+            "contract.get_multi_by_user",
+            lambda db: db.query(Contract)
+            .filter((Contract.offerer_id == USER_ID) | (Contract.mercenary_id == USER_ID))
+            .offset(0)
+            .limit(100)
+            .all(),
+            lambda db: crud.contract.get_multi_by_user(db, user_id=USER_ID),
+        ),
+        (
+            "message.get_history",
+            lambda db: db.query(Message)
+            .filter(Message.contract_id == USER_ID)
+            .filter(Message.id < 1000)
+            .order_by(Message.id.desc())
+            .limit(50)
+            .all(),
+            lambda db: crud.message.get_history(db, contract_id=USER_ID, before=1000),
+        ),
+    ]
+
+
+def _per_call_us(db: Session, call: Callable[[Session], object], iterations: int) -> float:
+    call(db)  # Calentar la caché de sentencias compiladas
+    db.expunge_all()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call(db)
+        db.expunge_all()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="Base de datos ya migrada (por defecto SQLite en memoria)")
+    parser.add_argument("--iterations", type=int, default=2000, help="Llamadas por medida")
+    parser.add_argument("--rounds", type=int, default=3, help="Medidas por método; se toma la mejor")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url or "sqlite://")
+    if args.database_url is None:
+        tables = [
+            model.__table__
+            for model in (User, Category, Announcement, RecommendationFeedEntry, Contract, Message)
+        ]
+        Base.metadata.create_all(engine, tables=tables)
+
+    print(f"{'método':<36} {'db.query µs':>12} {'select µs':>10} {'mejora':>7}")
+    total_before = total_after = 0.0
+    with Session(engine) as db:
+        for name, before, after in _cases():
+            before_us = min(_per_call_us(db, before, args.iterations) for _ in range(args.rounds))
+            after_us = min(_per_call_us(db, after, args.iterations) for _ in range(args.rounds))
+            total_before += before_us
+            total_after += after_us
+            print(f"{name:<36} {before_us:>12.1f} {after_us:>10.1f} {before_us / after_us:>6.2f}x")
+    print(f"{'total':<36} {total_before:>12.1f} {total_after:>10.1f} {total_before / total_after:>6.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
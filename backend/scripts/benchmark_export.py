@@ -0,0 +1,144 @@
+"""
+Mide la exportación en streaming de anuncios con muchas filas.
+
+Uso: python scripts/benchmark_export.py [--database-url URL] [--rows N]
+     [--format ndjson|csv] [--compare]
+
+Sin ``--database-url`` crea una base SQLite temporal con ``--rows`` anuncios
+(un millón por defecto); con una URL exporta los anuncios que ya tenga esa
+base de datos migrada. Recorre la exportación entera como lo haría la
+respuesta HTTP (``export_chunks``) e informa del tiempo, las filas por
+segundo, los bytes generados y cuánto crece el pico de memoria del proceso
+(RSS) durante la exportación, que no debe depender del número de filas.
+
+``--compare`` mide después la alternativa de cargar todos los anuncios como
+objetos ORM y serializarlos de una vez, para ver la diferencia de memoria
+(con un millón de filas necesita varios GB).
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Tuple
+
+# Añadir el directorio raíz al path para importaciones
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import crud, schemas  # noqa: E402
+from app.api.export import ExportFormat, export_chunks  # noqa: E402
+from app.models.announcement import Announcement, AnnouncementStatus  # noqa: E402
+from app.models.category import Category  # noqa: E402
+
+INSERT_BATCH = 10_000
+
+
+def _populate(engine: Engine, rows: int) -> None:
+    Category.__table__.create(engine)
+    Announcement.__table__.create(engine)
+    created = datetime(2026, 1, 1)
+    statuses = list(AnnouncementStatus)
+    with engine.begin() as connection:
+        connection.execute(insert(Category), [{"id": 1, "name": "Benchmark"}])
+        for start in range(0, rows, INSERT_BATCH):
+            connection.execute(
+                insert(Announcement),
+                [
+                    {
+                        "title": f"Anuncio {i}",
+                        "description": "Descripción de prueba " * 10,
+                        "budget": "1.000 - 2.500 USD",
+                        "budget_min": 1000,
+                        "budget_max": 2500,
+                        "budget_currency": "USD",
+                        "deadline": created + timedelta(days=30),
+                        "status": statuses[i % len(statuses)],
+                        "offerer_id": i % 100 + 1,
+                        "category_id": 1,
+                        "created_at": created + timedelta(seconds=i),
+                        "updated_at": created + timedelta(seconds=i),
+                    }
+                    for i in range(start, min(start + INSERT_BATCH, rows))
+                ],
+            )
+
+
+def _peak_rss() -> int:
+    """Pico de memoria residente del proceso, en bytes (Linux informa en KiB)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _measure(run: Callable[[], Tuple[int, int]]) -> Tuple[float, int, int, int]:
+    """(segundos, filas, bytes, crecimiento del pico de memoria) de ``run``."""
+    peak_before = _peak_rss()
+    started = time.perf_counter()
+    rows, size = run()
+    elapsed = time.perf_counter() - started
+    return elapsed, rows, size, _peak_rss() - peak_before
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="Base de datos ya migrada (por defecto SQLite temporal)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Anuncios a crear en SQLite")
+    parser.add_argument("--format", choices=[f.value for f in ExportFormat], default="ndjson")
+    parser.add_argument("--compare", action="store_true", help="Medir también la carga completa en memoria")
+    args = parser.parse_args()
+
+    path = None
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        handle, path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        engine = create_engine(f"sqlite:///{path}")
+        started = time.perf_counter()
+        _populate(engine, args.rows)
+        print(f"Creados {args.rows} anuncios en {time.perf_counter() - started:.1f}s")
+
+    export_format = ExportFormat(args.format)
+    statement, params = crud.announcement.export_statement(filters=schemas.AnnouncementFilter())
+
+    def streamed() -> Tuple[int, int]:
+        size = lines = 0
+        with Session(engine) as db:
+            for chunk in export_chunks(db, statement, params, format=export_format):
+                size += len(chunk)
+                lines += chunk.count(b"\n")
+        # Una fila por línea (los textos de prueba no tienen saltos); el CSV lleva cabecera
+        return lines - (export_format is ExportFormat.csv), size
+
+    def loaded() -> Tuple[int, int]:
+        with Session(engine) as db:
+            announcements = db.scalars(select(Announcement).order_by(Announcement.id)).all()
+            body = json.dumps(jsonable_encoder(announcements)).encode("utf-8")
+            return len(announcements), len(body)
+
+    try:
+        print(f"{'método':<12} {'filas':>10} {'segundos':>9} {'filas/s':>10} {'MB':>8} {'+pico MB':>9}")
+        runs = [("streaming", streamed)] + ([("carga", loaded)] if args.compare else [])
+        for name, run in runs:
+            elapsed, rows, size, peak = _measure(run)
+            print(
+                f"{name:<12} {rows:>10} {elapsed:>9.2f} {rows / elapsed:>10.0f} "
+                f"{size / 1e6:>8.1f} {peak / 1e6:>9.1f}"
+            )
+    finally:
+        engine.dispose()
+        if path is not None:
+            os.unlink(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
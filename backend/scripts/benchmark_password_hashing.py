@@ -0,0 +1,106 @@
+"""
+Mide el rendimiento del hash de contraseñas en este equipo.
+
+Uso: python scripts/benchmark_password_hashing.py [--scheme bcrypt|argon2]
+     [--costs 10,11,12] [--processes N] [--seconds S]
+
+Para cada coste muestra la latencia de una verificación, las operaciones de
+hash y verificación por segundo en un núcleo y el total con ``--processes``
+procesos en paralelo (por defecto, un proceso por núcleo). Al final indica el
+coste que elegiría la calibración de la API con la configuración actual.
+"""
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Añadir el directorio raíz al path para importaciones
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from passlib.hash import argon2, bcrypt  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.password_utils import hasher  # noqa: E402
+
+PASSWORD = "benchmark-password"
+
+
+def _handler(scheme: str, cost: int):
+    if scheme == "argon2":
+        return argon2.using(
+            type="ID",
+            time_cost=cost,
+            memory_cost=settings.PASSWORD_ARGON2_MEMORY_KIB,
+            parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+        )
+    return bcrypt.using(rounds=cost)
+
+
+def _run(args: Tuple[str, int, float]) -> Dict[str, float]:
+    """Hashes y verificaciones por segundo en un proceso."""
+    scheme, cost, seconds = args
+    handler = _handler(scheme, cost)
+    digest = handler.hash(PASSWORD)
+
+    result = {}
+    for name, operation in (
+        ("hash", lambda: handler.hash(PASSWORD)),
+        ("verify", lambda: handler.verify(PASSWORD, digest)),
+    ):
+        count = 0
+        started = time.perf_counter()
+        while True:
+            operation()
+            count += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= seconds:
+                break
+        result[name] = count / elapsed
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scheme", choices=("bcrypt", "argon2"), default=settings.PASSWORD_SCHEME)
+    parser.add_argument("--costs", help="Costes separados por comas (rondas o pasadas)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Duración de cada medida")
+    args = parser.parse_args()
+
+    if args.scheme == "argon2" and not argon2.has_backend():
+        print("argon2 requiere instalar argon2-cffi", file=sys.stderr)
+        return 1
+    default_costs = "10,11,12,13,14" if args.scheme == "bcrypt" else "1,2,3,4,6"
+    costs: List[int] = [int(cost) for cost in (args.costs or default_costs).split(",")]
+
+    label = "rondas" if args.scheme == "bcrypt" else "pasadas"
+    if args.scheme == "argon2":
+        print(f"argon2id con {settings.PASSWORD_ARGON2_MEMORY_KIB} KiB de memoria")
+    print(
+        f"{label:>8} {'verify ms':>10} {'hash/s':>9} {'verify/s':>9} "
+        f"{'hash/s x' + str(args.processes):>12} {'verify/s x' + str(args.processes):>12}"
+    )
+    with Pool(args.processes) as pool:
+        for cost in costs:
+            single = _run((args.scheme, cost, args.seconds))
+            parallel = pool.map(_run, [(args.scheme, cost, args.seconds)] * args.processes)
+            print(
+                f"{cost:>8} {1000 / single['verify']:>10.1f} {single['hash']:>9.1f} "
+                f"{single['verify']:>9.1f} {sum(r['hash'] for r in parallel):>12.1f} "
+                f"{sum(r['verify'] for r in parallel):>12.1f}"
+            )
+
+    if args.scheme == settings.PASSWORD_SCHEME:
+        hasher.calibrate()
+        print(
+            f"Con PASSWORD_HASH_TARGET_MS={settings.PASSWORD_HASH_TARGET_MS} la API "
+            f"usaría {hasher.parameters}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
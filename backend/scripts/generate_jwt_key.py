@@ -0,0 +1,54 @@
+"""
+Genera una clave EC P-256 para firmar tokens de acceso con ES256.
+
+Uso: python scripts/generate_jwt_key.py [--kid KID] [--dir DIR]
+
+La clave se guarda como ``<kid>.pem`` en ``JWT_KEYS_DIR``. Para rotar, se
+genera una clave nueva, se despliega en todos los workers (el JWKS ya la
+publica), se activa con ``JWT_ACTIVE_KID`` y se borra la anterior cuando
+hayan caducado los tokens firmados con ella.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--kid",
+        default=datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S"),
+        help="Identificador de la clave (por defecto, la fecha actual)",
+    )
+    parser.add_argument(
+        "--dir",
+        default=os.environ.get("JWT_KEYS_DIR", "keys"),
+        help="Directorio de claves (por defecto, JWT_KEYS_DIR o ./keys)",
+    )
+    args = parser.parse_args()
+
+    directory = Path(args.dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{args.kid}.pem"
+    if path.exists():
+        print(f"Ya existe {path}", file=sys.stderr)
+        return 1
+
+    pem = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    path.write_bytes(pem)
+    path.chmod(0o600)
+    print(f"Clave {args.kid} guardada en {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Importa categorías, skills o anuncios desde un fichero CSV o NDJSON.
+
+Uso: python scripts/import_data.py {categories,skills,announcements} FICHERO
+     [--format csv|ndjson] [--offerer-id ID]
+
+Usa la misma canalización que ``POST /api/v1/imports/{kind}`` contra la base
+de datos configurada (``DATABASE_URL``) e imprime el informe en JSON. Los
+anuncios necesitan ``--offerer-id``, el usuario al que pertenecerán.
+Termina con código 1 si alguna fila no se pudo importar.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Añadir el directorio raíz al path para importaciones
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db.session import SessionLocal  # noqa: E402
+from app.schemas.imports import ImportFormat, ImportKind  # noqa: E402
+from app.services.imports import ImportFileError, detect_format, run_import  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("kind", choices=[k.value for k in ImportKind])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=[f.value for f in ImportFormat], help="Por defecto, según la extensión")
+    parser.add_argument("--offerer-id", type=int, help="Autor de los anuncios importados")
+    args = parser.parse_args()
+
+    kind = ImportKind(args.kind)
+    if kind is ImportKind.announcements and args.offerer_id is None:
+        parser.error("--offerer-id es obligatorio para importar anuncios")
+
+    db = SessionLocal()
+    try:
+        import_format = ImportFormat(args.format) if args.format else detect_format(args.path.name)
+        with args.path.open("rb") as file:
+            report = run_import(db, kind, file, format=import_format, offerer_id=args.offerer_id)
+    except (ImportFileError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        db.close()
+    print(report.model_dump_json(indent=2))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Fixtures compartidas de la suite de tests.
+
+Los tests corren contra una base de datos SQLite en memoria: se crean todas
+las tablas salvo las que usan tipos o DDL exclusivos de PostgreSQL, y se
+vacían al terminar cada test. La aplicación se usa sin ejecutar el arranque
+(sin ``with TestClient(...)``), así que no se inicia ningún hilo en segundo
+plano ni se conecta a PostgreSQL.
+"""
+from typing import Callable, Dict, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import BigInteger, create_engine, event
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core import security
+from app.core.config import settings
+from app.db.base_class import Base
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.announcement import Announcement
+from app.models.category import Category
+from app.models.user import User, UserRole
+
+# Tablas con tipos de PostgreSQL (ARRAY, UNLOGGED) que SQLite no admite
+_PG_ONLY_TABLES = {"profiles", "rate_limit_counters"}
+
+
+@compiles(BigInteger, "sqlite")
+def _bigint_as_integer(type_, compiler, **kw) -> str:
+    # SQLite solo autoincrementa las claves primarias INTEGER
+    return "INTEGER"
+
+
+engine = create_engine(
+    "sqlite://",
+    poolclass=StaticPool,
+    connect_args={"check_same_thread": False},
+)
+
+
+@event.listens_for(engine, "connect")
+def _sqlite_functions(dbapi_connection, connection_record) -> None:
+    # ``enqueue`` despierta a los workers con pg_notify; sin LISTEN no hace nada
+    dbapi_connection.create_function("pg_notify", 2, lambda channel, payload: None)
+
+
+TABLES = [table for table in Base.metadata.sorted_tables if table.name not in _PG_ONLY_TABLES]
+Base.metadata.create_all(bind=engine, tables=TABLES)
+SessionLocal.configure(bind=engine)
+
+# Los eventos se entregan en el proceso, sin NOTIFY
+settings.EVENTS_PG_BRIDGE_ENABLED = False
+
+
+@pytest.fixture(autouse=True)
+def _clean_tables() -> Iterator[None]:
+    yield
+    with engine.begin() as connection:
+        for table in reversed(TABLES):
+            connection.execute(table.delete())
+
+
+@pytest.fixture
+def db() -> Iterator[Session]:
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_user(db: Session) -> Callable[..., User]:
+    """Crear un usuario activo con el rol indicado."""
+    counter = iter(range(1, 1_000_000))
+
+    def _make_user(role: UserRole = UserRole.CLIENT, **fields) -> User:
+        fields.setdefault("email", f"user{next(counter)}@example.com")
+        fields.setdefault("hashed_password", "not-a-real-hash")
+        user = User(role=role, **fields)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+
+    return _make_user
+
+
+@pytest.fixture
+def make_announcement(db: Session) -> Callable[..., Announcement]:
+    """Crear un anuncio de ``offerer`` (en una categoría nueva si no se indica)."""
+
+    def _make_announcement(offerer: User, **fields) -> Announcement:
+        if "category_id" not in fields:
+            category = Category(name=f"Category {db.query(Category).count() + 1}")
+            db.add(category)
+            db.flush()
+            fields["category_id"] = category.id
+        fields.setdefault("title", "Site")
+        fields.setdefault("description", "...")
+        announcement = Announcement(offerer_id=offerer.id, **fields)
+        db.add(announcement)
+        db.commit()
+        db.refresh(announcement)
+        return announcement
+
+    return _make_announcement
+
+
+@pytest.fixture
+def auth_headers() -> Callable[[User], Dict[str, str]]:
+    """Cabecera ``Authorization`` con un token de acceso para un usuario."""
+
+    def _auth_headers(user: User) -> Dict[str, str]:
+        token = security.create_access_token(user.email, user.id, user.role.value)
+        return {"Authorization": f"Bearer {token}"}
+
+    return _auth_headers
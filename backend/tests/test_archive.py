@@ -0,0 +1,174 @@
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app import crud
+from app.core.config import settings
+from app.models.announcement import Announcement, AnnouncementStatus
+from app.models.archive import announcements_archive, contracts_archive, transactions_archive
+from app.models.contract import Contract, ContractStatus, Transaction, TransactionType
+from app.models.message import Message
+from app.models.review import Review
+from app.models.user import UserRole
+from app.schemas.announcement import AnnouncementFilter
+from app.services import archive
+
+API = settings.API_V1_STR
+
+
+def _ndjson(response):
+    assert response.status_code == 200, response.text
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def _ids(db, table):
+    return db.scalars(select(table.c.id).order_by(table.c.id)).all()
+
+
+@pytest.fixture
+def parties(make_user):
+    return make_user(UserRole.CLIENT), make_user(UserRole.FREELANCER)
+
+
+@pytest.fixture
+def make_contract(db, parties, make_announcement):
+    """Crear un contrato entre ``parties`` modificado hace ``age_days`` días.
+
+    Devuelve ``(id, announcement_id)``: el archivo borra la fila de la sesión.
+    """
+    offerer, mercenary = parties
+
+    def _make_contract(status, age_days, announcement=None, transactions=0):
+        updated_at = datetime.utcnow() - timedelta(days=age_days)
+        announcement = announcement or make_announcement(
+            offerer, status=AnnouncementStatus.CLOSED, updated_at=updated_at
+        )
+        contract = Contract(
+            title=f"Contract {status.value}",
+            description="...",
+            amount=Decimal("100.00"),
+            status=status,
+            offerer_id=offerer.id,
+            mercenary_id=mercenary.id,
+            announcement_id=announcement.id,
+            updated_at=updated_at,
+        )
+        db.add(contract)
+        db.flush()
+        db.add_all(
+            Transaction(
+                amount=Decimal("50.00"),
+                transaction_type=TransactionType.DEPOSIT,
+                contract_id=contract.id,
+            )
+            for _ in range(transactions)
+        )
+        db.commit()
+        return contract.id, contract.announcement_id
+
+    return _make_contract
+
+
+def test_finished_contracts_move_with_their_transactions(db, make_contract, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_BATCH_SIZE", 1)
+    old = settings.ARCHIVE_AFTER_DAYS + 1
+    completed = make_contract(ContractStatus.COMPLETED, old, transactions=2)
+    refunded = make_contract(ContractStatus.REFUNDED, old, transactions=1)
+    active = make_contract(ContractStatus.ACTIVE, old, transactions=1)
+    recent = make_contract(ContractStatus.CANCELLED, 1)
+
+    archive.archive_finished(db, {})
+
+    assert _ids(db, Contract.__table__) == [active[0], recent[0]]
+    assert _ids(db, contracts_archive) == [completed[0], refunded[0]]
+    assert db.scalars(select(transactions_archive.c.contract_id)).all() == [
+        completed[0], completed[0], refunded[0]
+    ]
+    assert [t.contract_id for t in db.query(Transaction)] == [active[0]]
+    # Sus anuncios cerrados se quedan sin contratos vivos y se archivan detrás
+    assert set(_ids(db, announcements_archive)) == {completed[1], refunded[1]}
+
+
+def test_rows_still_referenced_stay_live(db, parties, make_contract, make_announcement):
+    offerer, mercenary = parties
+    old = datetime.utcnow() - timedelta(days=settings.ARCHIVE_AFTER_DAYS + 1)
+    discussed, discussed_announcement = make_contract(
+        ContractStatus.COMPLETED, settings.ARCHIVE_AFTER_DAYS + 1
+    )
+    db.add(Message(contract_id=discussed, sender_id=offerer.id, body="Thanks!"))
+    reviewed = make_announcement(offerer, status=AnnouncementStatus.COMPLETED, updated_at=old)
+    db.add(
+        Review(
+            rating=5, announcement_id=reviewed.id, reviewer_id=offerer.id, reviewee_id=mercenary.id
+        )
+    )
+    contracted = make_announcement(offerer, status=AnnouncementStatus.CLOSED, updated_at=old)
+    make_contract(ContractStatus.ACTIVE, 1, announcement=contracted)
+    still_open = make_announcement(offerer, updated_at=old)
+    db.commit()
+    kept = {discussed_announcement, reviewed.id, contracted.id, still_open.id}
+
+    archive.archive_finished(db, {})
+
+    assert _ids(db, contracts_archive) == []
+    assert _ids(db, announcements_archive) == []
+    assert kept <= set(_ids(db, Announcement.__table__))
+
+
+def test_archived_rows_are_read_only_on_request(
+    client, db, parties, make_contract, make_announcement, auth_headers
+):
+    offerer, _ = parties
+    old = datetime.utcnow() - timedelta(days=settings.ARCHIVE_AFTER_DAYS + 1)
+    archived, _ = make_contract(
+        ContractStatus.COMPLETED, settings.ARCHIVE_AFTER_DAYS + 1, transactions=1
+    )
+    live, _ = make_contract(ContractStatus.ACTIVE, 1, transactions=1)
+    finished = make_announcement(offerer, status=AnnouncementStatus.CLOSED, updated_at=old).id
+    archived_payment, live_payment = (
+        db.scalar(select(Transaction.id).where(Transaction.contract_id == contract))
+        for contract in (archived, live)
+    )
+    archive.archive_finished(db, {})
+    assert _ids(db, contracts_archive) == [archived]
+    assert finished in _ids(db, announcements_archive)
+
+    assert crud.contract.get(db, id=archived) is None
+    from_archive = crud.contract.get(db, id=archived, include_archived=True)
+    assert (from_archive.id, from_archive.status) == (archived, ContractStatus.COMPLETED)
+    assert [c.id for c in crud.contract.get_multi_by_user(db, user_id=offerer.id)] == [live]
+    assert {
+        c.id for c in crud.contract.get_multi_by_user(db, user_id=offerer.id, include_archived=True)
+    } == {archived, live}
+
+    mine = AnnouncementFilter(offerer_id=offerer.id)
+    assert finished not in [a.id for a in crud.announcement.get_multi_filtered(db, filters=mine)]
+    assert finished in [
+        a.id
+        for a in crud.announcement.get_multi_filtered(db, filters=mine, include_archived=True)
+    ]
+
+    headers = auth_headers(offerer)
+    url = f"{API}/contracts/{archived}"
+    assert client.get(url, headers=headers).status_code == 404
+    response = client.get(url, params={"include_archived": True}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["id"] == archived
+    response = client.get(f"{API}/announcements/{finished}", params={"include_archived": True})
+    assert response.status_code == 200, response.text
+
+    for path, live_ids, all_ids in (
+        ("contracts/export", [live], [archived, live]),
+        ("contracts/transactions/export", [live_payment], [archived_payment, live_payment]),
+    ):
+        rows = _ndjson(client.get(f"{API}/{path}", headers=headers))
+        assert [row["id"] for row in rows] == live_ids
+        rows = _ndjson(client.get(f"{API}/{path}", params={"include_archived": True}, headers=headers))
+        assert [row["id"] for row in rows] == all_ids
+    rows = _ndjson(
+        client.get(f"{API}/announcements/export", params={"include_archived": True}, headers=headers)
+    )
+    assert finished in [row["id"] for row in rows]
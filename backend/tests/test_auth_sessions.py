@@ -0,0 +1,96 @@
+"""
+Cada endpoint autenticado usa una sola sesión de base de datos: la de
+``get_db``, compartida por ``get_current_user`` y el endpoint.
+"""
+from decimal import Decimal
+
+import pytest
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from app.api import deps
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.contract import Contract
+from app.models.user import UserRole
+from app.services import revocation
+
+API = settings.API_V1_STR
+
+
+def _calls(dependant: Dependant):
+    for sub in dependant.dependencies:
+        yield sub.call
+        yield from _calls(sub)
+
+
+AUTHENTICATED_ROUTES = [
+    route
+    for route in app.routes
+    if isinstance(route, APIRoute) and deps.get_current_user in set(_calls(route.dependant))
+]
+
+
+def test_every_authenticated_route_is_found():
+    assert len(AUTHENTICATED_ROUTES) > 10
+
+
+@pytest.mark.parametrize(
+    "route", AUTHENTICATED_ROUTES, ids=lambda r: f"{'/'.join(sorted(r.methods))} {r.path}"
+)
+def test_authenticated_route_resolves_a_single_session(route):
+    # FastAPI resuelve una vez por petición cada dependencia con la misma
+    # función: basta con que get_db sea la única que abre sesiones
+    calls = set(_calls(route.dependant))
+    assert deps.get_db in calls
+    assert SessionLocal not in calls
+
+
+@pytest.fixture
+def checkouts():
+    """Conexiones sacadas del pool durante el test."""
+    engine = SessionLocal.kw["bind"]
+    counter = []
+
+    def on_checkout(*args):
+        counter.append(1)
+
+    event.listen(engine, "checkout", on_checkout)
+    yield counter
+    event.remove(engine, "checkout", on_checkout)
+
+
+def test_authenticated_requests_check_out_one_connection(
+    client, db, make_user, make_announcement, auth_headers, checkouts, monkeypatch
+):
+    offerer, mercenary = make_user(UserRole.CLIENT), make_user(UserRole.FREELANCER)
+    outsider = make_user(UserRole.CLIENT)
+    contract = Contract(
+        title="Build it",
+        description="...",
+        amount=Decimal("10.00"),
+        offerer_id=offerer.id,
+        mercenary_id=mercenary.id,
+        announcement_id=make_announcement(offerer).id,
+    )
+    db.add(contract)
+    db.commit()
+    paths = [
+        (auth_headers(outsider), "/contracts/"),
+        (auth_headers(offerer), f"/contracts/{contract.id}/messages"),
+        (auth_headers(mercenary), "/announcements/feed"),
+    ]
+    db.close()  # Que solo cuenten las conexiones de las peticiones
+    # El filtro de revocaciones se carga una vez por proceso, con su propia
+    # sesión, y luego se sincroniza cada REVOCATION_SYNC_SECONDS: no es coste
+    # de cada petición, así que se carga antes de contar
+    monkeypatch.setattr(settings, "REVOCATION_SYNC_SECONDS", 3600)
+    revocation.store.is_revoked({})
+
+    for headers, path in paths:
+        checkouts.clear()
+        response = client.get(f"{API}{path}", headers=headers)
+        assert response.status_code == 200, (path, response.text)
+        assert len(checkouts) == 1, path
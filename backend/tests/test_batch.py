@@ -0,0 +1,41 @@
+import asyncio
+
+from app.api import batch
+from app.core.config import settings
+from app.models.user import UserRole
+from app.schemas.batch import BatchRequestItem
+
+API = settings.API_V1_STR
+
+
+def test_concurrent_gets_stay_below_the_pool_size(monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_MAX_CONCURRENCY", 50)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    running = peak = 0
+
+    async def app(scope, receive, send):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    items = [BatchRequestItem(id=str(i), path="/contracts/") for i in range(10)]
+    results = asyncio.run(batch.run_batch(app, {"headers": []}, items, None))
+
+    assert [r.status for r in results] == [200] * 10
+    assert peak == 2
+
+
+def test_batch_of_gets_through_the_endpoint(client, make_user, auth_headers):
+    headers = auth_headers(make_user(UserRole.CLIENT))
+    requests = [{"id": str(i), "path": "/contracts/"} for i in range(8)]
+
+    response = client.post(f"{API}/batch/", json={"requests": requests}, headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert [(r["id"], r["status"], r["body"]) for r in response.json()["responses"]] == [
+        (str(i), 200, []) for i in range(8)
+    ]
@@ -0,0 +1,77 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.budget import ParsedBudget, format_budget, parse_budget
+from app.crud.announcement import sync_budget
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("1.500 - 3.000 €", ("1500", "3000", "EUR")),
+        ("1 500 – 3 000 EUR", ("1500", "3000", "EUR")),
+        ("$2k-5k", ("2000", "5000", "USD")),
+        ("$2k - $5k", ("2000", "5000", "USD")),
+        ("hasta 800 USD", (None, "800", "USD")),
+        ("up to £1,200", (None, "1200", "GBP")),
+        ("desde 300 MXN", ("300", None, "MXN")),
+        ("500+", ("500", None, "USD")),
+        ("1,5k", ("1500", "1500", "USD")),
+        ("1.500,50 €", ("1500.50", "1500.50", "EUR")),
+        ("1,500.50", ("1500.50", "1500.50", "USD")),
+        ("2M", ("2000000", "2000000", "USD")),
+        ("entre 800 y 500 ARS", ("500", "800", "ARS")),
+        ("desde 500 hasta 800 EUR", ("500", "800", "EUR")),
+        ("500 USD to 800 USD", ("500", "800", "USD")),
+    ],
+)
+def test_parse_budget(text, expected):
+    minimum, maximum, currency = expected
+    assert parse_budget(text) == ParsedBudget(
+        minimum and Decimal(minimum), maximum and Decimal(maximum), currency
+    )
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        None,
+        "",
+        "   ",
+        "a convenir",
+        # Números que no forman un rango
+        "2024 project, 500 USD",
+        "100 or 200",
+        "1 - 2 - 3",
+        # No cabe en Numeric(12, 2)
+        "10000000000 USD",
+        "500 - 99999999999",
+        "2000000M",
+    ],
+)
+def test_unparseable_or_ambiguous_budget_has_no_range(text):
+    assert parse_budget(text) == ParsedBudget(None, None, None)
+
+
+def test_budget_text_without_a_range_clears_it():
+    announcement = SimpleNamespace(
+        budget="2024 project, 500 USD",
+        budget_min=Decimal("1"),
+        budget_max=Decimal("2"),
+        budget_currency="EUR",
+    )
+
+    sync_budget(announcement, {"budget"})
+
+    assert (announcement.budget_min, announcement.budget_max, announcement.budget_currency) == (
+        None, None, None
+    )
+
+
+def test_format_budget():
+    assert format_budget(None, None, None) is None
+    assert format_budget(Decimal("1500"), Decimal("3000"), "EUR") == "1,500.00 - 3,000.00 EUR"
+    assert format_budget(None, Decimal("800"), None) == "up to 800.00 USD"
+    assert format_budget(Decimal("500"), None, "GBP") == "from 500.00 GBP"
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+import pytest
+
+from app.core.config import settings
+from app.models.contract import Contract
+from app.models.user import User, UserRole
+from app.services import chat
+
+API = settings.API_V1_STR
+
+# 2000 caracteres de 2 bytes: caben en CHAT_MESSAGE_MAX_BYTES, pero json.dumps
+# los escapa como \u00e9 (6 bytes cada uno) y el evento supera el NOTIFY
+NON_ASCII_BODY = "é" * 2000
+
+
+def test_fits_notify_measures_the_encoded_event():
+    assert len(NON_ASCII_BODY.encode("utf-8")) <= settings.CHAT_MESSAGE_MAX_BYTES
+    assert chat._fits_notify(1, 1, "x" * settings.CHAT_MESSAGE_MAX_BYTES, "c" * 64)
+    assert not chat._fits_notify(1, 1, NON_ASCII_BODY, None)
+
+
+@pytest.fixture
+def contract(db, make_user, make_announcement):
+    offerer = make_user(UserRole.CLIENT)
+    contract = Contract(
+        title="Build it",
+        description="...",
+        amount=Decimal("10.00"),
+        offerer_id=offerer.id,
+        mercenary_id=make_user(UserRole.FREELANCER).id,
+        announcement_id=make_announcement(offerer).id,
+    )
+    db.add(contract)
+    db.commit()
+    return contract
+
+
+def test_oversized_message_is_rejected_alone(client, db, contract, auth_headers, monkeypatch):
+    monkeypatch.setattr(chat, "writer", chat.MessageWriter())
+    sender = db.get(User, contract.offerer_id)
+    token = auth_headers(sender)["Authorization"].split()[1]
+
+    with client.websocket_connect(f"{API}/contracts/{contract.id}/chat?token={token}") as ws:
+        ws.send_json({"body": NON_ASCII_BODY, "client_id": "big"})
+        ws.send_json({"body": "hola", "client_id": "small"})
+
+        error = ws.receive_json()
+        assert (error["type"], error["client_id"]) == ("error", "big")
+        message = ws.receive_json()
+        assert (message["type"], message["client_id"], message["body"]) == ("message", "small", "hola")
+        assert message["sender_id"] == sender.id
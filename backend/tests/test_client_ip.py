@@ -0,0 +1,45 @@
+import pytest
+from starlette.requests import Request
+
+from app.api.deps import client_ip
+from app.core.config import settings
+
+
+def _request(*forwarded_for: str) -> Request:
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded_for]
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.2", 4321)})
+
+
+@pytest.fixture
+def trust_proxies(monkeypatch):
+    def _trust(hops: int) -> None:
+        monkeypatch.setattr(settings, "RATE_LIMIT_TRUST_FORWARDED_FOR", True)
+        monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXY_HOPS", hops)
+
+    return _trust
+
+
+def test_forwarded_for_is_ignored_unless_trusted(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUST_FORWARDED_FOR", False)
+
+    assert client_ip(_request("203.0.113.7")) == "10.0.0.2"
+
+
+@pytest.mark.parametrize(
+    "hops, headers, expected",
+    [
+        # El cliente falsifica la entrada de la izquierda; el proxy añade la real
+        (1, ["1.2.3.4, 203.0.113.7"], "203.0.113.7"),
+        (2, ["1.2.3.4, 203.0.113.7, 10.0.0.9"], "203.0.113.7"),
+        (2, ["1.2.3.4", "203.0.113.7, 10.0.0.9"], "203.0.113.7"),
+        # Menos entradas que proxies: la petición no pasó por todos
+        (2, ["203.0.113.7"], "10.0.0.2"),
+        (1, [], "10.0.0.2"),
+    ],
+)
+def test_client_is_the_entry_added_by_the_outermost_trusted_proxy(
+    trust_proxies, hops, headers, expected
+):
+    trust_proxies(hops)
+
+    assert client_ip(_request(*headers)) == expected
@@ -0,0 +1,27 @@
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+
+
+def test_refresh_secret_key_is_derived_from_secret_key():
+    first = Settings(SECRET_KEY="shared-secret")
+    second = Settings(SECRET_KEY="shared-secret")
+
+    assert first.REFRESH_SECRET_KEY == second.REFRESH_SECRET_KEY
+    assert first.REFRESH_SECRET_KEY != first.SECRET_KEY
+    assert "REFRESH_SECRET_KEY" not in first.model_fields_set
+    assert Settings(SECRET_KEY="other").REFRESH_SECRET_KEY != first.REFRESH_SECRET_KEY
+
+
+def test_explicit_refresh_secret_key_is_kept():
+    settings = Settings(SECRET_KEY="shared-secret", REFRESH_SECRET_KEY="refresh-secret")
+
+    assert settings.REFRESH_SECRET_KEY == "refresh-secret"
+
+
+def test_notification_lease_must_fit_a_send():
+    with pytest.raises(ValidationError):
+        Settings(NOTIFICATION_LEASE_SECONDS=20, SMTP_TIMEOUT_SECONDS=10)
+
+    assert Settings(NOTIFICATION_LEASE_SECONDS=21, SMTP_TIMEOUT_SECONDS=10)
@@ -0,0 +1,32 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.announcement import Announcement
+from app.models.category import Category
+from app.services import counters
+
+
+def test_reconcile_repairs_drift_and_commits_each_batch(db, make_user, monkeypatch):
+    monkeypatch.setattr(counters, "BATCH_SIZE", 1)
+    owner = make_user()
+    categories = [Category(name="Web", open_announcement_count=5), Category(name="Mobile")]
+    db.add_all(categories)
+    db.flush()
+    db.add(
+        Announcement(
+            title="Site", description="...", offerer_id=owner.id, category_id=categories[1].id
+        )
+    )
+    db.commit()
+
+    commits = []
+    listener = lambda session: commits.append(1)  # noqa: E731
+    event.listen(Session, "after_commit", listener)
+    try:
+        counters.reconcile(db, {})
+    finally:
+        event.remove(Session, "after_commit", listener)
+
+    assert [c.open_announcement_count for c in db.query(Category).order_by(Category.id)] == [0, 1]
+    # Un commit por categoría; los proyectos no tienen filas
+    assert len(commits) == 2
@@ -0,0 +1,33 @@
+from sqlalchemy import select
+
+from app.crud.base import CRUDBase
+from app.models.category import Category
+
+
+def test_fieldsets_share_a_statement_whatever_their_order():
+    crud = CRUDBase(Category)
+    build = lambda: select(Category)  # noqa: E731
+
+    first = crud._statement("list", build, ("id", "name"))
+
+    assert crud._statement("list", build, ("name", "id")) is first
+    assert crud._statement("list", build, ("id",)) is not first
+
+
+def test_statement_cache_keeps_the_most_recently_used(monkeypatch):
+    crud = CRUDBase(Category)
+    monkeypatch.setattr(crud, "max_statements", 3)
+    built = []
+
+    def build():
+        built.append(1)
+        return select(Category)
+
+    for name in ("a", "b", "c"):
+        crud._statement(name, build)
+    crud._statement("a", build)  # "b" pasa a ser la menos usada
+    crud._statement("d", build)
+
+    assert list(crud._statements) == ["c", "a", "d"]
+    crud._statement("a", build)
+    assert len(built) == 4
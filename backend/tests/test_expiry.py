@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from app import crud
+from app.core.config import settings
+from app.crud.announcement import ANNOUNCEMENTS_CHANNEL
+from app.models.announcement import Announcement, AnnouncementStatus
+from app.models.category import Category
+from app.services import events, expiry
+
+
+def test_expired_announcements_are_closed_in_chunks(db, make_user, make_announcement, monkeypatch):
+    monkeypatch.setattr(settings, "ANNOUNCEMENT_EXPIRY_BATCH_SIZE", 2)
+    published = []
+    monkeypatch.setitem(events.hub._listeners, ANNOUNCEMENTS_CHANNEL, [published.append])
+    chunks = []
+    close_expired = crud.announcement.close_expired
+
+    def spy(db, **kwargs):
+        chunks.append(close_expired(db, **kwargs))
+        return chunks[-1]
+
+    monkeypatch.setattr(crud.announcement, "close_expired", spy)
+
+    owner = make_user()
+    web = Category(name="Web", open_announcement_count=3)
+    mobile = Category(name="Mobile", open_announcement_count=3)
+    db.add_all([web, mobile])
+    db.commit()
+    past, future = datetime.utcnow() - timedelta(hours=1), datetime.utcnow() + timedelta(days=1)
+    expired = [
+        make_announcement(owner, category_id=category.id, deadline=past - timedelta(minutes=n)).id
+        for n, category in enumerate([web, web, web, mobile, mobile])
+    ]
+    upcoming = make_announcement(owner, category_id=mobile.id, deadline=future).id
+    in_progress = make_announcement(
+        owner, category_id=mobile.id, deadline=past, status=AnnouncementStatus.IN_PROGRESS
+    ).id
+    undated = make_announcement(owner, category_id=mobile.id).id
+
+    expiry.expire_announcements(db, {})
+
+    assert chunks == [2, 2, 1]
+    db.expire_all()
+    statuses = {a.id: a.status for a in db.query(Announcement)}
+    assert [statuses[id] for id in expired] == [AnnouncementStatus.CLOSED] * 5
+    assert statuses[upcoming] == statuses[undated] == AnnouncementStatus.OPEN
+    assert statuses[in_progress] == AnnouncementStatus.IN_PROGRESS
+    assert (web.open_announcement_count, mobile.open_announcement_count) == (0, 1)
+    assert sorted(event["id"] for event in published) == sorted(expired)
+    assert {event["event"] for event in published} == {"expired"}
+    assert {event["status"] for event in published} == {"closed"}
+
+    # Repetir el trabajo no cierra nada más
+    chunks.clear()
+    expiry.expire_announcements(db, {})
+    assert chunks == [0]
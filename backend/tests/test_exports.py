@@ -0,0 +1,100 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from app.core.config import settings
+from app.models.announcement import Announcement
+from app.models.category import Category
+from app.models.contract import Contract
+from app.models.user import UserRole
+
+API = settings.API_V1_STR
+
+
+def _ndjson(response):
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.fixture
+def category(db):
+    category = Category(name="Web")
+    db.add(category)
+    db.commit()
+    return category
+
+
+def _announcement(db, owner, category, title):
+    announcement = Announcement(
+        title=title, description="...", offerer_id=owner.id, category_id=category.id
+    )
+    db.add(announcement)
+    db.commit()
+    return announcement
+
+
+def test_announcement_export_is_scoped_to_the_owner_unless_admin(
+    client, db, make_user, auth_headers, category
+):
+    alice, bob = make_user(UserRole.CLIENT), make_user(UserRole.CLIENT)
+    admin = make_user(UserRole.ADMIN)
+    _announcement(db, alice, category, "Alice's")
+    _announcement(db, bob, category, "Bob's")
+
+    rows = _ndjson(client.get(f"{API}/announcements/export", headers=auth_headers(alice)))
+    assert [row["title"] for row in rows] == ["Alice's"]
+    assert rows[0]["status"] == "open"
+
+    rows = _ndjson(client.get(f"{API}/announcements/export", headers=auth_headers(admin)))
+    assert [row["title"] for row in rows] == ["Alice's", "Bob's"]
+
+
+def test_announcement_export_as_csv(client, db, make_user, auth_headers, category):
+    alice = make_user(UserRole.CLIENT)
+    _announcement(db, alice, category, "Alice's")
+
+    response = client.get(
+        f"{API}/announcements/export", params={"format": "csv"}, headers=auth_headers(alice)
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-disposition"] == 'attachment; filename="announcements.csv"'
+    header, row = response.text.splitlines()
+    assert header.split(",")[:2] == ["id", "title"]
+    assert "Alice's" in row
+
+
+def test_contract_export_is_scoped_to_the_parties_unless_admin(
+    client, db, make_user, make_announcement, auth_headers
+):
+    offerer, mercenary = make_user(UserRole.CLIENT), make_user(UserRole.FREELANCER)
+    outsider, admin = make_user(UserRole.CLIENT), make_user(UserRole.ADMIN)
+    db.add(
+        Contract(
+            title="Build it",
+            description="...",
+            amount=Decimal("150.00"),
+            offerer_id=offerer.id,
+            mercenary_id=mercenary.id,
+            announcement_id=make_announcement(offerer).id,
+        )
+    )
+    db.commit()
+
+    for user, expected in ((offerer, 1), (mercenary, 1), (outsider, 0), (admin, 1)):
+        rows = _ndjson(client.get(f"{API}/contracts/export", headers=auth_headers(user)))
+        assert len(rows) == expected
+    assert rows[0]["amount"] == "150.00"
+
+
+def test_transaction_export(client, make_user, auth_headers):
+    for role in (UserRole.FREELANCER, UserRole.ADMIN):
+        response = client.get(
+            f"{API}/contracts/transactions/export",
+            params={"format": "csv"},
+            headers=auth_headers(make_user(role)),
+        )
+        assert response.status_code == 200, response.text
+        assert response.text.splitlines()[0].startswith("id,")
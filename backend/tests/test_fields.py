@@ -0,0 +1,25 @@
+from app.api import fields
+from app.core.config import settings
+from app.models.announcement import Announcement
+from app.models.category import Category
+from app.models.user import UserRole
+
+API = settings.API_V1_STR
+
+
+def test_sparse_list_returns_only_the_requested_fields(client, db, make_user):
+    category = Category(name="Web")
+    db.add(category)
+    db.flush()
+    owner = make_user(UserRole.CLIENT)
+    db.add(Announcement(title="Site", description="...", offerer_id=owner.id, category_id=category.id))
+    db.commit()
+
+    for query in ("status,title", "title,status,title"):
+        response = client.get(f"{API}/announcements/", params={"fields": query})
+        assert response.status_code == 200, response.text
+        assert [set(item) for item in response.json()] == [{"id", "title", "status"}]
+
+
+def test_fieldset_serializers_are_bounded():
+    assert fields._adapter.cache_info().maxsize is not None
@@ -0,0 +1,106 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.api.deps import get_db
+from app.core.config import settings
+from app.db.base_class import Base
+from app.main import app
+from app.models.announcement import Announcement, AnnouncementStatus
+from app.models.category import Category
+from app.models.user import User, UserRole
+
+API = settings.API_V1_STR
+
+
+def _upload(client, headers, kind, content, filename, **params):
+    return client.post(
+        f"{API}/imports/{kind}",
+        params=params,
+        files={"file": (filename, content)},
+        headers=headers,
+    )
+
+
+@pytest.mark.parametrize(
+    "role, kind",
+    [
+        (UserRole.FREELANCER, "announcements"),
+        (UserRole.ADMIN, "announcements"),
+        (UserRole.CLIENT, "categories"),
+        (UserRole.FREELANCER, "skills"),
+    ],
+)
+def test_import_is_forbidden_for_other_roles(client, make_user, auth_headers, role, kind):
+    response = _upload(client, auth_headers(make_user(role)), kind, b"name\nWeb\n", "rows.csv")
+
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize(
+    "role, kind", [(UserRole.CLIENT, "announcements"), (UserRole.ADMIN, "categories")]
+)
+def test_import_needs_a_known_format(client, make_user, auth_headers, role, kind):
+    response = _upload(client, auth_headers(make_user(role)), kind, b"name\nWeb\n", "rows.txt")
+
+    assert response.status_code == 400
+    assert "format=csv or ndjson" in response.json()["detail"]
+
+
+# Los imports cargan con COPY: el recorrido completo necesita PostgreSQL
+PG_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def pg_session():
+    if not PG_URL:
+        pytest.skip("TEST_DATABASE_URL (PostgreSQL) is not set")
+    engine = create_engine(PG_URL)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+
+    def _get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+        app.dependency_overrides.pop(get_db, None)
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def test_import_categories_and_announcements_end_to_end(client, auth_headers, pg_session):
+    admin = User(email="admin@example.com", hashed_password="x", role=UserRole.ADMIN)
+    owner = User(email="client@example.com", hashed_password="x", role=UserRole.CLIENT)
+    pg_session.add_all([admin, owner])
+    pg_session.commit()
+
+    response = _upload(client, auth_headers(admin), "categories", b"name\nWeb\nWeb\nMobile\n", "c.csv")
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 2
+
+    web = pg_session.scalar(select(Category).where(Category.name == "Web"))
+    rows = (
+        f'{{"title": "Site", "description": "A site", "category_id": {web.id}}}\n'
+        '{"title": ""}\n'
+    ).encode()
+    response = _upload(client, auth_headers(owner), "announcements", rows, "a.ndjson")
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert (report["inserted"], report["failed"]) == (1, 1)
+    assert report["errors"][0]["line"] == 2
+
+    announcement = pg_session.scalar(select(Announcement))
+    assert (announcement.offerer_id, announcement.status) == (owner.id, AnnouncementStatus.OPEN)
+    pg_session.refresh(web)
+    assert web.open_announcement_count == 1
@@ -0,0 +1,162 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.models.job import Job, JobStatus
+from app.services import jobs
+
+KIND = "tests.job"
+
+
+@pytest.fixture
+def santiago_time(monkeypatch):
+    # Un host con desfase respecto a UTC (UTC-3/-4)
+    monkeypatch.setenv("TZ", "America/Santiago")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    """Registrar ``KIND`` con un manejador que ejecuta ``handler.action``."""
+    calls = []
+
+    def function(db, payload):
+        calls.append(payload)
+        function.action(db, payload)
+
+    function.action = lambda db, payload: None
+    function.calls = calls
+    monkeypatch.setitem(jobs.HANDLERS, KIND, jobs.JobHandler(KIND, function, 60, 3))
+    return function
+
+
+def add_job(db, **fields) -> int:
+    fields.setdefault("run_at", datetime.utcnow() - timedelta(seconds=1))
+    fields.setdefault("max_attempts", 3)
+    job = Job(kind=KIND, payload={"n": 1}, **fields)
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def test_periodic_slots_are_utc_whatever_the_host_timezone(db, santiago_time, monkeypatch):
+    monkeypatch.setattr(jobs, "PERIODIC", [jobs.PeriodicJob(KIND, 3600, {})])
+    worker = jobs.Worker()
+    monkeypatch.setattr(worker._stop, "wait", lambda timeout: worker._stop.set())
+
+    before = datetime.utcnow()
+    worker._schedule_loop()
+    worker._stop.clear()
+    worker._schedule_loop()  # El mismo periodo no se encola dos veces
+
+    [scheduled] = db.query(Job).all()
+    slot = int(scheduled.run_at.replace(tzinfo=timezone.utc).timestamp())
+    assert slot % 3600 == 0
+    assert before - timedelta(hours=1) < scheduled.run_at <= before
+    assert scheduled.dedupe_key == f"{KIND}@{slot}"
+
+
+def test_enqueue_skips_a_taken_dedupe_key(db):
+    assert jobs.enqueue(db, KIND, dedupe_key=f"{KIND}@0") is not None
+    assert jobs.enqueue(db, KIND, dedupe_key=f"{KIND}@0") is None
+    assert jobs.enqueue(db, KIND, dedupe_key=f"{KIND}@3600") is not None
+    db.commit()
+
+    assert db.query(Job).count() == 2
+
+
+def test_completed_job_commits_the_handler_changes(db, handler):
+    handler.action = lambda session, payload: jobs.enqueue(session, "tests.follow_up", delay=60)
+    job_id = add_job(db)
+
+    assert jobs.Worker().run_one([KIND]) is True
+    assert jobs.Worker().run_one([KIND]) is False
+
+    db.expire_all()
+    done = db.get(Job, job_id)
+    assert (done.status, done.attempts, done.locked_by) == (JobStatus.DONE, 1, None)
+    assert db.query(Job).filter_by(kind="tests.follow_up").count() == 1
+
+
+def test_only_lapsed_leases_are_reclaimed(db, handler):
+    now = datetime.utcnow()
+    lapsed = add_job(
+        db, status=JobStatus.RUNNING, attempts=1, locked_by="dead", locked_until=now - timedelta(seconds=1)
+    )
+    add_job(db, status=JobStatus.RUNNING, attempts=1, locked_by="busy", locked_until=now + timedelta(minutes=5))
+
+    worker = jobs.Worker()
+    claimed = worker.claim(db, [KIND])
+
+    assert claimed.id == lapsed
+    assert (claimed.attempts, claimed.locked_by) == (2, worker.name)
+    assert claimed.locked_until > now + timedelta(seconds=55)
+    assert worker.claim(db, [KIND]) is None
+
+
+def test_worker_that_lost_its_lease_discards_its_work(db, handler):
+    handler.action = lambda session, payload: jobs.enqueue(session, "tests.follow_up", delay=60)
+    job_id = add_job(db)
+    first, second = jobs.Worker(), jobs.Worker()
+    second.name = "other"
+
+    claimed = first.claim(db, [KIND])
+    db.query(Job).filter_by(id=job_id).update({"locked_until": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    assert second.claim(db, [KIND]).id == job_id
+
+    first._execute(db, claimed)
+
+    db.expire_all()
+    job = db.get(Job, job_id)
+    assert (job.status, job.locked_by, job.attempts) == (JobStatus.RUNNING, "other", 2)
+    assert db.query(Job).filter_by(kind="tests.follow_up").count() == 0
+
+
+def test_failed_attempt_is_retried_with_backoff(db, handler, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 10)
+
+    def fail(session, payload):
+        raise ValueError("boom")
+
+    handler.action = fail
+    job_id = add_job(db, attempts=1)
+
+    before = datetime.utcnow()
+    jobs.Worker().run_one([KIND])
+
+    db.expire_all()
+    job = db.get(Job, job_id)
+    assert (job.status, job.attempts, job.locked_by) == (JobStatus.QUEUED, 2, None)
+    assert job.last_error == "ValueError: boom"
+    # Segundo intento: base x 2
+    assert before + timedelta(seconds=20) <= job.run_at <= datetime.utcnow() + timedelta(seconds=20)
+    assert jobs.Worker().run_one([KIND]) is False
+
+
+def test_job_is_failed_after_its_last_attempt(db, handler):
+    def fail(session, payload):
+        raise ValueError("boom")
+
+    handler.action = fail
+    job_id = add_job(db, attempts=2)
+
+    jobs.Worker().run_one([KIND])
+
+    db.expire_all()
+    job = db.get(Job, job_id)
+    assert (job.status, job.attempts) == (JobStatus.FAILED, 3)
+    assert job.finished_at is not None
+    assert jobs.Worker().run_one([KIND]) is False
+
+
+def test_retry_delay_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 10)
+    monkeypatch.setattr(settings, "JOB_RETRY_MAX_SECONDS", 60)
+
+    assert [jobs.retry_delay(n).total_seconds() for n in range(1, 6)] == [10, 20, 40, 60, 60]
@@ -0,0 +1,25 @@
+import inspect
+
+from app.api.api_v1.endpoints import auth
+from app.core.config import settings
+from app.core.password_utils import hasher
+from app.models.user import UserRole
+
+API = settings.API_V1_STR
+
+
+def test_login_runs_off_the_event_loop():
+    # Verificar el hash con bcrypt bloquea; un endpoint síncrono corre en el threadpool
+    assert not inspect.iscoroutinefunction(auth.login_access_token)
+
+
+def test_login_returns_tokens_for_valid_credentials(client, make_user):
+    user = make_user(UserRole.CLIENT, hashed_password=hasher.hash("correct horse"))
+    url = f"{API}/auth/login/access-token"
+
+    response = client.post(url, data={"username": user.email, "password": "correct horse"})
+    assert response.status_code == 200, response.text
+    assert {"access_token", "refresh_token"} <= response.json().keys()
+
+    response = client.post(url, data={"username": user.email, "password": "wrong"})
+    assert response.status_code == 401
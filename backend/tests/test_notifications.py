@@ -0,0 +1,154 @@
+import smtplib
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.notification import Notification, NotificationStatus
+from app.services import notifications
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj de ``notifications`` que solo avanza con ``clock.advance``."""
+
+    class Clock(datetime):
+        current = datetime.utcnow()
+
+        @classmethod
+        def utcnow(cls):
+            return cls.current
+
+        @classmethod
+        def advance(cls, seconds):
+            cls.current += timedelta(seconds=seconds)
+
+    monkeypatch.setattr(notifications, "datetime", Clock)
+    monkeypatch.setattr(settings, "NOTIFICATION_LEASE_SECONDS", 300)
+    monkeypatch.setattr(settings, "SMTP_TIMEOUT_SECONDS", 10)
+    return Clock
+
+
+class SlowMailer:
+    """Tarda ``seconds`` en cada envío y falla para las direcciones de ``failing``."""
+
+    def __init__(self, clock, seconds, failing=(), during_send=None):
+        self.clock = clock
+        self.seconds = seconds
+        self.failing = set(failing)
+        self.during_send = during_send
+        self.sent = []
+
+    def send(self, to, subject, html):
+        self.clock.advance(self.seconds)
+        if self.during_send:
+            self.during_send(to)
+        if to in self.failing:
+            raise smtplib.SMTPServerDisconnected("timed out")
+        self.sent.append(to)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def outbox(db, clock):
+    def _outbox(*emails):
+        rows = [
+            Notification(
+                kind=notifications.CONTRACT_CREATED,
+                recipient_email=email,
+                context={"contract_title": "Site", "amount": "100.00", "offerer_id": 1},
+                available_at=clock.current - timedelta(seconds=n + 1),
+            )
+            for n, email in enumerate(reversed(emails))
+        ]
+        db.add_all(rows)
+        db.commit()
+        return {row.recipient_email: row.id for row in rows}
+
+    return _outbox
+
+
+def _state(db, id):
+    db.expire_all()
+    return db.get(Notification, id)
+
+
+def test_batch_that_outlives_its_lease_requeues_the_rest(db, clock, outbox):
+    ids = outbox("a@example.com", "b@example.com", "c@example.com")
+    sent_rows = []
+    # Cada envío tarda la mitad de la reserva: el tercero ya no cabe
+    mailer = SlowMailer(
+        clock,
+        150,
+        during_send=lambda to: sent_rows.append(
+            db.query(Notification).filter_by(status=NotificationStatus.SENT).count()
+        ),
+    )
+
+    assert notifications.deliver_batch(db, mailer) == 3
+
+    assert mailer.sent == ["a@example.com", "b@example.com"]
+    # Cada envío queda confirmado antes del siguiente
+    assert sent_rows == [0, 1]
+    requeued = _state(db, ids["c@example.com"])
+    assert (requeued.status, requeued.attempts) == (NotificationStatus.PENDING, 0)
+    assert requeued.available_at == clock.current
+
+    # Otro worker recoge solo lo que quedó sin enviar
+    other = SlowMailer(clock, 1)
+    assert notifications.deliver_batch(db, other) == 1
+    assert other.sent == ["c@example.com"]
+    assert {_state(db, id).status for id in ids.values()} == {NotificationStatus.SENT}
+
+
+def test_only_lapsed_leases_are_reclaimed(db, clock, outbox):
+    ids = outbox("a@example.com")
+    start = clock.current
+
+    assert [n.id for n in notifications.claim_batch(db, start)] == list(ids.values())
+    assert notifications.claim_batch(db, start + timedelta(seconds=299)) == []
+    [reclaimed] = notifications.claim_batch(db, start + timedelta(seconds=301))
+    assert reclaimed.attempts == 2
+
+
+def test_failed_send_is_retried_then_abandoned(db, clock, outbox, monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "NOTIFICATION_RETRY_BASE_SECONDS", 30)
+    ids = outbox("a@example.com")
+    mailer = SlowMailer(clock, 1, failing={"a@example.com"})
+
+    notifications.deliver_batch(db, mailer)
+    retried = _state(db, ids["a@example.com"])
+    assert (retried.status, retried.attempts) == (NotificationStatus.PENDING, 1)
+    assert retried.available_at == clock.current + timedelta(seconds=30)
+    assert retried.last_error == "timed out"
+
+    assert notifications.deliver_batch(db, mailer) == 0
+    clock.advance(30)
+    notifications.deliver_batch(db, mailer)
+    assert _state(db, ids["a@example.com"]).status == NotificationStatus.FAILED
+
+
+def test_failure_after_the_lease_leaves_the_new_owner_alone(db, clock, outbox):
+    ids = outbox("a@example.com")
+    other_db = SessionLocal()
+    reclaimed = []
+
+    def reclaim(to):
+        # El envío supera la reserva y otro worker reclama la fila entretanto
+        reclaimed.extend(
+            (n.id, n.available_at) for n in notifications.claim_batch(other_db, clock.current)
+        )
+
+    mailer = SlowMailer(clock, 400, failing={"a@example.com"}, during_send=reclaim)
+    try:
+        notifications.deliver_batch(db, mailer)
+    finally:
+        other_db.close()
+
+    row = _state(db, ids["a@example.com"])
+    assert reclaimed == [(row.id, row.available_at)]
+    assert (row.status, row.attempts, row.last_error) == (NotificationStatus.PENDING, 2, None)
@@ -0,0 +1,60 @@
+from sqlalchemy import select
+
+from app.crud.proposal import proposal as crud_proposal
+from app.models.notification import Notification
+from app.models.project import Project, ProjectStatus
+from app.models.proposal import Proposal, ProposalStatus
+from app.models.user import UserRole
+from app.schemas.proposal import ProposalCreate
+from app.services import notifications
+
+
+def _project_with_proposals(db, client_user, mercenaries):
+    project = Project(title="API", description="REST API", client_id=client_user.id)
+    db.add(project)
+    db.flush()
+    proposals = [
+        Proposal(cover_letter="Hi", bid_amount=100, project_id=project.id, mercenary_id=m.id)
+        for m in mercenaries
+    ]
+    db.add_all(proposals)
+    db.commit()
+    return project, proposals
+
+
+def test_accept_assigns_project_rejects_others_and_notifies(db, make_user):
+    owner = make_user(UserRole.CLIENT)
+    chosen, other = make_user(UserRole.FREELANCER), make_user(UserRole.FREELANCER)
+    project, (accepted, rejected) = _project_with_proposals(db, owner, [chosen, other])
+
+    crud_proposal.accept(db, db_obj=accepted)
+
+    db.refresh(project)
+    db.refresh(rejected)
+    assert accepted.status is ProposalStatus.accepted
+    assert rejected.status is ProposalStatus.rejected
+    assert project.freelancer_id == chosen.id
+    assert project.status is ProjectStatus.IN_PROGRESS
+
+    sent = db.scalars(select(Notification)).all()
+    assert [(n.kind, n.recipient_id, n.recipient_email) for n in sent] == [
+        (notifications.PROPOSAL_ACCEPTED, chosen.id, chosen.email)
+    ]
+    assert sent[0].context["project_id"] == project.id
+
+
+def test_create_and_list_by_freelancer_use_mercenary_id(db, make_user):
+    owner = make_user(UserRole.CLIENT)
+    mercenary = make_user(UserRole.FREELANCER)
+    project, _ = _project_with_proposals(db, owner, [])
+
+    created = crud_proposal.create_with_freelancer(
+        db,
+        obj_in=ProposalCreate(cover_letter="Hi", bid_amount=50, project_id=project.id),
+        freelancer_id=mercenary.id,
+    )
+
+    assert created.mercenary_id == mercenary.id
+    assert crud_proposal.get_multi_by_freelancer(db, freelancer_id=mercenary.id) == [created]
+    db.refresh(project)
+    assert project.proposal_count == 1
@@ -0,0 +1,96 @@
+import math
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.models.announcement import Announcement
+from app.models.category import Category
+from app.models.recommendation import RecommendationFeedEntry
+from app.models.user import UserRole
+from app.services import recommendations
+
+API = settings.API_V1_STR
+
+
+@pytest.fixture
+def announcements(db, make_user):
+    owner = make_user(UserRole.CLIENT)
+    category = Category(name="Web")
+    db.add(category)
+    db.flush()
+    rows = [
+        Announcement(title=f"A{i}", description="...", offerer_id=owner.id, category_id=category.id)
+        for i in range(3)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def test_refresh_all_builds_the_feed_of_active_freelancers(
+    client, db, make_user, auth_headers, announcements
+):
+    freelancer = make_user(UserRole.FREELANCER)
+    make_user(UserRole.FREELANCER, is_active=False)
+    make_user(UserRole.CLIENT)
+
+    assert recommendations.refresh_all(db) == 1
+
+    response = client.get(f"{API}/announcements/feed", headers=auth_headers(freelancer))
+    assert response.status_code == 200, response.text
+    assert {a["id"] for a in response.json()} == {a.id for a in announcements}
+
+
+def test_feed_is_only_for_freelancers(client, make_user, auth_headers):
+    response = client.get(f"{API}/announcements/feed", headers=auth_headers(make_user(UserRole.CLIENT)))
+
+    assert response.status_code == 403
+
+
+def test_staleness_comes_from_the_latest_computed_at(db, make_user, announcements):
+    assert recommendations.feed_staleness() == 0.0
+
+    freelancer = make_user(UserRole.FREELANCER)
+    db.add(
+        RecommendationFeedEntry(
+            mercenary_id=freelancer.id,
+            rank=1,
+            announcement_id=announcements[0].id,
+            score=1.0,
+            computed_at=datetime.utcnow() - timedelta(minutes=10),
+        )
+    )
+    db.commit()
+
+    assert 600 <= recommendations.STALENESS.value() < 660
+
+
+class _BrokenSession:
+    scalar = staticmethod(lambda *args, **kwargs: _raise_operational_error())
+
+    def close(self):
+        pass
+
+
+def test_staleness_is_nan_when_the_database_is_down(monkeypatch):
+    monkeypatch.setattr(recommendations, "SessionLocal", _BrokenSession)
+
+    assert math.isnan(recommendations.feed_staleness())
+
+
+def test_run_once_survives_a_database_failure(monkeypatch):
+    class BrokenEngine:
+        def connect(self):
+            _raise_operational_error()
+
+    monkeypatch.setattr(recommendations, "engine", BrokenEngine())
+    failures = recommendations.REFRESH_FAILURES.value()
+
+    assert recommendations.feed_refresher.run_once() is False
+    assert recommendations.REFRESH_FAILURES.value() == failures + 1
+
+
+def _raise_operational_error():
+    raise OperationalError("SELECT 1", {}, Exception("connection refused"))
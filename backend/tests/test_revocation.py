@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+from app.models.revoked_token import RevokedToken
+from app.services import revocation
+
+
+def _revoke(db, jti, seq):
+    db.add(
+        RevokedToken(
+            key=revocation.jti_key(jti),
+            seq=seq,
+            revoked_at=datetime.utcnow(),
+            expires_at=datetime.utcnow() + timedelta(days=1),
+        )
+    )
+    db.commit()
+
+
+def test_sync_picks_up_a_revocation_that_committed_out_of_order(db):
+    store = revocation.RevocationStore()
+    _revoke(db, "first", 1)
+    _revoke(db, "third", 3)
+    store._rebuild()
+
+    # El seq 2 se asignó antes que el 3 pero su transacción confirma después
+    _revoke(db, "second", 2)
+    _revoke(db, "fourth", 4)
+    store._sync()
+
+    for jti in ("first", "second", "third", "fourth"):
+        assert store.is_revoked({"jti": jti}, db)
+    assert not store.is_revoked({"jti": "never"}, db)
+    assert store._last_seq == 4
+
+
+def test_rereading_the_window_does_not_refill_the_filter(db):
+    store = revocation.RevocationStore()
+    for seq in range(1, 4):
+        _revoke(db, f"token-{seq}", seq)
+    store._rebuild()
+
+    store._sync()
+    store._sync()
+
+    assert store._filter.count == 3
@@ -0,0 +1,66 @@
+"""
+Entry point for the background job worker.
+
+Run with: python worker.py [--concurrency N] [--kinds kind1,kind2]
+"""
+import argparse
+import logging
+import signal
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.config import settings  # noqa: E402
+from app.db.pool import pool_health  # noqa: E402
+from app.services.jobs import Worker, load_handlers, serve_metrics  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background jobs from the jobs table.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.JOB_WORKER_CONCURRENCY,
+        help="Number of jobs executed in parallel",
+    )
+    parser.add_argument(
+        "--kinds",
+        default="",
+        help="Comma-separated job kinds to handle (default: all registered)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=settings.JOB_WORKER_METRICS_PORT,
+        help="Port for Prometheus metrics (0 disables)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if settings.DEBUG else logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    load_handlers()
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+
+    kinds = [kind.strip() for kind in args.kinds.split(",") if kind.strip()]
+    worker = Worker(concurrency=args.concurrency, kinds=kinds or None)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+    if settings.DB_POOL_HEALTH_CHECK_SECONDS > 0:
+        pool_health.start()
+    try:
+        worker.run()
+    finally:
+        pool_health.stop()
+
+
+if __name__ == "__main__":
+    main()